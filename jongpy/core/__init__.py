@@ -2,17 +2,23 @@
 
 from jongpy.core.rule import rule
 from jongpy.core.shoupai import Shoupai
+from jongpy.core.packed_shoupai import PackedShoupai
 from jongpy.core.shan import Shan
 from jongpy.core.he import He
 from jongpy.core.board import Board
 from jongpy.core.game import Game
 from jongpy.core.player import Player
+from jongpy.core.async_game import AsyncGame, AsyncPlayer
 from jongpy.core.xiangting import (xiangting_goushi,
                                    xiangting_qidui,
                                    xiangting_yiban,
                                    xiangting,
-                                   tingpai)
+                                   xiangting_array,
+                                   tingpai_array,
+                                   tingpai,
+                                   xiangting_dapai)
 from jongpy.core.hule import (hule,
+                              hule_batch,
                               hule_mianzi,
                               hule_param)
 from jongpy.core.exceptions import JongPyError
@@ -21,17 +27,24 @@ from jongpy.core.exceptions import JongPyError
 __all__ = [
     'rule',
     'Shoupai',
+    'PackedShoupai',
     'Shan',
     'He',
     'Board',
     'Game',
     'Player',
+    'AsyncGame',
+    'AsyncPlayer',
     'xiangting_goushi',
     'xiangting_qidui',
     'xiangting_yiban',
     'xiangting',
+    'xiangting_array',
+    'tingpai_array',
     'tingpai',
+    'xiangting_dapai',
     'hule',
+    'hule_batch',
     'hule_mianzi',
     'hule_param',
     'JongPyError',
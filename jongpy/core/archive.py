@@ -0,0 +1,228 @@
+"""jongpy.core.archive"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator
+
+from jongpy.core.board import Board
+from jongpy.core.paipu_codec import PaipuView, PaipuFormatError, encode_index
+from jongpy.core.replay import apply_event
+
+
+MAGIC = b'JPPA'
+VERSION = 1
+
+# ファイルの構成:
+#   MAGIC, VERSION(1バイト), 牌譜(paipu_codec 形式)*, 対局索引, 局索引, フッタ
+#   対局索引: 対局ごとに(牌譜の位置, 最初の局の局索引番号, 局数)
+#   局索引: 局ごとに(最初のイベントの位置, イベント数)
+#   フッタ: 対局索引の位置, 局索引の位置, 対局数, 局数, MAGIC
+_HEADER = len(MAGIC) + 1
+_GAME = struct.Struct('<QII')
+_ROUND = struct.Struct('<QI')
+_FOOTER = struct.Struct('<QQII4s')
+
+
+class ArchiveWriter:
+    """
+    多数の牌譜を1つのファイルにまとめて書き出す
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        出力するファイル
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self._f = open(path, 'wb')
+        self._f.write(MAGIC + bytes([VERSION]))
+        self._pos = _HEADER
+        self._games = []
+        self._rounds = []
+
+    def add(self, paipu: dict) -> int:
+        """
+        牌譜を追加する
+
+        Parameters
+        ----------
+        paipu : dict
+            牌譜
+
+        Returns
+        -------
+        int
+            対局番号
+        """
+
+        data, rounds = encode_index(paipu)
+        self._games.append((self._pos, len(self._rounds), len(rounds)))
+        self._rounds += [(self._pos + offset, n) for offset, n in rounds]
+        self._f.write(data)
+        self._pos += len(data)
+        return len(self._games) - 1
+
+    def close(self):
+        """索引を書き出してファイルを閉じる"""
+
+        if self._f.closed:
+            return
+        game_index = self._pos
+        self._f.write(b''.join(_GAME.pack(*g) for g in self._games))
+        round_index = game_index + _GAME.size * len(self._games)
+        self._f.write(b''.join(_ROUND.pack(*r) for r in self._rounds))
+        self._f.write(_FOOTER.pack(game_index, round_index, len(self._games), len(self._rounds), MAGIC))
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_archive(path: str | os.PathLike, paipu: Iterable[dict]) -> int:
+    """
+    牌譜をまとめてアーカイブに書き出す
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        出力するファイル
+    paipu : iterable of dict
+        牌譜
+
+    Returns
+    -------
+    int
+        書き出した対局数
+    """
+    with ArchiveWriter(path) as writer:
+        n = 0
+        for p in paipu:
+            writer.add(p)
+            n += 1
+    return n
+
+
+class Archive:
+    """
+    ``ArchiveWriter``で作成したファイルを``mmap``で開き、任意の対局・局を
+    ファイル全体を解析せずに読み出す
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        アーカイブのファイル
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+        if bytes(self._buf[:len(MAGIC)]) != MAGIC or len(self._buf) < _HEADER + _FOOTER.size:
+            self.close()
+            raise PaipuFormatError('bad archive')
+        if self._buf[len(MAGIC)] != VERSION:
+            self.close()
+            raise PaipuFormatError('unsupported archive version')
+        (self._game_index, self._round_index,
+         self._n_games, self._n_rounds, magic) = _FOOTER.unpack_from(self._buf, len(self._buf) - _FOOTER.size)
+        if magic != MAGIC:
+            self.close()
+            raise PaipuFormatError('truncated archive')
+
+    def __len__(self) -> int:
+        return self._n_games
+
+    def _game(self, game: int) -> tuple[int, int, int]:
+        if not 0 <= game < self._n_games:
+            raise IndexError(game)
+        return _GAME.unpack_from(self._buf, self._game_index + _GAME.size * game)
+
+    def n_rounds(self, game: int) -> int:
+        """``game``番目の対局の局数"""
+        return self._game(game)[2]
+
+    def view(self, game: int) -> PaipuView:
+        """``game``番目の対局の牌譜 (バッファを共有する)"""
+        return PaipuView(self._buf, self._game(game)[0])
+
+    def paipu(self, game: int) -> dict:
+        """``game``番目の対局の牌譜を JSON 形式に復元する"""
+        return self.view(game).to_dict()
+
+    def events(self, game: int, round: int) -> Iterator[dict]:
+        """
+        ``game``番目の対局の``round``番目の局のイベントを順に復号する
+
+        局索引から直接イベントの位置を求めるので、前の局は読まない
+
+        Parameters
+        ----------
+        game : int
+            対局番号
+        round : int
+            局の通し番号
+
+        Yields
+        ------
+        dict
+            イベント
+        """
+
+        offset, first, n_rounds = self._game(game)
+        if not 0 <= round < n_rounds:
+            raise IndexError(round)
+        pos, n = _ROUND.unpack_from(self._buf, self._round_index + _ROUND.size * (first + round))
+        return PaipuView(self._buf, offset).iter_events(offset=pos, n=n)
+
+    def iter_rounds(self) -> Iterator[tuple[int, int, Iterator[dict]]]:
+        """全ての局について(対局番号, 局番号, イベントのイテレータ)を返す"""
+        for game in range(self._n_games):
+            view = self.view(game)
+            for round, (pos, n) in enumerate(view.rounds):
+                yield game, round, view.iter_events(offset=pos, n=n)
+
+    def board(self, game: int, round: int, n: int | None = None) -> Board:
+        """
+        ``game``番目の対局の``round``番目の局を``Board``で再現する
+
+        Parameters
+        ----------
+        game : int
+            対局番号
+        round : int
+            局の通し番号
+        n : int or None, default None
+            再現するイベント数。省略時は局の最後まで
+
+        Returns
+        -------
+        Board
+            ``n``件のイベントを適用した卓情報
+        """
+
+        header = self.view(game).header
+        board = Board({'title': header.get('title'), 'player': header.get('player'), 'qijia': header['qijia']})
+        for i, event in enumerate(self.events(game, round)):
+            if n is not None and i >= n:
+                break
+            apply_event(board, event)
+        return board
+
+    def close(self):
+        """ファイルを閉じる (以降、取得済みの``PaipuView``は使用できない)"""
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
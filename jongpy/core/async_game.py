@@ -0,0 +1,236 @@
+"""jongpy.core.async_game"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+from jongpy.core.game import Game
+from jongpy.core.player import Player
+
+
+class AsyncGame(Game):
+    """
+    asyncio によるゲーム管理クラス
+
+    対局者の``action``はコルーチンで、応答を返り値として返す。
+    4人への通知は並行して送信し、``asyncio.wait``で応答を待つ。
+    ``timeout``秒以内に応答しなかった対局者は応答なし(``{}``)として扱う
+
+    Parameters
+    ----------
+    players : list
+        対局者 (``async def action(msg, reply=True)``を持つこと)
+    callback : callable or None
+        終局時に牌譜を引数に呼び出す関数
+    rule_ : dict or None, default None
+        ルール
+    title : str or None, default None
+        牌譜のタイトル
+    timeout : float or None, default None
+        1回の通知に対する応答の待ち時間[秒]。省略時は無制限
+    """
+
+    def __init__(
+        self,
+        players: list,
+        callback: Callable | None = None,
+        rule_: dict | None = None,
+        title: str | None = None,
+        timeout: float | None = None
+    ) -> None:
+        super().__init__(players, callback, rule_, title)
+        self._timeout = timeout
+
+        self._call = None   # 応答を待つ通知メッセージと待ち時間
+        self._notify = []   # 応答を待たない通知メッセージ
+        self._step = None   # 次に遷移する処理と待ち時間
+        self._replied = False   # 応答がそろい、状態遷移を待っているか
+
+    @property
+    def timeout(self) -> float | None:
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, timeout: float | None):
+        self._timeout = timeout
+
+    def delay(self, callback: Callable, timeout: int | None = None, loop=None):
+
+        timeout = (0 if self._speed == 0
+                   else max(500, self._speed * 200) if timeout is None
+                   else timeout)
+        self._step = (callback, timeout)
+
+    def notify_players(self, type: str, msg: list[dict]):
+
+        # 東家から順に送信待ちに加える
+        for i in range(4):
+            self._notify.append((self._model['player_id'][i], msg[i]))
+
+    def call_players(self, type: str, msg: list[dict], timeout: int | None = None):
+
+        timeout = (0 if self._speed == 0
+                   else self._speed * 200 if timeout is None
+                   else timeout)
+
+        self._status = type
+        self._reply = [None] * 4
+        self._call = (msg, timeout)
+
+    async def _send_notify(self):
+
+        # 送信待ちの応答なし通知を送信する
+        notify, self._notify = self._notify, []
+        if not notify:
+            return
+        tasks = [asyncio.ensure_future(self._players[id].action(msg, False)) for id, msg in notify]
+        _, pending = await asyncio.wait(tasks, timeout=self._timeout)
+        for task in pending:
+            task.cancel()
+
+    async def _ask(self, msg: list[dict]):
+
+        # 東家から順に対局者にメッセージを送信し、応答を待つ
+        tasks = {}
+        for i in range(4):
+            id = self._model['player_id'][i]
+            tasks[asyncio.ensure_future(self._players[id].action(msg[i]))] = id
+        done, pending = await asyncio.wait(tasks, timeout=self._timeout)
+        for task in pending:
+            task.cancel()
+
+        # 時間内に応答しなかった対局者、例外を送出した対局者は応答なしとする
+        for task, id in tasks.items():
+            reply = None
+            if task in done and not task.cancelled() and task.exception() is None:
+                reply = task.result()
+            self._reply[id] = reply or {}
+
+    async def _gather(self):
+
+        msg, timeout = self._call
+        self._call = None
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        await self._ask(msg)
+
+        # 対局速度に応じた待ち時間に満たない場合は残りを待つ
+        rest = timeout / 1000 - (loop.time() - start)
+        if rest > 0:
+            await asyncio.sleep(rest)
+
+        self._replied = True
+
+    async def next(self):
+        """対局者からの応答を読み出し、次の応答待ちまで状態遷移を進める"""
+
+        while True:
+            await self._send_notify()
+
+            if self._call is not None:
+                await self._gather()
+
+            elif self._replied:
+                # 外部から停止要求があった場合は停止する
+                if self._stop is not None:
+                    return self._stop()
+                self._replied = False
+
+                # メッセージに対応した状態遷移メソッドを呼び出す
+                if self._status == 'kaiju':
+                    self.reply_kaiju()  # 開局
+                elif self._status == 'qipai':
+                    self.reply_qipai()  # 配牌
+                elif self._status in ('zimo', 'gangzimo'):
+                    self.reply_zimo()   # 自摸・槓自摸
+                elif self._status == 'dapai':
+                    self.reply_dapai()  # 打牌
+                elif self._status == 'fulou':
+                    self.reply_fulou()  # 副露
+                elif self._status == 'gang':
+                    self.reply_gang()   # 槓
+                elif self._status == 'hule':
+                    self.reply_hule()   # 和了
+                elif self._status == 'pingju':
+                    self.reply_pingju()     # 流局
+                else:
+                    if self._callback is not None:
+                        self._callback(self._paipu)
+                    return
+
+            elif self._step is not None:
+                callback, timeout = self._step
+                self._step = None
+                if timeout:
+                    await asyncio.sleep(timeout / 1000)
+                callback()
+
+            else:
+                return
+
+    def start(self):
+        """停止した対局を再開するコルーチンを返す"""
+        self._stop = None
+        return self.next()
+
+    async def run(self, qijia: int | None = None) -> dict:
+        """
+        対局を開始し、終局(または停止)するまで実行する
+
+        Parameters
+        ----------
+        qijia : int or None, default None
+            起家の指定
+
+        Returns
+        -------
+        dict
+            牌譜
+        """
+        self._stop = None
+        self.kaiju(qijia)
+        await self.next()
+        return self._paipu
+
+
+class AsyncPlayer(Player):
+    """
+    ``action``がコルーチンのプレイヤー抽象クラス
+
+    ``Player``と同じく``action_xxx``メソッドを実装し、応答は
+    ``self._callback``で返す。コールバックは後から(別のコルーチンから)
+    呼び出してもよい
+    """
+
+    async def action(self, msg: dict[str, dict], reply: bool = True) -> dict | None:
+        """
+        メッセージの処理
+
+        Parameters
+        ----------
+        msg : dict
+            通知メッセージ
+        reply : bool, default True
+            応答を返す必要があるかどうか
+
+        Returns
+        -------
+        dict or None
+            応答メッセージ
+        """
+
+        if not reply:
+            super().action(msg)
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+
+        def callback(reply: dict | None = None):
+            if not future.done():
+                future.set_result(reply)
+
+        super().action(msg, callback)
+        return await future
@@ -5,6 +5,7 @@ from typing import Any
 
 from jongpy.core.shoupai import Shoupai
 from jongpy.core.he import He
+from jongpy.core.pai import N_PAI, pai_id, mianzi_id
 
 
 class Shan:
@@ -45,6 +46,7 @@ class Board:
         self.he = [None] * 4
         self.player_id = [0, 1, 2, 3]
         self.lunban = -1
+        self.visible = [0] * N_PAI  # 全員に見えている牌の牌番号ごとの枚数
 
         self._lizhi = None
         self._fenpei = None
@@ -65,6 +67,9 @@ class Board:
             self.player_id[i] = (self.qijia + self.jushu + i) % 4
             self.defen[self.player_id[i]] = qipai['defen'][i]
         self.lunban = -1
+        self.visible = [0] * N_PAI
+        if qipai['baopai']:
+            self.visible[pai_id(qipai['baopai'])] += 1
 
         self._lizhi = False
         self._fenpei = None
@@ -75,6 +80,30 @@ class Board:
             self.lizhibang += 1
             self._lizhi = False
 
+    def rest(self, p: str, l: int | None = None) -> int:
+        """
+        牌``p``の残り枚数を取得
+
+        全員の河・副露牌とドラ表示牌に見えている枚数を除いた枚数を返す。
+        ``l``を指定した場合は、その手番の手牌の枚数も除く
+
+        Parameters
+        ----------
+        p : str
+            牌
+        l : int or None, default None
+            手番
+
+        Returns
+        -------
+        int
+            残り枚数
+        """
+        n = 4 - self.visible[pai_id(p)]
+        if l is not None:
+            n -= self.shoupai[l]._bingpai[p[0]][int(p[1]) or 5]
+        return n
+
     def zimo(self, zimo: dict[str, int | str]):
         self.lizhi()
         self.lunban = zimo['l']
@@ -84,6 +113,7 @@ class Board:
         self.lunban = dapai['l']
         self.shoupai[dapai['l']].dapai(dapai['p'], False)
         self.he[dapai['l']].dapai(dapai['p'])
+        self.visible[pai_id(dapai['p'])] += 1
         self._lizhi = dapai['p'][-1] == '*'
 
     def fulou(self, fulou: dict[str, int | str]):
@@ -91,13 +121,18 @@ class Board:
         self.he[self.lunban].fulou(fulou['m'])
         self.lunban = fulou['l']
         self.shoupai[fulou['l']].fulou(fulou['m'], False)
+        for i in mianzi_id(fulou['m']):
+            self.visible[i] += 1
 
     def gang(self, gang: dict[str, int | str]):
         self.lunban = gang['l']
         self.shoupai[gang['l']].gang(gang['m'], False)
+        for i in mianzi_id(gang['m'], True):
+            self.visible[i] += 1
 
     def kaigang(self, kaigang: dict[str, str]):
         self.shan.kaigang(kaigang['baopai'])
+        self.visible[pai_id(kaigang['baopai'])] += 1
 
     def hule(self, hule: dict[str, Any]):
         shoupai = self.shoupai[hule['l']]
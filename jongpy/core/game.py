@@ -5,8 +5,6 @@ from __future__ import annotations
 import re
 import datetime
 import random
-import json
-import asyncio
 import time
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Callable, Any, TYPE_CHECKING
@@ -14,19 +12,18 @@ from typing import Callable, Any, TYPE_CHECKING
 from jongpy.core.shoupai import Shoupai
 from jongpy.core.shan import Shan
 from jongpy.core.he import He
+from jongpy.core.pai import N_PAI, pai_id, mianzi_id
 from jongpy.core.rule import rule
-from jongpy.core.xiangting import tingpai, xiangting
+from jongpy.core.xiangting import tingpai, xiangting, xiangting_dapai
 from jongpy.core.hule import hule_mianzi, hule
+from jongpy.core.message import freeze, masked
+from jongpy.core.scheduler import Scheduler, Timer, get_scheduler
+from jongpy.core.sink import PaipuSink
 
 if TYPE_CHECKING:
     from jongpy.core.player import Player
 
 
-def wrap_with_delay(sec: float, callback: Callable, *args):
-    time.sleep(sec)
-    callback(*args)
-
-
 class Game:
     """ゲーム管理クラス"""
 
@@ -46,17 +43,8 @@ class Game:
         self._model = {
             'title': title or 'PyMahjong' + datetime.datetime.now().strftime('%Y/%m/%d %H:%M%S'),
             'player': ['自家', '下家', '対面', '上家'],
-            'qijia': 0,
-            'zhuangfeng': 0,
-            'jushu': 0,
-            'changbang': 0,
-            'lizhibang': 0,
-            'defen': [self._rule['origin_points']] * 4,
-            'shan': None,
-            'shoupai': [None] * 4,
-            'he': [None] * 4,
-            'player_id': [0, 1, 2, 3]
         }
+        self._init_model()
 
         self._view = None
 
@@ -67,8 +55,16 @@ class Game:
         self._stop = None
         self._speed = 3
         self._wait = 0
-        self._loop = None
+        self._loop = None   # next() 呼び出しタイマー
         self._handler = None
+        self._scheduler = None
+
+        self._raw = [False] * 4     # 生の通知メッセージを受け取る対局者
+        self._random = random   # 起家の決定と牌山の生成に使う乱数生成器
+        self._record = True     # 牌譜を記録するかどうか
+        self._sink = None   # 牌譜を逐次出力する出力先
+        self._sink_game = None  # 出力先での対局番号
+        self._round = -1    # 対局内の局の通し番号
 
     @property
     def model(self):
@@ -98,6 +94,35 @@ class Game:
     def wait(self, wait):
         self._wait = wait
 
+    @property
+    def scheduler(self) -> Scheduler:
+        """タイマーを管理するスケジューラ (省略時は全対局で共有する既定のもの)"""
+        if self._scheduler is None:
+            self._scheduler = get_scheduler()
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, scheduler: Scheduler):
+        self._scheduler = scheduler
+
+    @property
+    def record(self) -> bool:
+        """牌譜の局進行をメモリ上に記録するかどうか"""
+        return self._record
+
+    @record.setter
+    def record(self, record: bool):
+        self._record = record
+
+    @property
+    def sink(self) -> PaipuSink | None:
+        """牌譜を1イベントずつ出力する出力先"""
+        return self._sink
+
+    @sink.setter
+    def sink(self, sink: PaipuSink | None):
+        self._sink = sink
+
     @property
     def handler(self):
         return self._handler
@@ -107,18 +132,60 @@ class Game:
         self._handler = callback
 
     def add_paipu(self, paipu: dict):
-        self._paipu['log'][-1].append(paipu)
+        if self._record:
+            self._paipu['log'][-1].append(paipu)
+        if self._sink is not None:
+            self._sink.add(self._sink_game, self._round, paipu)
+
+    def _message(self, paipu: dict, i: int, path: tuple = (), value: Any = '') -> dict:
+        """
+        席順``i``の対局者への通知メッセージを作成する
 
-    def set_timeout(self, timeout: int, callback: Callable, *args):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_in_executor(None, wrap_with_delay, timeout / 1000, callback, *args)
-        return loop
+        牌譜(変更できない形式)は全員で共有し、``path``を指定した場合は
+        その要素だけを複製して``value``でマスクする。ただし生の状態の参照を
+        選択した対局者(シミュレーション時のみ)にはマスクしない
+
+        Parameters
+        ----------
+        paipu : dict
+            牌譜 (``freeze``済みであること)
+        i : int
+            席順
+        path : tuple, default ()
+            マスクする要素へのキー・添字の並び
+        value : Any, default ''
+            マスク後の値
+
+        Returns
+        -------
+        dict
+            通知メッセージ
+        """
+        if not path or self._raw[self._model['player_id'][i]]:
+            return paipu
+        return masked(paipu, path, value)
+
+    def set_timeout(self, timeout: int, callback: Callable, *args) -> Timer:
+        """
+        ``timeout``ミリ秒後に``callback(*args)``を呼び出す
+
+        Parameters
+        ----------
+        timeout : int
+            待ち時間[ミリ秒]
+        callback : callable
+            呼び出す関数
+
+        Returns
+        -------
+        Timer
+            ``clear_timeout``でキャンセルするためのタイマー
+        """
+        return self.scheduler.call_later(timeout / 1000, callback, *args)
 
     def clear_timeout(self):
         if self._loop is not None:
-            self._loop.stop()
-            self._loop.close()
+            self._loop.cancel()
             self._loop = None
 
     def delay(self, callback: Callable, timeout: int | None = None, loop=None):
@@ -190,17 +257,18 @@ class Game:
         # 応答を保存する配列を初期化
         self._reply = [None] * 4
 
+        # 非同期モードでは応答より先に next() 呼び出しタイマーを設定する
+        if not self._sync:
+            self._loop = self.set_timeout(timeout, self.next)
+
         # 東家から順に対局者にメッセージを送信する
         for i in range(4):
             id = self._model['player_id'][i]
             if self._sync:
                 # 同期モードの場合は直接 action メソッドを呼び出す
-                self._players[id].action(msg[i], lambda reply: self.reply(id, reply))
+                self._players[id].action(msg[i], lambda reply, id=id: self.reply(id, reply))
             else:
-                self.set_timeout(0, self._players[id].action, msg[i], lambda reply: self.reply(id, reply))
-
-        if not self._sync:
-            self._loop = self.set_timeout(timeout, self.next)
+                self.set_timeout(0, self._players[id].action, msg[i], lambda reply, id=id: self.reply(id, reply))
 
     def reply(self, id: int, reply: dict | None = None):
         """
@@ -291,10 +359,93 @@ class Game:
             else:
                 break
 
-        self._callback(self._paipu)
+        if self._callback is not None:
+            self._callback(self._paipu)
 
         return self
 
+    def simulate(self, n_games: int = 1, seed: int | None = None, paipu: bool = False) -> dict[str, Any]:
+        """
+        描画を行わない同期モードで、対局を``n_games``回続けて実行する
+
+        ``raw_state``属性が真の対局者には通知メッセージを複製・マスクせずに
+        そのまま渡す(他家の手牌やツモ牌も参照できる)。受け取ったメッセージは
+        牌譜と共有されるので、対局者はメッセージを変更してはならない
+
+        Parameters
+        ----------
+        n_games : int, default 1
+            対局数
+        seed : int or None, default None
+            乱数のシード。指定した場合はこのシードで初期化した
+            ``random.Random``で起家の決定と牌山の生成を行う。省略時は
+            モジュール``random``を使用する
+        paipu : bool, default False
+            牌譜を記録するかどうか。記録しない場合、牌譜の局の一覧('log')は
+            空のままとなる。``sink``を設定している場合、出力先には記録の
+            有無によらず出力する
+
+        Returns
+        -------
+        dict
+            'n_games' (対局数)、'time' (所要時間[秒])、'games_per_second'
+            (1秒あたりの対局数)、'defen' (対局ごとの終了時の持ち点)、
+            'rank' (対局ごとの着順)、'point' (対局ごとのポイント)、
+            'paipu' (``paipu``が真の場合のみ牌譜)
+        """
+
+        if seed is not None:
+            self._random = random.Random(seed)
+
+        view = self._view
+        self._view = None   # 描画は行わない
+        self._raw = [bool(getattr(player, 'raw_state', False)) for player in self._players]
+        record = self._record
+        self._record = paipu
+
+        result = {'defen': [], 'rank': [], 'point': [], 'paipu': []}
+        start = time.perf_counter()
+        try:
+            for _ in range(n_games):
+                self._init_model()
+                self.do_sync()
+                result['defen'].append(self._paipu['defen'])
+                result['rank'].append(self._paipu['rank'])
+                result['point'].append(self._paipu['point'])
+                if paipu:
+                    result['paipu'].append(self._paipu)
+        finally:
+            self._view = view
+            self._raw = [False] * 4
+            self._record = record
+            self._random = random
+        elapsed = time.perf_counter() - start
+
+        if not paipu:
+            del result['paipu']
+        result['n_games'] = n_games
+        result['time'] = elapsed
+        result['games_per_second'] = n_games / elapsed if elapsed > 0 else float('inf')
+
+        return result
+
+    def _init_model(self):
+        """卓情報(タイトル・対局者情報以外)を対局開始前の状態にする"""
+
+        self._model.update({
+            'qijia': 0,
+            'zhuangfeng': 0,
+            'jushu': 0,
+            'changbang': 0,
+            'lizhibang': 0,
+            'defen': [self._rule['origin_points']] * 4,
+            'shan': None,
+            'shoupai': [None] * 4,
+            'he': [None] * 4,
+            'player_id': [0, 1, 2, 3],
+            'visible': [0] * N_PAI  # 全員に見えている牌の牌番号ごとの枚数
+        })
+
     def kaiju(self, qijia: int | None = None):
         """
         対局の開始
@@ -306,7 +457,7 @@ class Game:
         """
 
         # 1. 卓情報を更新
-        self._model['qijia'] = qijia if qijia is not None else random.randrange(4)  # 起家を決定する
+        self._model['qijia'] = qijia if qijia is not None else self._random.randrange(4)  # 起家を決定する
         # ルールに従い最大局数を決定する
         self._max_jushu = 0 if self._rule['n_zhuang'] == 0 else self._rule['n_zhuang'] * 4 - 1
 
@@ -320,19 +471,28 @@ class Game:
             'point': [],
             'rank': []
         }
+        self._round = -1
+        if self._sink is not None:
+            self._sink_game = self._sink.kaiju({
+                'title': self._paipu['title'],
+                'player': self._paipu['player'],
+                'qijia': self._paipu['qijia'],
+                'rule': self._rule
+            })
 
         # 3. 対局者に通知メッセージを送信する
+        kaiju = freeze({
+            'kaiju': {
+                'id': 0,    # 席順
+                'rule': self._rule,     # ルール
+                'title': self._paipu['title'],  # 牌譜のタイトル
+                'player': self._paipu['player'],    # 対局者情報
+                'qijia': self._paipu['qijia']   # 起家
+            }
+        })
         msg = [{}] * 4
         for id in range(4):
-            msg[id] = json.loads(json.dumps({
-                'kaiju': {
-                    'id': id,   # 席順
-                    'rule': self._rule,     # ルール
-                    'title': self._paipu['title'],  # 牌譜のタイトル
-                    'player': self._paipu['player'],    # 対局者情報
-                    'qijia': self._paipu['qijia']   # 起家
-                }
-            }))
+            msg[id] = masked(kaiju, ('kaiju', 'id'), id)
         self.call_players('kaiju', msg, 0)
 
         # 4. (必要であれば)描画を指示する
@@ -351,7 +511,7 @@ class Game:
 
         # 1. 卓情報の更新
         model = self._model
-        model['shan'] = shan or Shan(self._rule)    # 牌山を生成
+        model['shan'] = shan or Shan(self._rule, self._random)    # 牌山を生成
 
         for i in range(4):  # 東家から順に処理
             qipai = []
@@ -364,6 +524,10 @@ class Game:
 
         model['lunban'] = -1    # 手版を初期化
 
+        # 見えている牌をドラ表示牌のみにする
+        model['visible'] = [0] * N_PAI
+        model['visible'][pai_id(model['shan'].baopai[0])] += 1
+
         # その他のインスタンス変数に初期値を設定する
         self._diyizimo = True
         self._fengpai = self._rule['interrupted_pingju']
@@ -375,6 +539,8 @@ class Game:
         self._yifa = [False] * 4
         self._n_gang = [0] * 4
         self._neng_rong = [True] * 4
+        self._hulepai = [None] * 4  # 対局者ごとの(手牌, 和了牌)のキャッシュ
+        self._ronpai = {}   # 和了牌 -> その牌で和了形となる手番の集合
 
         self._hule = []
         self._hule_option = None
@@ -385,8 +551,10 @@ class Game:
 
         # 2. 牌譜を追加する
         self._paipu['defen'] = model['defen'][:]
-        self._paipu['log'].append([])
-        paipu = {
+        self._round += 1
+        if self._record:
+            self._paipu['log'].append([])
+        paipu = freeze({
             'qipai': {
                 'zhuangfeng': model['zhuangfeng'],  # 場風
                 'jushu': model['jushu'],    # 局数
@@ -396,16 +564,15 @@ class Game:
                 'baopai': model['shan'].baopai[0],  # ドラ表示牌
                 'shoupai': list(map(lambda shoupai: str(shoupai), model['shoupai']))    # 配牌
             }
-        }
+        })
         self.add_paipu(paipu)
 
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
-            for j in range(4):
-                if j != i:
-                    msg[i]['qipai']['shoupai'][j] = ''  # 他の対局者はマスクする
+            # 他の対局者はマスクする
+            shoupai = ['' if j != i else p for j, p in enumerate(paipu['qipai']['shoupai'])]
+            msg[i] = self._message(paipu, i, ('qipai', 'shoupai'), shoupai)
 
         self.call_players('qipai', msg, 0)
 
@@ -425,15 +592,16 @@ class Game:
         model['shoupai'][model['lunban']].zimo(zimo)    # それを手に加える
 
         # 2. 牌譜を追加する
-        paipu = {'zimo': {'l': model['lunban'], 'p': zimo}}
+        paipu = freeze({'zimo': {'l': model['lunban'], 'p': zimo}})
         self.add_paipu(paipu)
 
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
-            if i != model['lunban']:
-                msg[i]['zimo']['p'] = ''    # 他者のツモ牌はマスクする
+            if i == model['lunban']:
+                msg[i] = paipu
+            else:
+                msg[i] = self._message(paipu, i, ('zimo', 'p'))   # 他者のツモ牌はマスクする
 
         self.call_players('zimo', msg)
 
@@ -458,8 +626,13 @@ class Game:
         if not model['shoupai'][model['lunban']].lizhi:     # リーチ前なら
             self._neng_rong[model['lunban']] = True     # フリテンを解除
 
+        # ツモ牌をそのまま打牌した場合以外は和了牌が変わりうる
+        if model['shoupai'][model['lunban']]._zimo != dapai[:2]:
+            self._clear_hulepai(model['lunban'])
+
         model['shoupai'][model['lunban']].dapai(dapai)  # 手牌から dapai を取り出す
         model['he'][model['lunban']].dapai(dapai)   # dapai を河に捨てる
+        model['visible'][pai_id(dapai)] += 1
 
         if self._diyizimo:  # 第1ツモ巡なら、四風連打が継続中か判定
             if not re.search(r'^z[1234]', dapai):
@@ -473,15 +646,13 @@ class Game:
             self._lizhi[model['lunban']] = 2 if self._diyizimo else 1   # ダブルリーチか判定
             self._yifa[model['lunban']] = self._rule['yifa']    # 一発アリルールならフラグをONに
 
-        if (xiangting(model['shoupai'][model['lunban']]) == 0
-                and any(map(lambda p: model['he'][model['lunban']].find(p),
-                            tingpai(model['shoupai'][model['lunban']])))):
+        if any(map(model['he'][model['lunban']].find, self.get_hulepai(model['lunban']))):
             self._neng_rong[model['lunban']] = False    # フリテン判断する
 
         self._dapai = dapai     # 最後の打牌を保存
 
         # 2. 牌譜の追加
-        paipu = {'dapai': {'l': model['lunban'], 'p': dapai}}
+        paipu = freeze({'dapai': {'l': model['lunban'], 'p': dapai}})
         self.add_paipu(paipu)
 
         # 開槓が必要なら行う
@@ -491,7 +662,7 @@ class Game:
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.call_players('dapai', msg)
 
         # 4. 必要であれば描画する
@@ -522,19 +693,22 @@ class Game:
         model['lunban'] = (model['lunban'] + '_-=+'.find(d)) % 4
 
         model['shoupai'][model['lunban']].fulou(fulou)  # 副露者の手牌に副露面子を加える
+        self._clear_hulepai(model['lunban'])
+        for i in mianzi_id(fulou):  # 鳴いた牌以外の面子の牌が見えるようになる
+            model['visible'][i] += 1
 
         if re.search(r'^[mpsz]\d{4}', fulou):   # 大明槓の場合
             self._gang = fulou  # 未開槓状態にする
             self._n_gang[model['lunban']] += 1  # 副露者のカン数を増やす
 
         # 2. 牌譜を追加
-        paipu = {'fulou': {'l': model['lunban'], 'm': fulou}}
+        paipu = freeze({'fulou': {'l': model['lunban'], 'm': fulou}})
         self.add_paipu(paipu)
 
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.call_players('fulou', msg)
 
         # 4. 必要であれば描画する
@@ -554,9 +728,12 @@ class Game:
         # 1. 卓情報の更新
         model = self._model
         model['shoupai'][model['lunban']].gang(gang)
+        self._clear_hulepai(model['lunban'])
+        for i in mianzi_id(gang, True):
+            model['visible'][i] += 1
 
         # 2. 牌譜の追加
-        paipu = {'gang': {'l': model['lunban'], 'm': gang}}
+        paipu = freeze({'gang': {'l': model['lunban'], 'm': gang}})
         self.add_paipu(paipu)
 
         # 開槓が必要なら先に行う
@@ -569,7 +746,7 @@ class Game:
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.call_players('gang', msg)
 
         # 4. 必要であれば描画する
@@ -587,7 +764,7 @@ class Game:
         model['shoupai'][model['lunban']].zimo(zimo)
 
         # 2. 牌譜を追加
-        paipu = {'gangzimo': {'l': model['lunban'], 'p': zimo}}
+        paipu = freeze({'gangzimo': {'l': model['lunban'], 'p': zimo}})
         self.add_paipu(paipu)
 
         # カンドラ即乗せ、あるいは暗槓の場合、開槓を行う
@@ -597,9 +774,10 @@ class Game:
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
-            if i != model['lunban']:
-                msg[i]['gangzimo']['p'] = ''    # 他者のツモ牌はマスクする
+            if i == model['lunban']:
+                msg[i] = paipu
+            else:
+                msg[i] = self._message(paipu, i, ('gangzimo', 'p'))   # 他者のツモ牌はマスクする
         self.call_players('gangzimo', msg)
 
         # 4. 必要であれば描画する
@@ -619,15 +797,16 @@ class Game:
         model = self._model
         model['shan'].kaigang()     # 開槓する
         baopai = model['shan'].baopai.pop()     # カンドラ表示牌を取得する
+        model['visible'][pai_id(baopai)] += 1
 
         # 2. 牌譜を追加する
-        paipu = {'kaigang': {'baopai': baopai}}
+        paipu = freeze({'kaigang': {'baopai': baopai}})
         self.add_paipu(paipu)
 
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.notify_players('kaigang', msg)
 
         # 4. 必要であれば描画する
@@ -717,12 +896,13 @@ class Game:
         for key in ['fu', 'fanshu', 'damanguan']:
             if not paipu['hule'][key]:
                 del paipu['hule'][key]
+        paipu = freeze(paipu)
         self.add_paipu(paipu)
 
         # 3. 対局者に通知メッセージを送信
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.call_players('hule', msg, self._wait)
 
         # 4. 必要であれば描画する
@@ -764,7 +944,7 @@ class Game:
                     # 意味があるのはテンパイ連荘のルールのときの親のみ
                     shoupai[i] = ''
 
-                elif xiangting(model['shoupai'][i]) == 0 and len(tingpai(model['shoupai'][i])) > 0:
+                elif self.get_hulepai(i):
                     # それ以外でテンパイしている場合は手牌を公開する
                     n_tingpai += 1
                     shoupai[i] = str(model['shoupai'][i])
@@ -826,15 +1006,15 @@ class Game:
         self._fenpei = fenpei  # その局の点棒移動を保存
 
         # 2. 牌譜を追加する
-        paipu = {
+        paipu = freeze({
             'pingju': {'name': name, 'shoupai': shoupai, 'fenpei': fenpei}
-        }
+        })
         self.add_paipu(paipu)
 
         # 3. 対局者に通知メッセージを送信する
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.call_players('pingju', msg, self._wait)
 
         # 4. 必要であれば描画する
@@ -932,11 +1112,19 @@ class Game:
             point[paiming[0]] -= point[id]
         self._paipu['point'] = list(map(lambda p: ("{:.0f}" if round_ else "{:.1f}").format(p), point))
 
+        if self._sink is not None:
+            self._sink.jieju(self._sink_game, {
+                'defen': self._paipu['defen'],
+                'rank': self._paipu['rank'],
+                'point': self._paipu['point']
+            })
+
         # 対局者に通知メッセージを送信する
-        paipu = {'jieju': self._paipu}
+        # 牌譜全体は複製せず、記録済みの局進行を共有した変更できない形式で渡す
+        paipu = freeze({'jieju': self._paipu})
         msg = [{}] * 4
         for i in range(4):
-            msg[i] = json.loads(json.dumps(paipu))
+            msg[i] = self._message(paipu, i)
         self.call_players('jieju', msg, self._wait)
 
         # (必要であれば)描画を指示する
@@ -1003,8 +1191,12 @@ class Game:
         model = self._model
 
         # 下家→対面→上家の順に和了応答を処理する
+        # 打牌で和了形となる対局者がいなければ和了の判定は行わない
+        ronjia = self._ronjia(self._dapai)
         for i in range(1, 4):
             j = (model['lunban'] + i) % 4
+            if j not in ronjia:
+                continue
             reply = self.get_reply(j)
             if 'hule' in reply and self.allow_hule(j):  # 応答が和了の場合
                 if self._rule['n_max_simultaneous_hule'] == 1 and len(self._hule):
@@ -1014,10 +1206,8 @@ class Game:
                     self._view.say('rong', j)   # (必要なら)「ロン」と発声する
                 self._hule.append(j)    # 和了者に追加する
             else:
-                shoupai = model['shoupai'][j].clone().zimo(self._dapai)
-                if xiangting(shoupai) == -1:
-                    # 打牌で和了形となる場合はフリテンとする
-                    self._neng_rong[j] = False
+                # 打牌で和了形となる場合はフリテンとする
+                self._neng_rong[j] = False
 
         # 和了応答があった場合の処理を行う
         # ダブロンありで3人和了の場合
@@ -1120,8 +1310,11 @@ class Game:
             return self.delay(lambda: self.gangzimo(), 0)
 
         # 加槓は槍槓可能なので、下家→対面→上家の順に和了応答を処理する
+        ronjia = self._ronjia(self._gang[0] + self._gang[-1])
         for i in range(1, 4):
             j = (model['lunban'] + i) % 4
+            if j not in ronjia:
+                continue
             reply = self.get_reply(j)
             if 'hule' in reply and self.allow_hule(j):  # 応答が和了の場合
                 if self._rule['n_max_simultaneous_hule'] == 1 and len(self._hule):
@@ -1131,11 +1324,8 @@ class Game:
                     self._view.say('rong', j)   # (必要なら)「ロン」と発声する
                 self._hule.append(j)    # 和了者に追加する
             else:   # 応答が和了でない場合
-                p = self._gang[0] + self._gang[-1]
-                shoupai = model['shoupai'][j].clone().zimo(p)
-                if xiangting(shoupai) == -1:
-                    # カンの牌で和了形となる場合はフリテンとする
-                    self._neng_rong[j] = False
+                # カンの牌で和了形となる場合はフリテンとする
+                self._neng_rong[j] = False
 
         # 和了応答があった場合の処理を行う
         if len(self._hule):
@@ -1176,6 +1366,77 @@ class Game:
         # 終局判断する
         self.delay(lambda: self.last(), 0)
 
+    def get_hulepai(self, l: int) -> list[str]:
+        """
+        手番``l``の対局者の和了牌の一覧
+
+        打牌後(副露直後以外)の手牌について求め、結果は手牌が変わる
+        (ツモ切り以外の打牌・副露・槓)まで再利用する
+
+        Parameters
+        ----------
+        l : int
+            手番
+
+        Returns
+        -------
+        list[str]
+            和了牌の一覧 (テンパイしていない場合は空)。変更しないこと
+        """
+        shoupai = self._model['shoupai'][l]
+        if shoupai._zimo is not None:   # 打牌前は求めない
+            return xiangting(shoupai) == 0 and tingpai(shoupai) or []
+        cache = self._hulepai[l]
+        if cache is None or cache[0] is not shoupai:
+            self._clear_hulepai(l)
+            cache = self._hulepai[l] = (shoupai, xiangting(shoupai) == 0 and tingpai(shoupai) or [])
+            for p in cache[1]:  # 和了牌の索引に登録する
+                self._ronpai.setdefault(p, set()).add(l)
+        return cache[1]
+
+    def get_rest(self, p: str, l: int | None = None) -> int:
+        """
+        牌``p``の残り枚数を取得
+
+        全員の河・副露牌とドラ表示牌に見えている枚数を除いた枚数を返す。
+        ``l``を指定した場合は、その手番の手牌の枚数も除く
+
+        Parameters
+        ----------
+        p : str
+            牌
+        l : int or None, default None
+            手番
+
+        Returns
+        -------
+        int
+            残り枚数
+        """
+        n = 4 - self._model['visible'][pai_id(p)]
+        if l is not None:
+            n -= self._model['shoupai'][l]._bingpai[p[0]][int(p[1]) or 5]
+        return n
+
+    def _clear_hulepai(self, l: int):
+
+        # 手番 l の和了牌のキャッシュと索引を破棄する
+        cache = self._hulepai[l]
+        if cache is not None:
+            for p in cache[1]:
+                self._ronpai[p].discard(l)
+            self._hulepai[l] = None
+
+    def _ronjia(self, p: str) -> set[int]:
+
+        # 牌 p で和了形となる、現在の手番以外の対局者の集合を返す
+        # (手牌が変わっていない対局者は再計算しない)
+        lunban = self._model['lunban']
+        for l in range(4):
+            if l != lunban:
+                self.get_hulepai(l)
+        return self._ronpai.get(p[0] + str(int(p[1]) or 5), set())
+
     def get_dapai(self):
         """
         打牌可能な牌の一覧
@@ -1535,12 +1796,9 @@ class Game:
             # p を打牌した牌姿がテンパイしていればリーチ可
             return xiangting(new_shoupai) == 0 and len(tingpai(new_shoupai)) > 0
         else:   # 牌 p の指定なし
-            dapai = []
-            # 打牌可能な牌について以下を行う
-            for p in Game.get_dapai_(rule_, shoupai):
-                new_shoupai = shoupai.clone().dapai(p)
-                if xiangting(new_shoupai) == 0 and len(tingpai(new_shoupai)) > 0:
-                    dapai.append(p)     # 打牌後の牌姿がテンパイしていればリーチ可
+            # 打牌可能な牌をまとめて評価し、打牌後の牌姿がテンパイしていればリーチ可
+            result = xiangting_dapai(shoupai, Game.get_dapai_(rule_, shoupai))
+            dapai = [p for p, r in result.items() if r['xiangting'] == 0 and r['tingpai']]
             # リーチ可能な牌がない場合は False を返す
             return dapai if len(dapai) else False
 
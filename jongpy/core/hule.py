@@ -2,13 +2,18 @@
 
 import re
 import math
-from typing import Any
+from functools import lru_cache
+from typing import Any, NamedTuple
 from jongpy.core.shoupai import Shoupai
 from jongpy.core.shan import Shan
+from jongpy.core.pai import OFFSET
 from jongpy.core.rule import rule
 from jongpy.core.exceptions import InvalidOperationError
 
 
+HULE_CACHE_SIZE = 4096  # 和了形・役判定キャッシュの最大件数
+
+
 def _mianzi(s: str, bingpai: list[int], n: int = 1) -> list[list[str]]:
     """同色内の面子を全て求める"""
 
@@ -241,24 +246,74 @@ def hule_mianzi(shoupai: Shoupai, rongpai: str | None = None) -> list[list[str]]
             + hule_mianzi_jiulian(new_shoupai, hulepai))    # 九蓮宝燈形
 
 
-def get_hudi(mianzi: list[str], zhuangfeng: int, menfeng: int) -> dict[str, int | bool | dict[str, list[int]]]:
-    """和了形の符を計算する"""
+class Mianzi(NamedTuple):
+    """和了形のブロック(面子・雀頭など)の構成情報"""
 
-    # パターンマッチ用の正規表現
-    zhuangfengpai = re.compile(f'^z{zhuangfeng+1}.*$')  # 場風
-    menfengpai = re.compile(f'^z{menfeng+1}.*$')    # 自風
-    sanyuanpai = re.compile(r'^z[567].*$')  # 三元牌
+    s: str  # 色 (m, p, s, z)
+    nn: tuple[int, ...]     # 数字の並び (赤牌は5)
+    d: str  # 鳴きの方向 (+, =, -)。鳴いていない場合は ''
+    hule_d: str     # 和了牌の方向 (+, =, -, ツモは _)。和了牌を含まない場合は ''
+    hule_i: int     # 和了牌の nn 内の位置。和了牌を含まない場合は -1
 
-    yaojiu = re.compile(r'^.*[z19].*$')     # 幺九牌
-    zipai = re.compile(r'^z.*$')    # 字牌
+    @property
+    def menqian(self) -> bool:
+        """鳴いていないかどうか"""
+        return not self.d
 
-    kezi = re.compile(r'^[mpsz](\d)\1\1.*$')    # 刻子
-    ankezi = re.compile(r'^[mpsz](\d)\1\1(?:\1|_\!)?$')     # 暗刻
-    gangzi = re.compile(r'^[mpsz](\d)\1\1.*\1.*$')  # 槓子
+    @property
+    def kezi(self) -> bool:
+        """刻子(槓子を含む)かどうか"""
+        return len(self.nn) >= 3 and self.nn[0] == self.nn[1] == self.nn[2]
 
-    danqi = re.compile(r'^[mpsz](\d)\1[\+\=\-\_]\!$')   # 単騎待ち
-    kanzhang = re.compile(r'^[mps]\d\d[\+\=\-\_]\!\d$')     # 嵌張待ち
-    bianzhang = re.compile(r'^[mps](123[\+\=\-\_]\!|7[\+\=\-\_]\!89)$')     # 辺張待ち
+    @property
+    def gangzi(self) -> bool:
+        """槓子かどうか"""
+        return len(self.nn) == 4 and self.kezi
+
+    @property
+    def yaojiu(self) -> bool:
+        """幺九牌を含むかどうか"""
+        return self.s == 'z' or 1 in self.nn or 9 in self.nn
+
+
+@lru_cache(maxsize=None)
+def parse_mianzi(m: str) -> Mianzi:
+    """
+    ブロックの文字列表現を構成情報に変換する
+
+    和了形のブロックの文字列表現は有限なので、結果はすべてキャッシュする
+
+    Parameters
+    ----------
+    m : str
+        ブロックの文字列表現 (``hule_mianzi``の要素)
+
+    Returns
+    -------
+    Mianzi
+        ブロックの構成情報
+    """
+
+    nn = []
+    d = ''
+    hule_d = ''
+    hule_i = -1
+    for i in range(1, len(m)):
+        c = m[i]
+        if c.isdigit():
+            nn.append(int(c) or 5)
+        elif c in '+=-_':
+            if i + 1 < len(m) and m[i + 1] == '!':   # 和了牌のマーク
+                hule_d = c
+                hule_i = len(nn) - 1
+            else:   # 鳴きの方向
+                d = c
+
+    return Mianzi(m[0], tuple(nn), d, hule_d, hule_i)
+
+
+def get_hudi(mianzi: list[str], zhuangfeng: int, menfeng: int) -> dict[str, int | bool | dict[str, list[int]]]:
+    """和了形の符を計算する"""
 
     # 面子構成情報の初期値
     hudi = {
@@ -289,63 +344,64 @@ def get_hudi(mianzi: list[str], zhuangfeng: int, menfeng: int) -> dict[str, int
     }
 
     # 和了形の各ブロックについて処理を行う
-    for m in mianzi:
+    for i, m in enumerate(map(parse_mianzi, mianzi)):
 
-        if re.search(r'[\+\=\-](?!\!)', m):
+        if m.d:
             hudi['menqian'] = False     # 副露している場合 False に変更
-        if re.search(r'[\+\=\-]\!', m):
+        if m.hule_d and m.hule_d != '_':
             hudi['zimo'] = False    # ロン和了の場合 False に変更
 
         if len(mianzi) == 1:    # 九蓮宝燈の場合、以下は処理しない
             continue
 
-        if re.search(danqi, m):
+        if m.hule_d and len(m.nn) == 2 and m.nn[0] == m.nn[1] and m.hule_i == 1:
             hudi['danqi'] = True    # 単騎待ちの場合 True
 
         if len(mianzi) == 13:   # 国士無双の場合、以下は処理しない
             continue
 
-        if re.search(yaojiu, m):
+        if m.yaojiu:
             hudi['n_yaojiu'] += 1   # 幺九牌を含むブロック数を加算
-        if re.search(zipai, m):
+        if m.s == 'z':
             hudi['n_zipai'] += 1    # 字牌を含むブロック数を加算
 
         if len(mianzi) != 5:    # 七対子の場合、以下は処理しない
             continue
 
-        if m == mianzi[0]:  # 雀頭の処理
+        if i == 0:  # 雀頭の処理
             fu = 0  # 雀頭の符を 0 で初期化
-            if re.search(zhuangfengpai, m):
-                fu += 2     # 場風の場合、2符加算
-            if re.search(menfengpai, m):
-                fu += 2     # 自風の場合、2符加算
-            if re.search(sanyuanpai, m):
-                fu += 2     # 三元牌の場合、2符加算
+            if m.s == 'z':
+                if m.nn[0] == zhuangfeng + 1:
+                    fu += 2     # 場風の場合、2符加算
+                if m.nn[0] == menfeng + 1:
+                    fu += 2     # 自風の場合、2符加算
+                if m.nn[0] >= 5:
+                    fu += 2     # 三元牌の場合、2符加算
             hudi['fu'] += fu    # 雀頭の符を加算
             if hudi['danqi']:
                 hudi['fu'] += 2     # 単騎待ちの場合、2符加算
 
-        elif re.search(kezi, m):    # 刻子の処理
+        elif m.kezi:    # 刻子の処理
             hudi['n_kezi'] += 1     # 刻子の数を加算
             fu = 2  # 刻子の符を 2 で初期化
-            if re.search(yaojiu, m):
+            if m.yaojiu:
                 fu *= 2     # 幺九牌の場合、符を2倍にする
-            if re.search(ankezi, m):
+            if m.menqian and m.hule_d in ('', '_'):
                 fu *= 2     # 暗刻の場合、符を2倍にする
                 hudi['n_ankezi'] += 1
-            if re.search(gangzi, m):
+            if m.gangzi:
                 fu *= 4     # 槓子の場合、符を4倍にする
                 hudi['n_gangzi'] += 1
             hudi['fu'] += fu    # 刻子の符を加算
-            hudi['kezi'][m[0]][int(m[1])] += 1   # 刻子の構成情報に追加
+            hudi['kezi'][m.s][m.nn[0]] += 1   # 刻子の構成情報に追加
 
         else:   # 順子の処理
             hudi['n_shunzi'] += 1   # 順子の数を加算
-            if re.search(kanzhang, m):
-                hudi['fu'] += 2     # 辺張待ちの場合、2符加算
-            if re.search(bianzhang, m):
+            if m.hule_i == 1:
                 hudi['fu'] += 2     # 嵌張待ちの場合、2符加算
-            hudi['shunzi'][m[0]][int(m[1])] += 1     # 順子の構成情報に追加
+            if m.hule_i == 2 and m.nn[0] == 1 or m.hule_i == 0 and m.nn[0] == 7:
+                hudi['fu'] += 2     # 辺張待ちの場合、2符加算
+            hudi['shunzi'][m.s][m.nn[0]] += 1     # 順子の構成情報に追加
 
     # 和了全体に関する加符を行う
     if len(mianzi) == 7:    # 七対子の場合
@@ -396,7 +452,7 @@ class HupaiSolver:
     """役の判定処理をまとめたクラス"""
 
     def __init__(self, mianzi: list[str], hudi: dict[str, int | bool | dict[str, list[int]]], rule: dict[str, Any]):
-        self._mianzi = mianzi
+        self._mianzi = [parse_mianzi(m) for m in mianzi]
         self._hudi = hudi
         self._rule = rule
 
@@ -510,15 +566,15 @@ class HupaiSolver:
     def xiaosanyuan(self):
         """小三元"""
         kezi = self._hudi['kezi']
-        if ((kezi['z'][5] + kezi['z'][6] + kezi['z'][7]) == 2) and re.match(r'z[567]', self._mianzi[0]):
+        jiangpai = self._mianzi[0]
+        if ((kezi['z'][5] + kezi['z'][6] + kezi['z'][7]) == 2) and jiangpai.s == 'z' and jiangpai.nn[0] >= 5:
             return [{'name': '小三元', 'fanshu': 2}]
         return []
 
     def hunyise(self):
         """混一色"""
         for s in ['m', 'p', 's']:
-            yise = re.compile(f'^[z{s}]')
-            if len([m for m in self._mianzi if re.search(yise, m)]) == len(self._mianzi) and self._hudi['n_zipai'] > 0:
+            if all(m.s in ('z', s) for m in self._mianzi) and self._hudi['n_zipai'] > 0:
                 return [{'name': '混一色', 'fanshu': (3 if self._hudi['menqian'] else 2)}]
         return []
 
@@ -541,8 +597,7 @@ class HupaiSolver:
     def qingyise(self):
         """清一色"""
         for s in ['m', 'p', 's']:
-            yise = re.compile(f'^[{s}]')
-            if len([m for m in self._mianzi if re.search(yise, m)]) == len(self._mianzi):
+            if all(m.s == s for m in self._mianzi):
                 return [{'name': '清一色', 'fanshu': (6 if self._hudi['menqian'] else 5)}]
         return []
 
@@ -568,10 +623,12 @@ class HupaiSolver:
         """大三元"""
         kezi = self._hudi['kezi']
         if kezi['z'][5] + kezi['z'][6] + kezi['z'][7] == 3:
-            bao_mianzi = [m for m in self._mianzi if re.match(r'z([567])\1\1(?:[\+\=\-]|\1)(?!\!)', m)]
-            baojia = len(bao_mianzi) == 3 and re.search(r'[\+\=\-]', bao_mianzi[2])
+            # 副露あるいは槓子の三元牌の刻子を鳴いた順に並べ、3つ目を鳴かせた者をパオとする
+            bao_mianzi = [m for m in self._mianzi if m.s == 'z' and m.nn[0] >= 5 and m.kezi
+                          and (m.d or m.gangzi)]
+            baojia = len(bao_mianzi) == 3 and bao_mianzi[2].d
             if baojia:
-                return [{'name': '大三元', 'fanshu': '*', 'baojia': baojia.group()}]
+                return [{'name': '大三元', 'fanshu': '*', 'baojia': baojia}]
             else:
                 return [{'name': '大三元', 'fanshu': '*'}]
         return []
@@ -580,13 +637,16 @@ class HupaiSolver:
         """四喜和"""
         kezi = self._hudi['kezi']
         if kezi['z'][1] + kezi['z'][2] + kezi['z'][3] + kezi['z'][4] == 4:
-            bao_mianzi = [m for m in self._mianzi if re.match(r'z([1234])\1\1(?:[\+\=\-]|\1)(?!\!)', m)]
-            baojia = len(bao_mianzi) == 4 and re.search(r'[\+\=\-]', bao_mianzi[3])
+            # 副露あるいは槓子の風牌の刻子を鳴いた順に並べ、4つ目を鳴かせた者をパオとする
+            bao_mianzi = [m for m in self._mianzi if m.s == 'z' and m.nn[0] <= 4 and m.kezi
+                          and (m.d or m.gangzi)]
+            baojia = len(bao_mianzi) == 4 and bao_mianzi[3].d
             if baojia:
-                return [{'name': '大四喜', 'fanshu': '**', 'baojia': baojia.group()}]
+                return [{'name': '大四喜', 'fanshu': '**', 'baojia': baojia}]
             else:
                 return [{'name': '大四喜', 'fanshu': '**'}]
-        if kezi['z'][1] + kezi['z'][2] + kezi['z'][3] + kezi['z'][4] == 3 and re.match(r'z[1234]', self._mianzi[0]):
+        jiangpai = self._mianzi[0]
+        if kezi['z'][1] + kezi['z'][2] + kezi['z'][3] + kezi['z'][4] == 3 and jiangpai.s == 'z' and jiangpai.nn[0] <= 4:
             return [{'name': '小四喜', 'fanshu': '*'}]
         return []
 
@@ -598,11 +658,11 @@ class HupaiSolver:
 
     def lvyise(self):
         """緑一色"""
-        if len([m for m in self._mianzi if re.match(r'[mp]', m)]) > 0:
+        if any(m.s in ('m', 'p') for m in self._mianzi):
             return []
-        if len([m for m in self._mianzi if re.match(r'z[^6]', m)]) > 0:
+        if any(m.s == 'z' and m.nn[0] != 6 for m in self._mianzi):
             return []
-        if len([m for m in self._mianzi if re.match(r's.*[1579]', m)]) > 0:
+        if any(m.s == 's' and any(n in (1, 5, 7, 9) for n in m.nn) for m in self._mianzi):
             return []
         return [{'name': '緑一色', 'fanshu': '*'}]
 
@@ -622,31 +682,246 @@ class HupaiSolver:
         """九蓮宝燈"""
         if len(self._mianzi) != 1:
             return []
-        if re.search(r'^[mpsz]1112345678999', self._mianzi[0]):
+        if self._mianzi[0].nn[:13] == (1, 1, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9):
             return [{'name': '純正九蓮宝燈', 'fanshu': '**'}]
         else:
             return [{'name': '九蓮宝燈', 'fanshu': '*'}]
 
 
-def get_hupai(
+class HupaiMask(NamedTuple):
+    """和了形をビットマスクで要約したもの (ビットの位置は牌番号)"""
+
+    se: int     # 含まれる色 (萬子: 1, 筒子: 2, 索子: 4, 字牌: 8)
+    pai: int    # 含まれる牌
+    shunzi: int     # 順子の先頭の牌
+    kezi: int   # 刻子(槓子を含む)の牌
+    n_beikou: int   # 同じ順子の組の数
+    jiangpai: int   # 雀頭の牌番号 (一般形以外は -1)
+
+
+_SE_BIT = {'m': 1, 'p': 2, 's': 4, 'z': 8}
+
+# 緑一色を構成できる牌 (s2, s3, s4, s6, s8, z6)
+_LVYISE_MASK = sum(1 << (OFFSET[p[0]] + int(p[1]) - 1) for p in ['s2', 's3', 's4', 's6', 's8', 'z6'])
+
+_SANYUAN_MASK = 0b111 << (OFFSET['z'] + 4)  # 三元牌
+_SIXI_MASK = 0b1111 << OFFSET['z']  # 風牌
+_YIQITONGGUAN_MASK = 0b1001001  # 一気通貫となる順子の先頭 (1, 4, 7)
+
+
+@lru_cache(maxsize=None)
+def _mianzi_mask(m: str) -> tuple[int, int, int]:
+    """ブロックの色、含まれる牌、先頭の牌番号をビットマスクにする"""
+
+    b = parse_mianzi(m)
+    o = OFFSET[b.s]
+    pai = 0
+    for n in b.nn:
+        pai |= 1 << (o + n - 1)
+    return _SE_BIT[b.s], pai, o + b.nn[0] - 1
+
+
+def hupai_mask(mianzi: list[str]) -> HupaiMask:
+    """
+    和了形をビットマスクに要約する
+
+    Parameters
+    ----------
+    mianzi : list[str]
+        和了形 (``hule_mianzi``の要素)
+
+    Returns
+    -------
+    HupaiMask
+        和了形の要約
+    """
+
+    se = pai = shunzi = kezi = n_beikou = odd = 0
+    yiban = len(mianzi) == 5
+    for i, m in enumerate(mianzi):
+        s_bit, p_bit, n = _mianzi_mask(m)
+        se |= s_bit
+        pai |= p_bit
+        if not yiban or i == 0:     # 順子・刻子は一般形の雀頭以外のみ
+            continue
+        if parse_mianzi(m).kezi:
+            kezi |= 1 << n
+        else:
+            shunzi |= 1 << n
+            # 同じ順子が2つ揃うごとに組の数を加算する
+            if odd >> n & 1:
+                n_beikou += 1
+            odd ^= 1 << n
+
+    jiangpai = _mianzi_mask(mianzi[0])[2] if yiban else -1
+    return HupaiMask(se, pai, shunzi, kezi, n_beikou, jiangpai)
+
+
+# 通常役の判定結果 (組になっているものは 面前でない場合, 面前の場合 の順)
+_FENG_HANZI = ['東', '南', '西', '北']
+_MENQIANQING = {'name': '門前清自摸和', 'fanshu': 1}
+_ZHUANGFENG = [{'name': '場風 ' + f, 'fanshu': 1} for f in _FENG_HANZI]
+_MENFENG = [{'name': '自風 ' + f, 'fanshu': 1} for f in _FENG_HANZI]
+_SANYUAN = [{'name': '翻牌 ' + f, 'fanshu': 1} for f in ['白', '發', '中']]
+_PINGHU = {'name': '平和', 'fanshu': 1}
+_DUANYAOJIU = {'name': '断幺九', 'fanshu': 1}
+_YIBEIKOU = {'name': '一盃口', 'fanshu': 1}
+_SANSETONGSHUN = ({'name': '三色同順', 'fanshu': 1}, {'name': '三色同順', 'fanshu': 2})
+_YIQITONGGUAN = ({'name': '一気通貫', 'fanshu': 1}, {'name': '一気通貫', 'fanshu': 2})
+_HUNQUANDAIYAOJIU = ({'name': '混全帯幺九', 'fanshu': 1}, {'name': '混全帯幺九', 'fanshu': 2})
+_QIDUIZI = {'name': '七対子', 'fanshu': 2}
+_DUIDUIHU = {'name': '対々和', 'fanshu': 2}
+_SANANKE = {'name': '三暗刻', 'fanshu': 2}
+_SANGANGZI = {'name': '三槓子', 'fanshu': 2}
+_SANSETONGKE = {'name': '三色同刻', 'fanshu': 2}
+_HUNLAOTOU = {'name': '混老頭', 'fanshu': 2}
+_XIAOSANYUAN = {'name': '小三元', 'fanshu': 2}
+_HUNYISE = ({'name': '混一色', 'fanshu': 2}, {'name': '混一色', 'fanshu': 3})
+_CHUNQUANDAIYAOJIU = ({'name': '純全帯幺九', 'fanshu': 2}, {'name': '純全帯幺九', 'fanshu': 3})
+_ERBEIKOU = {'name': '二盃口', 'fanshu': 3}
+_QINGYISE = ({'name': '清一色', 'fanshu': 5}, {'name': '清一色', 'fanshu': 6})
+
+
+def _baojia(mianzi: list[str], mask: int, n: int) -> str | bool:
+    """副露あるいは槓子の刻子のうち``n``番目に鳴いた面子の鳴きの方向を求める"""
+
+    bao_mianzi = []
+    for m in mianzi:
+        b = parse_mianzi(m)
+        if b.s == 'z' and b.kezi and (b.d or b.gangzi) and mask >> _mianzi_mask(m)[2] & 1:
+            bao_mianzi.append(b)
+    return len(bao_mianzi) == n and bao_mianzi[n - 1].d
+
+
+def _get_hupai_bitmask(
     mianzi: list[str],
     hudi: dict[str, int | bool | dict[str, list[int]]],
-    pre_hupai: list[dict[str, str | int]],
-    post_hupai: list[dict[str, str | int]],
     rule: dict[str, Any]
-) -> list[dict[str, str | int]]:
-    """和了役を判定する"""
+) -> tuple[list[dict[str, str | int]], list[dict[str, str | int]]]:
+    """和了形のビットマスクから役満と通常役を求める (``HupaiSolver``と同じ結果となる)"""
+
+    mask = hupai_mask(mianzi)
+    n_mianzi = len(mianzi)
+    menqian = hudi['menqian']
+    kezi = mask.kezi
+    n_sanyuan = (kezi & _SANYUAN_MASK).bit_count()
+    n_sixi = (kezi & _SIXI_MASK).bit_count()
+    yise = mask.se & 7
+
+    # 役満の判定 (パオや待ちの情報を持つので辞書を都度生成する)
+    damanguan = []
+    if n_mianzi == 13:  # 国士無双
+        if hudi['danqi']:
+            damanguan.append({'name': '国士無双十三面', 'fanshu': '**'})
+        else:
+            damanguan.append({'name': '国士無双', 'fanshu': '*'})
+    if hudi['n_ankezi'] == 4:   # 四暗刻
+        if hudi['danqi']:
+            damanguan.append({'name': '四暗刻単騎', 'fanshu': '**'})
+        else:
+            damanguan.append({'name': '四暗刻', 'fanshu': '*'})
+    if n_sanyuan == 3:  # 大三元
+        baojia = _baojia(mianzi, _SANYUAN_MASK, 3)
+        if baojia:
+            damanguan.append({'name': '大三元', 'fanshu': '*', 'baojia': baojia})
+        else:
+            damanguan.append({'name': '大三元', 'fanshu': '*'})
+    if n_sixi == 4:     # 大四喜
+        baojia = _baojia(mianzi, _SIXI_MASK, 4)
+        if baojia:
+            damanguan.append({'name': '大四喜', 'fanshu': '**', 'baojia': baojia})
+        else:
+            damanguan.append({'name': '大四喜', 'fanshu': '**'})
+    elif n_sixi == 3 and _SIXI_MASK >> mask.jiangpai & 1:   # 小四喜
+        damanguan.append({'name': '小四喜', 'fanshu': '*'})
+    if hudi['n_zipai'] == n_mianzi:     # 字一色
+        damanguan.append({'name': '字一色', 'fanshu': '*'})
+    if not mask.pai & ~_LVYISE_MASK:    # 緑一色
+        damanguan.append({'name': '緑一色', 'fanshu': '*'})
+    if hudi['n_yaojiu'] == 5 and hudi['n_kezi'] == 4 and hudi['n_zipai'] == 0:  # 清老頭
+        damanguan.append({'name': '清老頭', 'fanshu': '*'})
+    if hudi['n_gangzi'] == 4:   # 四槓子
+        damanguan.append({'name': '四槓子', 'fanshu': '*'})
+    if n_mianzi == 1:   # 九蓮宝燈
+        if parse_mianzi(mianzi[0]).nn[:13] == (1, 1, 1, 2, 3, 4, 5, 6, 7, 8, 9, 9, 9):
+            damanguan.append({'name': '純正九蓮宝燈', 'fanshu': '**'})
+        else:
+            damanguan.append({'name': '九蓮宝燈', 'fanshu': '*'})
 
-    # 役満の初期値を設定する。状況役に役満(天和、地和)が含まれている場合は
-    # それを設定、ない場合は空配列で初期化する
-    damanguan = pre_hupai if len(pre_hupai) > 0 and isinstance(pre_hupai[0]['fanshu'], str) else []
+    for hupai in damanguan:
+        _fix_damanguan(hupai, rule)
+
+    # 役満がある場合は通常役の判定はしない
+    if len(damanguan) > 0:
+        return damanguan, []
+
+    # 通常役の判定 (判定結果の辞書は共有の定数を使う)
+    hupai = []
+    if menqian and hudi['zimo']:    # 面前清自摸和
+        hupai.append(_MENQIANQING)
+    if kezi >> (OFFSET['z'] + hudi['zhuangfeng']) & 1:  # 場風
+        hupai.append(_ZHUANGFENG[hudi['zhuangfeng']])
+    if kezi >> (OFFSET['z'] + hudi['menfeng']) & 1:     # 自風
+        hupai.append(_MENFENG[hudi['menfeng']])
+    for i in range(3):  # 三元牌
+        if kezi >> (OFFSET['z'] + 4 + i) & 1:
+            hupai.append(_SANYUAN[i])
+    if hudi['pinghu']:  # 平和
+        hupai.append(_PINGHU)
+    if hudi['n_yaojiu'] == 0 and (rule['fulou_duanyaojiu'] or menqian):     # 断幺九
+        hupai.append(_DUANYAOJIU)
+    if menqian and mask.n_beikou == 1:  # 一盃口
+        hupai.append(_YIBEIKOU)
+    shunzi = mask.shunzi
+    if shunzi & shunzi >> 9 & shunzi >> 18 & 0x7f:  # 三色同順
+        hupai.append(_SANSETONGSHUN[menqian])
+    if any(shunzi >> o & _YIQITONGGUAN_MASK == _YIQITONGGUAN_MASK for o in (0, 9, 18)):     # 一気通貫
+        hupai.append(_YIQITONGGUAN[menqian])
+    if hudi['n_yaojiu'] == 5 and hudi['n_shunzi'] > 0 and hudi['n_zipai'] > 0:  # チャンタ
+        hupai.append(_HUNQUANDAIYAOJIU[menqian])
+    if n_mianzi == 7:   # 七対子
+        hupai.append(_QIDUIZI)
+    if hudi['n_kezi'] == 4:     # 対々和
+        hupai.append(_DUIDUIHU)
+    if hudi['n_ankezi'] == 3:   # 三暗刻
+        hupai.append(_SANANKE)
+    if hudi['n_gangzi'] == 3:   # 三槓子
+        hupai.append(_SANGANGZI)
+    if kezi & kezi >> 9 & kezi >> 18 & 0x1ff:   # 三色同刻
+        hupai.append(_SANSETONGKE)
+    if hudi['n_yaojiu'] == n_mianzi and hudi['n_shunzi'] == 0 and hudi['n_zipai'] > 0:  # 混老頭
+        hupai.append(_HUNLAOTOU)
+    if n_sanyuan == 2 and _SANYUAN_MASK >> mask.jiangpai & 1:  # 小三元
+        hupai.append(_XIAOSANYUAN)
+    if yise in (1, 2, 4) and hudi['n_zipai'] > 0:   # 混一色
+        hupai.append(_HUNYISE[menqian])
+    if hudi['n_yaojiu'] == 5 and hudi['n_shunzi'] > 0 and hudi['n_zipai'] == 0:     # 純チャン
+        hupai.append(_CHUNQUANDAIYAOJIU[menqian])
+    if menqian and mask.n_beikou == 2:  # 二盃口
+        hupai.append(_ERBEIKOU)
+    if mask.se in (1, 2, 4):    # 清一色
+        hupai.append(_QINGYISE[menqian])
+
+    return damanguan, hupai
+
+
+def _get_hupai(
+    mianzi: list[str],
+    hudi: dict[str, int | bool | dict[str, list[int]]],
+    rule: dict[str, Any],
+    bitmask: bool = True
+) -> tuple[list[dict[str, str | int]], list[dict[str, str | int]]]:
+    """和了形から判定できる役満と通常役を求める"""
+
+    # ビットマスクで判定する場合
+    if bitmask:
+        return _get_hupai_bitmask(mianzi, hudi, rule)
 
     # 役判定クラス
     hs = HupaiSolver(mianzi, hudi, rule)
 
     # 判定できた役満を追加していく
-    damanguan = (damanguan  # 天和・地和
-                 + hs.goushiwushuang()  # 国士無双
+    damanguan = (hs.goushiwushuang()  # 国士無双
                  + hs.sianke()  # 四暗刻
                  + hs.dasanyuan()   # 大三元
                  + hs.sixihu()  # 四喜和
@@ -657,21 +932,14 @@ def get_hupai(
                  + hs.jiulianbaodeng())     # 九蓮宝燈
 
     for hupai in damanguan:
-        # 「ダブル役満なし」のルールの場合、判定済みダブル役満を通常の役満にダウングレードする
-        if not rule['double_damanguan']:
-            hupai['fanshu'] = '*'
-
-        # 「役満パオなし」のルールの場合、判定済みのパオ情報を削除する
-        if not rule['damanguan_baojia']:
-            del hupai['baojia']
+        _fix_damanguan(hupai, rule)
 
-    # 役満がある場合は通常役の判定はせず、役満のみを返す
+    # 役満がある場合は通常役の判定はしない
     if len(damanguan) > 0:
-        return damanguan
+        return damanguan, []
 
-    # 通常役を判定する。判定済みの状況役に判定できた役を追加していく
-    hupai = (pre_hupai  # 状況役
-             + hs.menqianging()     # 面前清自摸和
+    # 通常役を判定する
+    hupai = (hs.menqianging()     # 面前清自摸和
              + hs.fanpai()  # 翻牌
              + hs.pinghu()  # 平和
              + hs.duanyaojiu()  # タンヤオ
@@ -691,6 +959,42 @@ def get_hupai(
              + hs.erbeikou()    # 二盃口
              + hs.qingyise())   # 清一色
 
+    return damanguan, hupai
+
+
+def _fix_damanguan(hupai: dict[str, str | int], rule: dict[str, Any]):
+
+    # 「ダブル役満なし」のルールの場合、判定済みダブル役満を通常の役満にダウングレードする
+    if not rule['double_damanguan']:
+        hupai['fanshu'] = '*'
+
+    # 「役満パオなし」のルールの場合、判定済みのパオ情報を削除する
+    if not rule['damanguan_baojia']:
+        del hupai['baojia']
+
+
+def _merge_hupai(
+    damanguan: list[dict[str, str | int]],
+    hupai: list[dict[str, str | int]],
+    pre_hupai: list[dict[str, str | int]],
+    post_hupai: list[dict[str, str | int]],
+    rule: dict[str, Any]
+) -> list[dict[str, str | int]]:
+    """和了形から判定した役に状況役・懸賞役を合わせる"""
+
+    # 状況役に役満(天和、地和)が含まれている場合はそれを役満の先頭にする
+    pre_damanguan = pre_hupai if len(pre_hupai) > 0 and isinstance(pre_hupai[0]['fanshu'], str) else []
+    for h in pre_damanguan:
+        _fix_damanguan(h, rule)
+
+    # 役満がある場合は通常役は含めず、役満のみを返す
+    # (判定結果はキャッシュされるので複製して返す)
+    if len(pre_damanguan) + len(damanguan) > 0:
+        return pre_damanguan + [dict(h) for h in damanguan]
+
+    # 判定済みの状況役に通常役を追加していく
+    hupai = pre_hupai + [dict(h) for h in hupai]
+
     # 和了役がある場合は、さらに懸賞役を追加する
     if len(hupai) > 0:
         hupai.extend(post_hupai)
@@ -698,65 +1002,80 @@ def get_hupai(
     return hupai
 
 
-def get_post_hupai(
-    shoupai: Shoupai,
-    rongpai: str | None,
-    baopai: list[str],
-    fubaopai: list[str] | None
+def get_hupai(
+    mianzi: list[str],
+    hudi: dict[str, int | bool | dict[str, list[int]]],
+    pre_hupai: list[dict[str, str | int]],
+    post_hupai: list[dict[str, str | int]],
+    rule: dict[str, Any]
 ) -> list[dict[str, str | int]]:
-    """懸賞役一覧の作成"""
+    """和了役を判定する"""
 
-    # 手牌に和了牌を加え、文字列系に変換する
-    new_shoupai = shoupai.clone()
-    if rongpai:
-        new_shoupai.zimo(rongpai)
-    paistr = str(new_shoupai)
+    damanguan, hupai = _get_hupai(mianzi, hudi, rule)
+    return _merge_hupai(damanguan, hupai, pre_hupai, post_hupai, rule)
 
-    post_hupai = []
 
-    suitstr = re.findall(r'[mpsz][^mpsz,]*', paistr)
+def _count_pai(shoupai: Shoupai, rongpai: str | None) -> tuple[dict[str, list[int]], int]:
+    """和了牌・副露面子を含む手牌の牌ごとの枚数と赤牌の枚数を数える"""
 
-    # パターンマッチで保有するドラの枚数を取得する
-    n_baopai = 0
-    for p in baopai:
-        p = Shan.zhenbaopai(p)
-        regexp = re.compile(p[1])
-        for m in suitstr:
-            if m[0] != p[0]:
-                continue
-            m = m.replace('0', '5')
-            nn = re.findall(regexp, m)
-            if nn:
-                n_baopai += len(nn)
+    # 手牌の枚数をコピーする(赤牌は黒牌にも含まれている)
+    n_pai = {s: shoupai._bingpai[s][:] for s in ['m', 'p', 's', 'z']}
+    n_hongpai = sum(n_pai[s][0] for s in ['m', 'p', 's'])
+
+    # 副露面子と和了牌の枚数を加える
+    for pai in shoupai._fulou + ([rongpai] if rongpai else []):
+        s = pai[0]
+        for c in pai[1:]:
+            if c.isdigit():
+                n_pai[s][int(c) or 5] += 1
+                if c == '0':
+                    n_hongpai += 1
+
+    return n_pai, n_hongpai
+
+
+def _post_hupai(
+    n_pai: dict[str, list[int]],
+    n_hongpai: int,
+    zhenbaopai: list[str],
+    zhenfubaopai: list[str]
+) -> list[dict[str, str | int]]:
+    """ドラ牌の一覧から懸賞役一覧を作成"""
+
+    post_hupai = []
+
+    # 保有するドラの枚数を取得する
+    n_baopai = sum(n_pai[p[0]][int(p[1])] for p in zhenbaopai)
     if n_baopai:
         post_hupai.append({'name': 'ドラ', 'fanshu': n_baopai})
 
-    # パターンマッチで保有する赤ドラの枚数を取得する
-    n_hongpai = 0
-    nn = re.findall(r'0', paistr)
-    if nn:
-        n_hongpai = len(nn)
+    # 保有する赤ドラの枚数を取得する
     if n_hongpai:
         post_hupai.append({'name': '赤ドラ', 'fanshu': n_hongpai})
 
-    # パターンマッチで保有する裏ドラの枚数を取得する
-    n_fubaopai = 0
-    for p in (fubaopai or []):
-        p = Shan.zhenbaopai(p)
-        regexp = re.compile(p[1])
-        for m in suitstr:
-            if m[0] != p[0]:
-                continue
-            m = m.replace('0', '5')
-            nn = re.findall(regexp, m)
-            if nn:
-                n_fubaopai += len(nn)
+    # 保有する裏ドラの枚数を取得する
+    n_fubaopai = sum(n_pai[p[0]][int(p[1])] for p in zhenfubaopai)
     if n_fubaopai:
         post_hupai.append({'name': '裏ドラ', 'fanshu': n_fubaopai})
 
     return post_hupai
 
 
+def get_post_hupai(
+    shoupai: Shoupai,
+    rongpai: str | None,
+    baopai: list[str],
+    fubaopai: list[str] | None
+) -> list[dict[str, str | int]]:
+    """懸賞役一覧の作成"""
+
+    # 和了牌・副露面子を含めて牌ごとの枚数を数え、ドラ牌の枚数を合計する
+    n_pai, n_hongpai = _count_pai(shoupai, rongpai)
+    return _post_hupai(n_pai, n_hongpai,
+                       [Shan.zhenbaopai(p) for p in baopai],
+                       [Shan.zhenbaopai(p) for p in (fubaopai or [])])
+
+
 def get_defen(
     fu: int,
     hupai: list[dict[str, str | int]],
@@ -875,46 +1194,122 @@ def get_defen(
     }
 
 
-def hule(shoupai: Shoupai, rongpai: str | None, param: dict) -> dict[str, Any] | None:
+@lru_cache(maxsize=HULE_CACHE_SIZE)
+def _hule_yaku(
+    bingpai: tuple[tuple[int, ...], ...],
+    fulou: tuple[str, ...],
+    zimo: str | None,
+    rongpai: str | None,
+    zhuangfeng: int,
+    menfeng: int,
+    rule_key: tuple[bool, bool, bool]
+) -> tuple[tuple[list[str], dict, list[dict[str, str | int]], list[dict[str, str | int]]], ...]:
+    """和了形ごとの符と、状況役・懸賞役を除いた役を求める(結果はキャッシュされる)"""
+
+    # キーから手牌を復元する
+    shoupai = Shoupai()
+    for s, nn in zip(['m', 'p', 's', 'z'], bingpai):
+        shoupai._bingpai[s][1:] = nn
+    shoupai._fulou = list(fulou)
+    shoupai._zimo = zimo
+
+    rule_ = dict(zip(['fulou_duanyaojiu', 'double_damanguan', 'damanguan_baojia'], rule_key))
+
+    yaku = []
+    for mianzi in hule_mianzi(shoupai, rongpai):
+        hudi = get_hudi(mianzi, zhuangfeng, menfeng)
+        yaku.append((mianzi, hudi) + _get_hupai(mianzi, hudi, rule_))
+
+    return tuple(yaku)
+
+
+def hule_yaku(
+    shoupai: Shoupai,
+    rongpai: str | None,
+    zhuangfeng: int,
+    menfeng: int,
+    rule_: dict[str, Any]
+) -> tuple[tuple[list[str], dict, list[dict[str, str | int]], list[dict[str, str | int]]], ...]:
     """
-    和了情報の計算
+    和了形ごとの符と役を求める
+
+    ドラや供託に依存しない部分だけを、赤牌を区別しない手牌・副露面子・和了牌・
+    場風・自風・関連するルールをキーとして LRU キャッシュする
 
     Parameters
     ----------
     shoupai : Shoupai
         手牌
     rongpai : str or None
-        ロン牌の文字列表現
-    param : dict
-        点数計算に関する各種パラメータ
+        ロン牌の文字列表現 (鳴きの方向を含む3文字)
+    zhuangfeng : int
+        場風
+    menfeng : int
+        自風
+    rule_ : dict
+        ルール
 
     Returns
     -------
-    h_max : dict (or None)
-        和了情報
+    tuple
+        (和了形, 符の情報, 役満の一覧, 通常役の一覧) の組の一覧
+        状況役・懸賞役は含まない。要素は変更しないこと
+    """
+    return _hule_yaku(
+        tuple(tuple(shoupai._bingpai[s][1:]) for s in ['m', 'p', 's', 'z']),
+        tuple(m.replace('0', '5') for m in shoupai._fulou),
+        shoupai._zimo and shoupai._zimo.replace('0', '5'),
+        rongpai and rongpai.replace('0', '5'),
+        zhuangfeng,
+        menfeng,
+        (rule_['fulou_duanyaojiu'], rule_['double_damanguan'], rule_['damanguan_baojia'])
+    )
+
+
+def hule_cache_info():
     """
+    ``hule``の和了形・役判定キャッシュの統計
+
+    Returns
+    -------
+    functools._CacheInfo
+        hits, misses, maxsize, currsize
+    """
+    return _hule_yaku.cache_info()
+
+
+def hule_cache_clear():
+    """``hule``の和了形・役判定キャッシュを消去する"""
+    _hule_yaku.cache_clear()
 
+
+def _rongpai(rongpai: str | None) -> str | None:
+
+    # ロン牌を「牌+鳴きの方向」の3文字に正規化する
     if rongpai:
         if not re.search(r'[\+\=\-]$', rongpai):
             raise InvalidOperationError(rongpai)
         rongpai = rongpai[0:2] + rongpai[-1]
+    return rongpai
 
-    h_max = None
 
-    # 状況役の一覧を作成
-    pre_hupai = get_pre_hupai(param['hupai'])
+def _hule(
+    shoupai: Shoupai,
+    rongpai: str | None,
+    param: dict,
+    pre_hupai: list[dict[str, str | int]],
+    post_hupai: list[dict[str, str | int]]
+) -> dict[str, Any] | None:
 
-    # 懸賞役の一覧を作成
-    post_hupai = get_post_hupai(shoupai, rongpai, param['baopai'], param.get('fubaopai'))
+    h_max = None
 
     # 和了形を求め、すべての和了形について以下を実行する
-    for mianzi in hule_mianzi(shoupai, rongpai):
+    # (和了形ごとの符と役の判定はキャッシュから取得する)
+    for mianzi, hudi, damanguan, hupai in hule_yaku(shoupai, rongpai, param['zhuangfeng'],
+                                                     param['menfeng'], param['rule']):
 
-        # 符を計算する
-        hudi = get_hudi(mianzi, param['zhuangfeng'], param['menfeng'])
-
-        # 和了形を判定する
-        hupai = get_hupai(mianzi, hudi, pre_hupai, post_hupai, param['rule'])
+        # 状況役・懸賞役を合わせて和了役を確定する
+        hupai = _merge_hupai(damanguan, hupai, pre_hupai, post_hupai, param['rule'])
 
         # 和了点を計算する
         rv = get_defen(hudi['fu'], hupai, rongpai, param)
@@ -930,6 +1325,97 @@ def hule(shoupai: Shoupai, rongpai: str | None, param: dict) -> dict[str, Any] |
     return h_max
 
 
+def hule(shoupai: Shoupai, rongpai: str | None, param: dict) -> dict[str, Any] | None:
+    """
+    和了情報の計算
+
+    Parameters
+    ----------
+    shoupai : Shoupai
+        手牌
+    rongpai : str or None
+        ロン牌の文字列表現
+    param : dict
+        点数計算に関する各種パラメータ
+
+    Returns
+    -------
+    h_max : dict (or None)
+        和了情報
+    """
+
+    rongpai = _rongpai(rongpai)
+
+    # 状況役の一覧を作成
+    pre_hupai = get_pre_hupai(param['hupai'])
+
+    # 懸賞役の一覧を作成
+    post_hupai = get_post_hupai(shoupai, rongpai, param['baopai'], param.get('fubaopai'))
+
+    return _hule(shoupai, rongpai, param, pre_hupai, post_hupai)
+
+
+def hule_batch(
+    shoupai_list: list[Shoupai],
+    rongpai_list: list[str | None],
+    param: dict[str, Any] | list[dict[str, Any]]
+) -> dict[str, list]:
+    """
+    複数の手牌の和了情報をまとめて計算する
+
+    ``hule``を手牌ごとに呼び出すのと同じ結果を、列ごとのリストにまとめて返す。
+    パラメータが共通の場合、状況役・ドラ牌・ルールの参照は一度だけ行い、
+    和了形・役判定のキャッシュは``hule``と共有する
+
+    Parameters
+    ----------
+    shoupai_list : list[Shoupai]
+        手牌の一覧
+    rongpai_list : list[str or None]
+        ``shoupai_list``の各手牌に対応するロン牌(ツモ和了は None)
+    param : dict or list[dict]
+        点数計算に関する各種パラメータ(``hule_param``参照)
+        リストの場合は各手牌に対応するパラメータ
+
+    Returns
+    -------
+    dict[str, list]
+        'hupai', 'fu', 'fanshu', 'damanguan', 'defen', 'fenpei' をキーとする
+        列ごとのリスト。和了形でない手牌の要素はすべて None
+    """
+
+    if len(shoupai_list) != len(rongpai_list):
+        raise ValueError('length mismatch')
+    params = [param] * len(shoupai_list) if isinstance(param, dict) else param
+    if len(params) != len(shoupai_list):
+        raise ValueError('length mismatch')
+
+    columns = ['hupai', 'fu', 'fanshu', 'damanguan', 'defen', 'fenpei']
+    rv = {key: [] for key in columns}
+
+    context = {}    # パラメータごとの状況役・ドラ牌
+    for shoupai, rongpai, param_ in zip(shoupai_list, rongpai_list, params):
+
+        rongpai = _rongpai(rongpai)
+
+        # 状況役とドラ牌はパラメータごとに一度だけ求める
+        if id(param_) not in context:
+            context[id(param_)] = (get_pre_hupai(param_['hupai']),
+                                   [Shan.zhenbaopai(p) for p in param_['baopai']],
+                                   [Shan.zhenbaopai(p) for p in (param_.get('fubaopai') or [])])
+        pre_hupai, zhenbaopai, zhenfubaopai = context[id(param_)]
+
+        # 状況役は結果に含まれるので手牌ごとに複製する
+        n_pai, n_hongpai = _count_pai(shoupai, rongpai)
+        h_max = _hule(shoupai, rongpai, param_, [dict(h) for h in pre_hupai],
+                      _post_hupai(n_pai, n_hongpai, zhenbaopai, zhenfubaopai))
+
+        for key in columns:
+            rv[key].append(h_max[key] if h_max else None)
+
+    return rv
+
+
 def hule_param(param: dict[str, Any] = {}):
     """点数計算に関する各種パラメータを取得"""
 
@@ -0,0 +1,124 @@
+"""jongpy.core.message"""
+
+from __future__ import annotations
+
+from typing import Any, NoReturn
+
+
+def _immutable(self, *args, **kwargs) -> NoReturn:
+    raise TypeError(f'{type(self).__name__} is immutable')
+
+
+class FrozenDict(dict):
+    """
+    変更できない辞書
+
+    ``dict``のサブクラスなので、そのまま JSON に変換でき、``dict``と
+    比較できる。変更が必要な場合は``dict(msg)``などで複製すること
+    """
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenList(list):
+    """変更できないリスト (``FrozenDict``参照)"""
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable
+    __imul__ = _immutable
+    append = _immutable
+    extend = _immutable
+    insert = _immutable
+    pop = _immutable
+    remove = _immutable
+    clear = _immutable
+    sort = _immutable
+    reverse = _immutable
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(obj: Any) -> Any:
+    """
+    ``obj``に含まれる辞書・リストを変更できないものに置き換えた複製を返す
+
+    すでに変更できない部分は複製せずにそのまま共有する
+
+    Parameters
+    ----------
+    obj : Any
+        通知メッセージ・牌譜など JSON に変換可能なオブジェクト
+
+    Returns
+    -------
+    Any
+        変更できないオブジェクト
+    """
+
+    if type(obj) is dict:
+        return FrozenDict({k: freeze(v) for k, v in obj.items()})
+    if type(obj) is list:
+        return FrozenList([freeze(v) for v in obj])
+    return obj
+
+
+def masked(obj: Any, path: tuple, value: Any) -> Any:
+    """
+    ``path``の位置の要素を``value``に置き換えた``obj``を返す
+
+    ``path``上の辞書・リストだけを複製し、それ以外は``obj``と共有する
+    (コピーオンライト)
+
+    Parameters
+    ----------
+    obj : FrozenDict or FrozenList
+        変更できない通知メッセージ
+    path : tuple
+        置き換える要素へのキー・添字の並び
+    value : Any
+        置き換える値
+
+    Returns
+    -------
+    FrozenDict or FrozenList
+        置き換えた通知メッセージ
+    """
+
+    if not path:
+        return freeze(value)
+    key = path[0]
+    if isinstance(obj, list):
+        items = list(obj)
+        items[key] = masked(obj[key], path[1:], value)
+        return FrozenList(items)
+    items = dict(obj)
+    items[key] = masked(obj[key], path[1:], value)
+    return FrozenDict(items)
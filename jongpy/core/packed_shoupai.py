@@ -0,0 +1,340 @@
+"""jongpy.core.packed_shoupai"""
+
+from functools import lru_cache
+
+from jongpy.core.shoupai import Shoupai
+from jongpy.core.pai import N_PAI, OFFSET, pai_id, pai_str
+from jongpy.core.exceptions import (InvalidOperationError,
+                                    MianziFormatError,
+                                    PaiFormatError,
+                                    PaiNotExistError,
+                                    PaiOverFlowError,
+                                    ShoupaiOverFlowError,
+                                    ShoupaiUnderFlowError)
+
+
+@lru_cache(maxsize=None)
+def _parse_fulou(m: str) -> tuple[str, str]:
+    """
+    正規化済みの面子を種別と手牌から使う牌の数字に分解する
+
+    種別は 'fulou' (チー・ポン)、'daminggang' (大明槓)、'angang' (暗槓)、
+    'jiagang' (加槓)のいずれか
+    """
+
+    d = next((i for i, c in enumerate(m) if c in '+=-'), -1)   # 鳴きの方向の位置
+    nn = m[1:].replace('+', '').replace('=', '').replace('-', '')
+    if d < 0:
+        return ('angang' if len(nn) == 4 else 'fulou'), nn
+    if len(nn) == 4:
+        # 鳴いた牌の後ろに数字が続く場合は加槓、続かない場合は大明槓
+        if d == len(m) - 1:
+            return 'daminggang', nn[:3]
+        return 'jiagang', nn[3]
+    # 鳴いた牌(方向の直前の数字)以外が手牌から使う牌となる
+    return 'fulou', m[1:d - 1] + m[d + 1:]
+
+
+class PackedShoupai:
+    """
+    配列で枚数を保持する手牌クラス
+
+    副露牌を含まない手牌の枚数を牌番号(``jongpy.core.pai``)順の34要素の
+    bytearray で、赤牌の枚数を萬子・筒子・索子の3要素の bytearray で保持する。
+    ``Shoupai``とは``from_shoupai``、``to_shoupai``で相互に変換できる
+    """
+
+    __slots__ = ('_bingpai', '_hongpai', '_fupai', '_fulou', '_zimo', '_lizhi')
+
+    def __init__(self, qipai: list[str] = []) -> None:
+
+        self._bingpai = bytearray(N_PAI)    # 副露牌を含まない手牌の枚数
+        self._hongpai = bytearray(3)    # 赤牌の枚数
+        self._fupai = 0     # 伏せ牌の枚数
+        self._fulou = []    # 副露面子
+        self._zimo = None   # ツモ牌
+        self._lizhi = False     # リーチ有無
+
+        for p in qipai:
+            if p == '_':    # 伏せ牌の場合
+                self._fupai += 1
+                continue
+
+            # 伏せ牌以外の場合
+            if Shoupai.valid_pai(p) is None:
+                raise PaiFormatError(p)     # 牌の形式が不正なら例外を発生
+            self._increase(p)
+
+    @classmethod
+    def from_shoupai(cls, shoupai: Shoupai):
+        """
+        ``Shoupai``インスタンスから``PackedShoupai``インスタンスを生成
+
+        Parameters
+        ----------
+        shoupai : jongpy.Shoupai
+            手牌
+
+        Returns
+        -------
+        jongpy.core.packed_shoupai.PackedShoupai
+        """
+
+        packed = cls()
+        for s, o in OFFSET.items():
+            bingpai = shoupai._bingpai[s]
+            packed._bingpai[o:o + len(bingpai) - 1] = bytes(bingpai[1:])
+            if s != 'z':
+                packed._hongpai[o // 9] = bingpai[0]
+        packed._fupai = shoupai._bingpai['_']
+        packed._fulou = shoupai._fulou[:]
+        packed._zimo = shoupai._zimo
+        packed._lizhi = shoupai._lizhi
+
+        return packed
+
+    @classmethod
+    def from_str(cls, paistr: str = ''):
+        """
+        牌姿文字列から``PackedShoupai``インスタンスを生成
+
+        Parameters
+        ----------
+        paistr : str
+            牌姿の文字列表現
+
+        Returns
+        -------
+        jongpy.core.packed_shoupai.PackedShoupai
+        """
+        return cls.from_shoupai(Shoupai.from_str(paistr))
+
+    def to_shoupai(self) -> Shoupai:
+        """
+        ``Shoupai``インスタンスに変換する
+
+        Returns
+        -------
+        jongpy.Shoupai
+        """
+
+        shoupai = Shoupai()
+        for s, o in OFFSET.items():
+            bingpai = shoupai._bingpai[s]
+            bingpai[1:] = self._bingpai[o:o + len(bingpai) - 1]
+            if s != 'z':
+                bingpai[0] = self._hongpai[o // 9]
+        shoupai._bingpai['_'] = self._fupai
+        shoupai._fulou = self._fulou[:]
+        shoupai._zimo = self._zimo
+        shoupai._lizhi = self._lizhi
+
+        return shoupai
+
+    def __str__(self) -> str:
+        return str(self.to_shoupai())
+
+    def clone(self):
+
+        packed = PackedShoupai()
+        packed._bingpai[:] = self._bingpai
+        packed._hongpai[:] = self._hongpai
+        packed._fupai = self._fupai
+        packed._fulou = self._fulou[:]
+        packed._zimo = self._zimo
+        packed._lizhi = self._lizhi
+
+        return packed
+
+    def _increase(self, p: str):
+
+        i = pai_id(p)
+        if self._bingpai[i] == 4:
+            # 5枚目の牌なら例外を発生
+            raise PaiOverFlowError(self, p)
+        self._bingpai[i] += 1
+        if p[1] == '0':     # 赤牌の場合は赤牌の枚数も加算する
+            self._hongpai[i // 9] += 1
+
+    def _decrease(self, p: str):
+
+        i = pai_id(p)
+        h = self._hongpai[i // 9] if i < OFFSET['z'] else 0
+        if (self._bingpai[i] == 0 or p[1] == '0' and h == 0
+                or p[1] == '5' and h == self._bingpai[i]):
+            # 存在しない牌を打牌しようとしている場合、伏せ牌があるなら
+            # 伏せ牌からの打牌と解釈する。伏せ牌がない場合は例外を発生する
+            if self._fupai == 0:
+                raise PaiNotExistError(self, p[0:2])
+            self._fupai -= 1
+        else:
+            self._bingpai[i] -= 1   # 牌の枚数を減算する
+            if p[1] == '0':     # 赤牌の場合は赤牌の枚数も減算する
+                self._hongpai[i // 9] -= 1
+
+    def zimo(self, p: str, check: bool = True):
+        """
+        牌``p``をツモる
+
+        Parameters
+        ----------
+        p : str
+            ツモ牌の文字列表現
+        check : bool, default True
+            多牌のチェックを行うかどうか
+        """
+
+        # ツモ直後の場合は多牌となるので例外を発生する
+        if check and self._zimo is not None:
+            raise ShoupaiOverFlowError(self, p)
+
+        if p == '_':    # 伏せ牌の場合
+            self._fupai += 1
+            self._zimo = p
+        else:   # 通常牌の場合
+            # 不正な牌の場合、例外を発生する
+            if Shoupai.valid_pai(p) is None:
+                raise PaiFormatError(p)
+            self._increase(p)
+            self._zimo = p[0:2]
+
+        return self
+
+    def dapai(self, p: str, check: bool = True):
+        """
+        手牌から牌``p``を打牌する
+
+        Parameters
+        ----------
+        p : str
+            牌の文字列表現
+        check : True, default True
+            少牌のチェックを行うかどうか
+        """
+
+        # ツモあるいは副露直後以外の打牌は少牌となるので例外を発生する
+        if check and self._zimo is None:
+            raise ShoupaiUnderFlowError(self, p)
+
+        # 不正な牌の場合、例外を発生する
+        if Shoupai.valid_pai(p) is None:
+            raise PaiFormatError(p)
+
+        self._decrease(p)   # 牌の枚数を減算する
+        self._zimo = None   # ツモしていない状態にする
+        # 打牌がリーチ宣言の場合はリーチ後に状態を変更する
+        if p[-1] == '*':
+            self._lizhi = True
+
+        return self
+
+    def fulou(self, m: str, check: bool = True):
+        """
+        面子``m``を副露する
+
+        Parameters
+        ----------
+        m : str
+            面子の文字列表現
+        check : bool, default True
+            多牌のチェックを行うかどうか
+        """
+
+        # ツモ直後の場合は多牌となるので例外を発生
+        if check and self._zimo is not None:
+            raise ShoupaiOverFlowError(self, m)
+
+        # 不正な面子の場合、例外を発生
+        if m != Shoupai.valid_mianzi(m):
+            raise MianziFormatError(m)
+
+        # 暗槓・加槓の場合、例外を発生
+        kind, nn = _parse_fulou(m)
+        if kind in ('angang', 'jiagang'):
+            raise InvalidOperationError(self, m)
+
+        # 副露に使う牌の枚数を減算する
+        s = m[0]
+        for n in nn:
+            self._decrease(s + n)
+        # 副露面子に加える
+        self._fulou.append(m)
+
+        # 大明槓以外の場合は副露直後の状態にする
+        if kind != 'daminggang':
+            self._zimo = m
+
+        return self
+
+    def gang(self, m: str, check: bool = True):
+        """
+        面子``m``で、暗槓もしくは加槓を行う
+
+        Parameters
+        ----------
+        m : str
+            面子の文字列表現
+        check : bool, default True
+            少牌のチェックを行うかどうか
+        """
+
+        # ツモの直後以外は槓できないので、例外を発生
+        if check and (self._zimo is None or len(self._zimo) > 2):
+            raise ShoupaiUnderFlowError(self, m)
+
+        # 不正な面子の場合、例外を発生
+        if m != Shoupai.valid_mianzi(m):
+            raise MianziFormatError(self, m)
+
+        s = m[0]
+        kind, nn = _parse_fulou(m)
+        if kind == 'angang':     # 暗槓の場合
+            for n in nn:
+                self._decrease(s + n)
+            self._fulou.append(m)
+
+        elif kind == 'jiagang':     # 加槓の場合
+            try:
+                i = self._fulou.index(m[0:5])
+            except ValueError:
+                raise InvalidOperationError(self, m)
+            self._fulou[i] = m
+            self._decrease(s + nn)
+
+        else:   # 暗槓でも加槓でもない場合は例外を発生
+            raise InvalidOperationError(self, m)
+
+        self._zimo = None   # ツモしていない状態にする
+
+        return self
+
+    @property
+    def bingpai(self) -> bytearray:
+        """副露牌を含まない手牌の牌番号順の枚数"""
+        return self._bingpai
+
+    @property
+    def menqian(self) -> bool:
+        """メンゼンかどうか"""
+        return all(_parse_fulou(m)[0] == 'angang' for m in self._fulou)
+
+    @property
+    def lizhi(self) -> bool:
+        """リーチしているかどうか"""
+        return self._lizhi
+
+    def pai(self) -> list[str]:
+        """
+        副露牌を含まない手牌を牌番号順に列挙する (伏せ牌は含まない)
+
+        Returns
+        -------
+        list[str]
+            牌の文字列表現のリスト (赤牌は黒牌より先に並ぶ)
+        """
+        pai = []
+        for i in range(N_PAI):
+            n_hongpai = self._hongpai[i // 9] if i < OFFSET['z'] and i % 9 == 4 else 0
+            for j in range(self._bingpai[i]):
+                pai.append(pai_str(i, j < n_hongpai))
+        return pai
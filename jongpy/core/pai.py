@@ -0,0 +1,102 @@
+"""jongpy.core.pai"""
+
+import re
+
+from jongpy.core.exceptions import PaiFormatError
+
+
+N_PAI = 34  # 牌の種類数
+
+# 各色の先頭の牌番号
+OFFSET = {'m': 0, 'p': 9, 's': 18, 'z': 27}
+
+# 牌番号から牌の文字列表現への変換表
+PAI = [s + str(n) for s in ['m', 'p', 's', 'z'] for n in range(1, 8 if s == 'z' else 10)]
+
+# 牌の文字列表現(赤牌を含む)から牌番号への変換表
+_ID = {p: i for i, p in enumerate(PAI)}
+_ID.update({'m0': 4, 'p0': 13, 's0': 22})
+
+
+def pai_id(p: str) -> int:
+    """
+    牌の文字列表現を牌番号(0~33)に変換する
+
+    赤牌は対応する「黒牌」の番号となり、``p``の3文字目以降(ツモ切りや
+    リーチ、鳴きの方向)は無視する
+
+    Parameters
+    ----------
+    p : str
+        牌の文字列表現
+
+    Returns
+    -------
+    int
+        牌番号
+    """
+    try:
+        return _ID[p[0:2]]
+    except KeyError:
+        raise PaiFormatError(p)
+
+
+def pai_str(i: int, hongpai: bool = False) -> str:
+    """
+    牌番号を牌の文字列表現に変換する
+
+    Parameters
+    ----------
+    i : int
+        牌番号
+    hongpai : bool, default False
+        赤牌として表現するかどうか
+
+    Returns
+    -------
+    str
+        牌の文字列表現
+    """
+    p = PAI[i]
+    return p[0] + '0' if hongpai and p[1] == '5' and p[0] != 'z' else p
+
+
+def is_hongpai(p: str) -> bool:
+    """
+    牌``p``が赤牌かどうか
+
+    Parameters
+    ----------
+    p : str
+        牌の文字列表現
+
+    Returns
+    -------
+    bool
+        赤牌かどうか
+    """
+    return p[1] == '0'
+
+
+def mianzi_id(m: str, gang: bool = False) -> list[int]:
+    """
+    副露・カンの面子``m``で新たに見えるようになる牌の牌番号を取得
+
+    副露(チー・ポン・大明槓)では鳴いた牌は既に河で見えているので除き、
+    加槓では加えた1枚、暗槓では4枚全てを返す
+
+    Parameters
+    ----------
+    m : str
+        面子の文字列表現
+    gang : bool, default False
+        加槓・暗槓の面子かどうか
+
+    Returns
+    -------
+    list[int]
+        牌番号のリスト
+    """
+    if gang and re.search(r'[\+\=\-]', m):  # 加槓の場合
+        return [pai_id(m[0] + m[-1])]
+    return [pai_id(m[0] + n) for n in re.findall(r'\d(?![\+\=\-])', m)]
@@ -0,0 +1,453 @@
+"""jongpy.core.paipu_codec"""
+
+from __future__ import annotations
+
+import re
+import struct
+from typing import Any, Iterator
+
+from jongpy.core.exceptions import JongPyError
+
+
+class PaipuFormatError(JongPyError):
+    """不正なバイナリ牌譜"""
+    pass
+
+
+MAGIC = b'JPPU'
+VERSION = 1
+
+# 牌譜の構成:
+#   MAGIC, VERSION(1バイト), 文字列数, (バイト数, UTF-8)*, 本体のバイト数, 本体
+#   本体: ヘッダ(汎用値の辞書), 局数, (イベント数, バイト数, イベント*)*
+#   整数はすべて可変長 (符号付きはジグザグ符号化)
+
+# 局進行のイベントのオペコード。頻出するイベントは種別と手番を1バイトにまとめる
+#   0-19:  (種別 * 4 + 手番)  種別は _HOT の順
+#   20:    開槓 (ドラ表示牌)
+#   21:    その他 (キー文字列 + 汎用値)
+_HOT = ('zimo', 'dapai', 'fulou', 'gang', 'gangzimo')
+_HOT_FIELD = ('p', 'p', 'm', 'm', 'p')
+_OP_KAIGANG = 20
+_OP_GENERIC = 21
+
+# 汎用値のタグ
+_T_NONE, _T_FALSE, _T_TRUE, _T_INT, _T_FLOAT, _T_STR, _T_PAISTR, _T_LIST, _T_DICT = range(9)
+
+# 牌の1バイト表現: 上位から '*'(0x80)、'_'(0x40)、色(2bit)、数字(4bit)
+_SUIT = 'mpsz'
+_TILE_RE = re.compile(r'^([mpsz])(\d)(_?)(\*?)$')
+
+# 牌姿の4bit表現: 0-13 は _NIBBLE の文字、14 は終端、15 は続く2ニブルが ASCII コード
+_NIBBLE = '0123456789mpsz'
+_NIBBLE_INDEX = {c: i for i, c in enumerate(_NIBBLE)}
+_PAISTR_RE = re.compile(r'^[0-9mpsz_*,+=\-]*$')
+
+_DOUBLE = struct.Struct('<d')
+
+
+def _tile_byte(p: str) -> int | None:
+    m = _TILE_RE.match(p)
+    if m is None:
+        return None
+    return ((0x80 if m.group(4) else 0) | (0x40 if m.group(3) else 0)
+            | _SUIT.index(m.group(1)) << 4 | int(m.group(2)))
+
+
+_TILE_STR = [None] * 256
+for _b in range(256):
+    if _b & 0x0f <= 9:
+        _TILE_STR[_b] = (_SUIT[_b >> 4 & 3] + str(_b & 0x0f)
+                         + ('_' if _b & 0x40 else '') + ('*' if _b & 0x80 else ''))
+
+
+class _Encoder:
+
+    def __init__(self) -> None:
+        self._out = bytearray()
+        self._strings = {}
+
+    def varint(self, n: int):
+        out = self._out
+        while n >= 0x80:
+            out.append(n & 0x7f | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def sint(self, n: int):
+        self.varint(n << 1 if n >= 0 else (-n << 1) - 1)
+
+    def string(self, s: str):
+        i = self._strings.get(s)
+        if i is None:
+            i = self._strings[s] = len(self._strings)
+        self.varint(i)
+
+    def paistr(self, s: str):
+        nibbles = []
+        for c in s:
+            i = _NIBBLE_INDEX.get(c)
+            if i is None:
+                nibbles += (15, ord(c) >> 4, ord(c) & 0x0f)
+            else:
+                nibbles.append(i)
+        nibbles.append(14)
+        if len(nibbles) & 1:
+            nibbles.append(14)
+        out = self._out
+        for i in range(0, len(nibbles), 2):
+            out.append(nibbles[i] << 4 | nibbles[i + 1])
+
+    def value(self, v: Any):
+        out = self._out
+        if v is None:
+            out.append(_T_NONE)
+        elif v is True:
+            out.append(_T_TRUE)
+        elif v is False:
+            out.append(_T_FALSE)
+        elif isinstance(v, int):
+            out.append(_T_INT)
+            self.sint(v)
+        elif isinstance(v, float):
+            out.append(_T_FLOAT)
+            out += _DOUBLE.pack(v)
+        elif isinstance(v, str):
+            if _PAISTR_RE.match(v):
+                out.append(_T_PAISTR)
+                self.paistr(v)
+            else:
+                out.append(_T_STR)
+                self.string(v)
+        elif isinstance(v, (list, tuple)):
+            out.append(_T_LIST)
+            self.varint(len(v))
+            for x in v:
+                self.value(x)
+        elif isinstance(v, dict):
+            out.append(_T_DICT)
+            self.varint(len(v))
+            for k, x in v.items():
+                self.string(k)
+                self.value(x)
+        else:
+            raise TypeError(type(v).__name__)
+
+    def event(self, paipu: dict):
+        out = self._out
+        if len(paipu) == 1:
+            (key, e), = paipu.items()
+            if key in _HOT:
+                kind = _HOT.index(key)
+                field = _HOT_FIELD[kind]
+                if (isinstance(e, dict) and len(e) == 2 and type(e.get('l')) is int and 0 <= e['l'] < 4
+                        and isinstance(e.get(field), str)):
+                    if field == 'p':
+                        b = _tile_byte(e['p'])
+                        if b is not None:
+                            out.append(kind * 4 + e['l'])
+                            out.append(b)
+                            return
+                    else:
+                        out.append(kind * 4 + e['l'])
+                        self.paistr(e['m'])
+                        return
+            elif key == 'kaigang' and isinstance(e, dict) and len(e) == 1:
+                b = _tile_byte(e.get('baopai') or '')
+                if b is not None:
+                    out.append(_OP_KAIGANG)
+                    out.append(b)
+                    return
+        out.append(_OP_GENERIC)
+        self.value(paipu)
+
+    def paipu(self, paipu: dict) -> tuple[bytes, list[tuple[int, int]]]:
+        # 本体を先に符号化し、文字列表を前に付ける
+        header = {k: v for k, v in paipu.items() if k != 'log'}
+        self.value(header)
+        log = paipu.get('log', [])
+        self.varint(len(log))
+        rounds = []
+        for events in log:
+            # 局ごとにイベント数とバイト数を前置し、読み飛ばせるようにする
+            start = len(self._out)
+            for e in events:
+                self.event(e)
+            chunk = self._out[start:]
+            del self._out[start:]
+            self.varint(len(events))
+            self.varint(len(chunk))
+            rounds.append((len(self._out), len(events)))
+            self._out += chunk
+        body = self._out
+
+        self._out = bytearray(MAGIC)
+        self._out.append(VERSION)
+        self.varint(len(self._strings))
+        for s in self._strings:
+            b = s.encode('utf-8')
+            self.varint(len(b))
+            self._out += b
+        self.varint(len(body))
+        offset = len(self._out)
+        self._out += body
+        return bytes(self._out), [(offset + o, n) for o, n in rounds]
+
+
+def encode(paipu: dict) -> bytes:
+    """
+    牌譜をバイナリ形式に変換する
+
+    牌は1バイト、頻出するイベントは種別と手番を1バイトのオペコードに
+    まとめ、点数は可変長整数で表す。文字列は牌譜ごとの文字列表で共有する
+
+    Parameters
+    ----------
+    paipu : dict
+        牌譜 (``Game``が出力する形式)
+
+    Returns
+    -------
+    bytes
+        バイナリ形式の牌譜
+    """
+    return _Encoder().paipu(paipu)[0]
+
+
+def encode_index(paipu: dict) -> tuple[bytes, list[tuple[int, int]]]:
+    """
+    牌譜をバイナリ形式に変換し、局ごとの位置も返す
+
+    Parameters
+    ----------
+    paipu : dict
+        牌譜
+
+    Returns
+    -------
+    tuple[bytes, list[tuple[int, int]]]
+        バイナリ形式の牌譜と、局ごとの(最初のイベントの位置, イベント数)
+    """
+    return _Encoder().paipu(paipu)
+
+
+class PaipuView:
+    """
+    バイナリ形式の牌譜を、複製せずに読み出す
+
+    ``buf``には``bytes``、``memoryview``、``mmap``などを指定できる。
+    生成時には文字列表だけを読み込み、局進行は必要になった時に復号する
+
+    Parameters
+    ----------
+    buf : bytes-like
+        バイナリ形式の牌譜を含むバッファ
+    offset : int, default 0
+        牌譜の先頭の位置
+    """
+
+    def __init__(self, buf, offset: int = 0) -> None:
+        self._buf = memoryview(buf).cast('B') if not isinstance(buf, memoryview) else buf
+        if bytes(self._buf[offset:offset + 4]) != MAGIC:
+            raise PaipuFormatError('bad magic')
+        if self._buf[offset + 4] != VERSION:
+            raise PaipuFormatError(f'unsupported version {self._buf[offset + 4]}')
+        self._pos = offset + 5
+        n = self._varint()
+        strings = []
+        for _ in range(n):
+            size = self._varint()
+            strings.append(str(self._buf[self._pos:self._pos + size], 'utf-8'))
+            self._pos += size
+        self._strings = strings
+        size = self._varint()
+        self._body = self._pos
+        self._end = self._pos + size
+        self._header = None
+        self._rounds = None
+
+    @property
+    def nbytes(self) -> int:
+        """牌譜の末尾の位置"""
+        return self._end
+
+    def _varint(self) -> int:
+        buf = self._buf
+        pos = self._pos
+        b = buf[pos]
+        n = b & 0x7f
+        shift = 7
+        while b & 0x80:
+            pos += 1
+            b = buf[pos]
+            n |= (b & 0x7f) << shift
+            shift += 7
+        self._pos = pos + 1
+        return n
+
+    def _sint(self) -> int:
+        n = self._varint()
+        return -((n + 1) >> 1) if n & 1 else n >> 1
+
+    def _paistr(self) -> str:
+        buf = self._buf
+        pos = self._pos
+        chars = []
+        pending = None
+        while True:
+            b = buf[pos]
+            pos += 1
+            for x in (b >> 4, b & 0x0f):
+                if pending is not None:
+                    pending.append(x)
+                    if len(pending) == 2:
+                        chars.append(chr(pending[0] << 4 | pending[1]))
+                        pending = None
+                elif x == 14:
+                    self._pos = pos
+                    return ''.join(chars)
+                elif x == 15:
+                    pending = []
+                else:
+                    chars.append(_NIBBLE[x])
+
+    def _value(self) -> Any:
+        buf = self._buf
+        tag = buf[self._pos]
+        self._pos += 1
+        if tag == _T_INT:
+            return self._sint()
+        if tag == _T_PAISTR:
+            return self._paistr()
+        if tag == _T_STR:
+            return self._strings[self._varint()]
+        if tag == _T_DICT:
+            n = self._varint()
+            d = {}
+            for _ in range(n):
+                k = self._strings[self._varint()]
+                d[k] = self._value()
+            return d
+        if tag == _T_LIST:
+            return [self._value() for _ in range(self._varint())]
+        if tag == _T_NONE:
+            return None
+        if tag == _T_TRUE:
+            return True
+        if tag == _T_FALSE:
+            return False
+        if tag == _T_FLOAT:
+            v, = _DOUBLE.unpack_from(buf, self._pos)
+            self._pos += 8
+            return v
+        raise PaipuFormatError(f'bad tag {tag} at {self._pos - 1}')
+
+    def _event(self) -> dict:
+        buf = self._buf
+        op = buf[self._pos]
+        self._pos += 1
+        if op < _OP_KAIGANG:
+            kind, l = divmod(op, 4)
+            if _HOT_FIELD[kind] == 'p':
+                p = _TILE_STR[buf[self._pos]]
+                self._pos += 1
+                return {_HOT[kind]: {'l': l, 'p': p}}
+            return {_HOT[kind]: {'l': l, 'm': self._paistr()}}
+        if op == _OP_KAIGANG:
+            p = _TILE_STR[buf[self._pos]]
+            self._pos += 1
+            return {'kaigang': {'baopai': p}}
+        if op == _OP_GENERIC:
+            return self._value()
+        raise PaipuFormatError(f'bad opcode {op} at {self._pos - 1}')
+
+    def _scan(self):
+        # ヘッダを復号し、局ごとの位置を求める (局進行は読み飛ばす)
+        self._pos = self._body
+        self._header = self._value()
+        rounds = []
+        for _ in range(self._varint()):
+            n = self._varint()
+            size = self._varint()
+            rounds.append((self._pos, n))
+            self._pos += size
+        self._rounds = rounds
+
+    @property
+    def header(self) -> dict:
+        """牌譜の局進行以外の部分"""
+        if self._header is None:
+            self._pos = self._body
+            self._header = self._value()
+        return self._header
+
+    @property
+    def rounds(self) -> list[tuple[int, int]]:
+        """局ごとの(最初のイベントの位置, イベント数)"""
+        if self._rounds is None:
+            self._scan()
+        return self._rounds
+
+    def iter_events(self, round: int | None = None, offset: int | None = None,
+                    n: int | None = None) -> Iterator[dict]:
+        """
+        局進行のイベントを順に復号する
+
+        Parameters
+        ----------
+        round : int or None, default None
+            局の通し番号。省略時は全ての局
+        offset : int or None, default None
+            イベントの位置 (``encode_index``の返り値)。指定した場合は
+            ``round``の代わりにここから``n``件を復号する
+        n : int or None, default None
+            ``offset``から復号するイベント数
+
+        Yields
+        ------
+        dict
+            イベント
+        """
+
+        if offset is not None:
+            ranges = [(offset, n)]
+        elif round is not None:
+            ranges = [self.rounds[round]]
+        else:
+            ranges = self.rounds
+        for pos, count in ranges:
+            self._pos = pos
+            for _ in range(count):
+                e = self._event()
+                pos = self._pos
+                yield e
+                self._pos = pos
+
+    def round(self, round: int) -> list[dict]:
+        """``round``番目の局のイベントの一覧"""
+        return list(self.iter_events(round))
+
+    def to_dict(self) -> dict:
+        """JSON 形式の牌譜に復元する"""
+        paipu = dict(self.header)
+        paipu['log'] = [self.round(i) for i in range(len(self.rounds))]
+        return paipu
+
+
+def decode(buf, offset: int = 0) -> dict:
+    """
+    バイナリ形式の牌譜を JSON 形式の牌譜に復元する
+
+    Parameters
+    ----------
+    buf : bytes-like
+        バイナリ形式の牌譜を含むバッファ
+    offset : int, default 0
+        牌譜の先頭の位置
+
+    Returns
+    -------
+    dict
+        牌譜
+    """
+    return PaipuView(buf, offset).to_dict()
@@ -14,9 +14,13 @@ from jongpy.core.xiangting import xiangting, tingpai
 class Player(metaclass=ABCMeta):
     """プレイヤー抽象クラス"""
 
+    # 真の場合、Game.simulate で通知メッセージを複製・マスクせずに受け取る
+    raw_state = False
+
     def __init__(self) -> None:
         self._model = Board()
         self._callback = None
+        self._hulepai = None    # (手牌, 和了牌)のキャッシュ
 
     def action(self, msg: dict[str, dict], callback: Callable | None = None):
         """メッセージの処理"""
@@ -64,8 +68,18 @@ class Player(metaclass=ABCMeta):
 
     @property
     def hulepai(self):
-        """和了牌の一覧"""
-        return xiangting(self.shoupai) == 0 and tingpai(self.shoupai) or []
+        """
+        和了牌の一覧
+
+        打牌後の手牌について求めた結果を、手牌が変わる(ツモ切り以外の
+        打牌・副露・槓)まで再利用する。返した配列は変更しないこと
+        """
+        shoupai = self.shoupai
+        if shoupai._zimo is not None:   # 打牌前は求めない
+            return xiangting(shoupai) == 0 and tingpai(shoupai) or []
+        if self._hulepai is None or self._hulepai[0] is not shoupai:
+            self._hulepai = (shoupai, xiangting(shoupai) == 0 and tingpai(shoupai) or [])
+        return self._hulepai[1]
 
     def kaiju(self, kaiju: dict):
         """
@@ -99,6 +113,7 @@ class Player(metaclass=ABCMeta):
         self._diyizimo = True
         self._n_gang = 0
         self._neng_rong = True
+        self._hulepai = None
 
         if self._callback is not None:
             self.action_qipai(qipai)
@@ -135,6 +150,9 @@ class Player(metaclass=ABCMeta):
         if dapai['l'] == self._menfeng:
             if not self.shoupai.lizhi:
                 self._neng_rong = True
+            # ツモ牌をそのまま打牌した場合以外は和了牌が変わりうる
+            if self.shoupai._zimo != dapai['p'][:2]:
+                self._hulepai = None
 
         self._model.dapai(dapai)
 
@@ -143,12 +161,12 @@ class Player(metaclass=ABCMeta):
 
         if dapai['l'] == self._menfeng:
             self._diyizimo = False
-            if [p for p in self.hulepai if self.he.find(p)]:
+            if any(map(self.he.find, self.hulepai)):
                 self._neng_rong = False
         else:
             s = dapai['p'][0]
             n = int(dapai['p'][1]) or 5
-            if [p for p in self.hulepai if p == s + str(n)]:
+            if s + str(n) in self.hulepai:
                 self._neng_rong = False
 
     def fulou(self, fulou: dict):
@@ -162,6 +180,8 @@ class Player(metaclass=ABCMeta):
         """
 
         self._model.fulou(fulou)
+        if fulou['l'] == self._menfeng:
+            self._hulepai = None
 
         if self._callback is not None:
             self.action_fulou(fulou)
@@ -179,6 +199,8 @@ class Player(metaclass=ABCMeta):
         """
 
         self._model.gang(gang)
+        if gang['l'] == self._menfeng:
+            self._hulepai = None
 
         if self._callback is not None:
             self.action_gang(gang)
@@ -187,7 +209,7 @@ class Player(metaclass=ABCMeta):
         if gang['l'] != self._menfeng and re.search(r'^[mpsz]\d{4}$', gang['m']) is None:
             s = gang['m'][0]
             n = int(gang['m'][-1]) or 5
-            if [p for p in self.hulepai if p == s + str(n)]:
+            if s + str(n) in self.hulepai:
                 self._neng_rong = False
 
     def kaigang(self, kaigang: dict):
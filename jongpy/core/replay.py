@@ -0,0 +1,144 @@
+"""jongpy.core.replay"""
+
+from __future__ import annotations
+
+import copy
+from typing import Iterator
+
+from jongpy.core.board import Board
+from jongpy.core.paipu_codec import PaipuFormatError
+
+
+# イベントの種別と Board のメソッドの対応
+_EVENTS = {
+    'qipai': 'qipai',
+    'zimo': 'zimo',
+    'dapai': 'dapai',
+    'fulou': 'fulou',
+    'gang': 'gang',
+    'gangzimo': 'zimo',
+    'kaigang': 'kaigang',
+    'hule': 'hule',
+    'pingju': 'pingju',
+}
+
+
+def apply_event(board: Board, event: dict):
+    """
+    牌譜のイベントを``Board``に適用する
+
+    Parameters
+    ----------
+    board : Board
+        卓情報
+    event : dict
+        牌譜のイベント
+    """
+
+    (key, value), = event.items()
+    if key not in _EVENTS:
+        raise PaipuFormatError(f'unknown event {key}')
+    getattr(board, _EVENTS[key])(value)
+
+
+class Replayer:
+    """
+    牌譜の局進行を``Board``に直接適用して再現する
+
+    ``interval``件ごとに卓情報のスナップショットを保存し、``seek``では
+    直前のスナップショットから再現する
+
+    Parameters
+    ----------
+    paipu : dict or PaipuView
+        牌譜
+    interval : int, default 32
+        スナップショットを保存する間隔(イベント数)
+    """
+
+    def __init__(self, paipu, interval: int = 32) -> None:
+        if interval < 1:
+            raise ValueError(interval)
+        if isinstance(paipu, dict):
+            header = paipu
+            log = paipu['log']
+        else:
+            header = paipu.header
+            log = [paipu.round(i) for i in range(len(paipu.rounds))]
+
+        self._kaiju = {'title': header.get('title'), 'player': header.get('player'), 'qijia': header['qijia']}
+        self._events = [(round, event) for round, events in enumerate(log) for event in events]
+        self._interval = interval
+        self._snapshots = {0: Board(self._kaiju)}   # イベント数 -> 卓情報
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def event(self, n: int) -> tuple[int, dict]:
+        """``n``番目のイベントと、その局の通し番号"""
+        round, event = self._events[n]
+        return round, event
+
+    def _nearest(self, n: int) -> int:
+        # n 件目以前で最も近いスナップショット
+        i = n - n % self._interval
+        while i not in self._snapshots:
+            i -= self._interval
+        return i
+
+    def states(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[int, dict, Board]]:
+        """
+        イベントを1件ずつ適用し、適用後の卓情報を順に返す
+
+        返す``Board``は同じインスタンスを更新し続けるので、保持する場合は
+        複製すること
+
+        Parameters
+        ----------
+        start : int, default 0
+            最初に適用するイベントの番号
+        stop : int or None, default None
+            このイベントの手前で終了する。省略時は最後まで
+
+        Yields
+        ------
+        tuple[int, dict, Board]
+            イベントの番号、イベント、適用後の卓情報
+        """
+
+        stop = len(self._events) if stop is None else min(stop, len(self._events))
+        i = self._nearest(start)
+        board = copy.deepcopy(self._snapshots[i])
+        while i < stop:
+            round, event = self._events[i]
+            apply_event(board, event)
+            i += 1
+            if i % self._interval == 0 and i not in self._snapshots:
+                self._snapshots[i] = copy.deepcopy(board)
+            if i > start:
+                yield i - 1, event, board
+
+    def seek(self, n: int) -> Board:
+        """
+        先頭から``n``件のイベントを適用した卓情報を返す
+
+        Parameters
+        ----------
+        n : int
+            適用するイベント数 (0 の場合は開局直後)
+
+        Returns
+        -------
+        Board
+            卓情報 (呼び出し元で変更してよい)
+        """
+
+        if not 0 <= n <= len(self._events):
+            raise IndexError(n)
+        i = self._nearest(n)
+        if i == n:
+            return copy.deepcopy(self._snapshots[i])
+        board = None
+        for _, _, board in self.states(i, n):
+            pass
+        return board
@@ -0,0 +1,259 @@
+"""jongpy.core.rescore"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator
+
+from jongpy.core.rule import rule
+from jongpy.core.dev.game import Game
+from jongpy.core.sink import read_jsonl
+from jongpy.core.archive import Archive
+
+
+# 比較する和了・流局の項目
+_HULE_KEYS = ('l', 'baojia', 'fu', 'fanshu', 'damanguan', 'defen', 'hupai', 'fenpei')
+_PINGJU_KEYS = ('name', 'fenpei')
+# 比較する終局時の項目
+_JIEJU_KEYS = ('defen', 'rank', 'point')
+
+
+def iter_paipu(path: str | os.PathLike) -> Iterator[tuple[str, dict]]:
+    """
+    牌譜を読み出す
+
+    ``path``がディレクトリの場合は、その下の``.json``・``.jsonl``・
+    ``.jppa``ファイルを名前順に読む。``.json``は牌譜1つまたは牌譜の配列、
+    ``.jsonl``は1行1牌譜(``runner``の出力)または``JsonlSink``の出力、
+    ``.jppa``は``ArchiveWriter``の出力とする
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        ファイルまたはディレクトリ
+
+    Yields
+    ------
+    tuple[str, dict]
+        牌譜の識別名 (``ファイル名#番号``) と牌譜
+    """
+
+    path = os.fspath(path)
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if os.path.splitext(name)[1] in ('.json', '.jsonl', '.jppa'):
+                yield from iter_paipu(os.path.join(path, name))
+        return
+
+    ext = os.path.splitext(path)[1]
+    if ext == '.jppa':
+        with Archive(path) as archive:
+            for i in range(len(archive)):
+                yield f'{path}#{i}', archive.paipu(i)
+    elif ext == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        if lines and 'log' in json.loads(lines[0]):
+            paipu = [json.loads(line) for line in lines]
+        else:
+            paipu = read_jsonl(lines)
+        for i, p in enumerate(paipu):
+            yield f'{path}#{i}', p
+    else:
+        with open(path, encoding='utf-8') as f:
+            paipu = json.load(f)
+        if isinstance(paipu, dict):
+            paipu = [paipu]
+        for i, p in enumerate(paipu):
+            yield f'{path}#{i}', p
+
+
+def _mismatch(round: int | None, event: str, key: str, expected: Any, actual: Any) -> dict:
+    return {'round': round, 'event': event, 'key': key, 'expected': expected, 'actual': actual}
+
+
+def compare(expected: dict, actual: dict) -> list[dict]:
+    """
+    2つの牌譜の和了・流局の結果と終局時の結果を比較する
+
+    Parameters
+    ----------
+    expected : dict
+        元の牌譜
+    actual : dict
+        再計算した牌譜
+
+    Returns
+    -------
+    list[dict]
+        不一致の一覧。各要素は 'round' (局の通し番号、終局時は None)、
+        'event' ('hule'・'pingju'・'jieju' など)、'key'、'expected'、'actual'
+    """
+
+    mismatch = []
+    n_rounds = max(len(expected['log']), len(actual['log']))
+    for r in range(n_rounds):
+        exp = [e for e in (expected['log'][r] if r < len(expected['log']) else [])
+               if 'hule' in e or 'pingju' in e]
+        act = [e for e in (actual['log'][r] if r < len(actual['log']) else [])
+               if 'hule' in e or 'pingju' in e]
+        if len(exp) != len(act):
+            mismatch.append(_mismatch(r, 'result', 'count', len(exp), len(act)))
+        for e, a in zip(exp, act):
+            kind = next(iter(e))
+            if kind not in a:
+                mismatch.append(_mismatch(r, 'result', 'kind', kind, next(iter(a))))
+                continue
+            for key in (_HULE_KEYS if kind == 'hule' else _PINGJU_KEYS):
+                if e[kind].get(key) != a[kind].get(key):
+                    mismatch.append(_mismatch(r, kind, key, e[kind].get(key), a[kind].get(key)))
+
+    for key in _JIEJU_KEYS:
+        if expected.get(key) != actual.get(key):
+            mismatch.append(_mismatch(None, 'jieju', key, expected.get(key), actual.get(key)))
+    return mismatch
+
+
+def rescore(paipu: dict, rule_: dict | None = None) -> dict:
+    """
+    牌譜を開発用の``Game``で再生し、和了・流局の点数を再計算する
+
+    Parameters
+    ----------
+    paipu : dict
+        牌譜
+    rule_ : dict or None, default None
+        再計算に使うルール。省略時はデフォルトのルール
+
+    Returns
+    -------
+    dict
+        再計算した牌譜
+    """
+
+    game = Game(copy.deepcopy(paipu), rule_ or rule())
+    game.do_sync()
+    return game._paipu
+
+
+def validate(paipu: dict, rule_: dict | None = None) -> dict[str, Any]:
+    """
+    牌譜を再計算し、元の牌譜と比較する
+
+    Parameters
+    ----------
+    paipu : dict
+        牌譜
+    rule_ : dict or None, default None
+        ルール
+
+    Returns
+    -------
+    dict
+        'rounds' (局数)、'mismatch' (``compare``の結果)、'error'
+        (再生中に例外が発生した場合はその内容、それ以外は None)
+    """
+
+    try:
+        mismatch = compare(paipu, rescore(paipu, rule_))
+        error = None
+    except Exception as e:
+        mismatch = []
+        error = f'{type(e).__name__}: {e}'
+    return {'rounds': len(paipu['log']), 'mismatch': mismatch, 'error': error}
+
+
+def _validate(task: tuple[str, dict, dict | None]) -> dict[str, Any]:
+    name, paipu, rule_ = task
+    result = validate(paipu, rule_)
+    result['name'] = name
+    return result
+
+
+def validate_all(
+    paths: list[str | os.PathLike],
+    rule_: dict | None = None,
+    processes: int | None = None,
+    chunksize: int = 8,
+    limit: int = 100
+) -> dict[str, Any]:
+    """
+    牌譜をプロセスプールで並列に検証し、結果を集計する
+
+    Parameters
+    ----------
+    paths : list
+        牌譜のファイルまたはディレクトリ (``iter_paipu``参照)
+    rule_ : dict or None, default None
+        ルール
+    processes : int or None, default None
+        プロセス数。1 以下の場合はプロセスプールを使わない。省略時は CPU 数
+    chunksize : int, default 8
+        1回にワーカーへ渡す牌譜の数
+    limit : int, default 100
+        集計結果に含める不一致の対局数の上限
+
+    Returns
+    -------
+    dict
+        'n_games'、'n_rounds'、'n_mismatch' (不一致のあった対局数)、
+        'n_error' (再生に失敗した対局数)、'time' (所要時間[秒])、
+        'games_per_second'、'mismatch' (不一致・失敗のあった対局ごとの
+        'name'、'mismatch'、'error'。最大``limit``件)
+    """
+
+    rule_ = rule_ or rule()
+    tasks = ((name, paipu, rule_) for path in paths for name, paipu in iter_paipu(path))
+
+    summary = {'n_games': 0, 'n_rounds': 0, 'n_mismatch': 0, 'n_error': 0, 'mismatch': []}
+    start = time.perf_counter()
+
+    def collect(results):
+        for r in results:
+            summary['n_games'] += 1
+            summary['n_rounds'] += r['rounds']
+            if r['error'] is not None:
+                summary['n_error'] += 1
+            elif r['mismatch']:
+                summary['n_mismatch'] += 1
+            else:
+                continue
+            if len(summary['mismatch']) < limit:
+                summary['mismatch'].append({'name': r['name'], 'mismatch': r['mismatch'], 'error': r['error']})
+
+    if processes is not None and processes <= 1:
+        collect(map(_validate, tasks))
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            collect(executor.map(_validate, tasks, chunksize=chunksize))
+
+    elapsed = time.perf_counter() - start
+    summary['time'] = elapsed
+    summary['games_per_second'] = summary['n_games'] / elapsed if elapsed > 0 else float('inf')
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    """コマンドラインから牌譜を検証し、集計結果を JSON で出力する"""
+
+    parser = argparse.ArgumentParser(prog='python -m jongpy.core.rescore', description='牌譜の点数の再計算と検証')
+    parser.add_argument('paths', nargs='+', help='牌譜のファイルまたはディレクトリ')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='プロセス数 (省略時は CPU 数)')
+    parser.add_argument('-r', '--rule', default=None, help='ルールの変更点 (JSON)')
+    parser.add_argument('-l', '--limit', type=int, default=100, help='出力する不一致の対局数の上限')
+    args = parser.parse_args(argv)
+
+    rule_ = rule(json.loads(args.rule)) if args.rule else rule()
+    summary = validate_all(args.paths, rule_, args.processes, limit=args.limit)
+
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write('\n')
+    return 1 if summary['n_mismatch'] or summary['n_error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""jongpy.core.runner"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterator
+
+from jongpy.core.game import Game
+from jongpy.core.rule import rule
+
+
+class _AutoPlayer:
+    """応答しない対局者 (打牌はゲーム側が手牌の一番右の牌を選ぶ)"""
+
+    raw_state = True
+
+    def action(self, msg: dict, callback: Callable | None = None):
+        if callback is not None:
+            callback(None)
+
+
+class _PaipuWriter:
+    """``run_games``の``queue``として牌譜を1対局1行の JSON で書き出す"""
+
+    def __init__(self, f):
+        self._f = f
+
+    def put(self, paipu: dict | None):
+        if paipu is not None:
+            self._f.write(json.dumps(paipu, ensure_ascii=False) + '\n')
+
+
+def load_player(spec: str) -> Callable:
+    """
+    ``module:Class``形式の文字列から対局者クラスを取得する
+
+    Parameters
+    ----------
+    spec : str
+        対局者クラスの指定 (例: ``mypackage.ai:Player``)
+
+    Returns
+    -------
+    callable
+        引数なしで対局者を生成する呼び出し可能オブジェクト
+    """
+    module, _, name = spec.partition(':')
+    if not module or not name:
+        raise ValueError(spec)
+    return getattr(importlib.import_module(module), name)
+
+
+def game_seed(seed: int, i: int) -> int:
+    """
+    ``seed``から``i``番目の対局のシードを決める
+
+    Parameters
+    ----------
+    seed : int
+        全体のシード
+    i : int
+        対局の通し番号
+
+    Returns
+    -------
+    int
+        対局のシード
+    """
+    return seed * (1 << 32) + i
+
+
+def _play(i: int, seed: int, player: Callable, rule_: dict, paipu: bool) -> dict[str, Any]:
+
+    # ワーカープロセスで1対局を実行する
+    game = Game([player() for _ in range(4)], None, rule_)
+    r = game.simulate(1, seed=game_seed(seed, i), paipu=paipu)
+    return {
+        'game': i,  # 対局の通し番号
+        'defen': r['defen'][0],     # 終了時の持ち点
+        'rank': r['rank'][0],   # 着順
+        'point': r['point'][0],     # ポイント
+        'paipu': r['paipu'][0] if paipu else None,  # 牌譜
+    }
+
+
+def iter_games(
+    n_games: int,
+    player: Callable = _AutoPlayer,
+    rule_: dict | None = None,
+    seed: int = 0,
+    processes: int | None = None,
+    paipu: bool = False
+) -> Iterator[dict[str, Any]]:
+    """
+    ``n_games``回の対局をプロセスプールで並列に実行し、終了した順に結果を返す
+
+    各対局は``game_seed(seed, i)``で初期化した乱数生成器で起家と牌山を
+    決めるので、プロセス数や終了順によらず同じ対局が再現される
+
+    Parameters
+    ----------
+    n_games : int
+        対局数
+    player : callable
+        引数なしで対局者を生成する呼び出し可能オブジェクト (pickle 可能であること)
+    rule_ : dict or None, default None
+        ルール。省略時はデフォルトのルール
+    seed : int, default 0
+        全体のシード
+    processes : int or None, default None
+        プロセス数。1 以下の場合はプロセスプールを使わずに実行する。
+        省略時は CPU 数
+    paipu : bool, default False
+        牌譜を記録して返すかどうか
+
+    Yields
+    ------
+    dict
+        'game' (通し番号)、'defen'、'rank'、'point'、'paipu' (``paipu``が
+        偽の場合は None)
+    """
+
+    rule_ = rule_ or rule()
+
+    if processes is not None and processes <= 1:
+        for i in range(n_games):
+            yield _play(i, seed, player, rule_, paipu)
+        return
+
+    with ProcessPoolExecutor(processes) as executor:
+        futures = [executor.submit(_play, i, seed, player, rule_, paipu) for i in range(n_games)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_games(
+    n_games: int,
+    player: Callable = _AutoPlayer,
+    rule_: dict | None = None,
+    seed: int = 0,
+    processes: int | None = None,
+    queue: Any = None
+) -> dict[str, Any]:
+    """
+    ``n_games``回の対局を並列に実行し、着順・ポイントを集計する
+
+    Parameters
+    ----------
+    n_games : int
+        対局数
+    player : callable
+        引数なしで対局者を生成する呼び出し可能オブジェクト (pickle 可能であること)
+    rule_ : dict or None, default None
+        ルール。省略時はデフォルトのルール
+    seed : int, default 0
+        全体のシード
+    processes : int or None, default None
+        プロセス数 (``iter_games``参照)
+    queue : queue.Queue or None, default None
+        指定した場合、牌譜を記録して対局の終了順に``put``する。
+        全対局の終了後に None を``put``する
+
+    Returns
+    -------
+    dict
+        'n_games' (対局数)、'time' (所要時間[秒])、'games_per_second'、
+        'rank' (席ごとの着順の回数)、'avg_rank' (席ごとの平均着順)、
+        'avg_point' (席ごとの平均ポイント)、'avg_defen' (席ごとの平均持ち点)
+    """
+
+    n_rank = [[0] * 4 for _ in range(4)]
+    sum_rank = [0] * 4
+    sum_point = [0.0] * 4
+    sum_defen = [0] * 4
+
+    start = time.perf_counter()
+    for r in iter_games(n_games, player, rule_, seed, processes, queue is not None):
+        for id in range(4):
+            n_rank[id][r['rank'][id] - 1] += 1
+            sum_rank[id] += r['rank'][id]
+            sum_point[id] += float(r['point'][id])
+            sum_defen[id] += r['defen'][id]
+        if queue is not None:
+            queue.put(r['paipu'])
+    elapsed = time.perf_counter() - start
+
+    if queue is not None:
+        queue.put(None)
+
+    n = max(n_games, 1)
+    return {
+        'n_games': n_games,
+        'time': elapsed,
+        'games_per_second': n_games / elapsed if elapsed > 0 else float('inf'),
+        'rank': n_rank,
+        'avg_rank': [x / n for x in sum_rank],
+        'avg_point': [x / n for x in sum_point],
+        'avg_defen': [x / n for x in sum_defen],
+    }
+
+
+def main(argv: list[str] | None = None):
+    """コマンドラインから自己対戦を実行し、集計結果を JSON で出力する"""
+
+    parser = argparse.ArgumentParser(prog='python -m jongpy.core.runner', description='自己対戦の並列実行')
+    parser.add_argument('-n', '--games', type=int, default=100, help='対局数')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='プロセス数 (省略時は CPU 数)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='乱数のシード')
+    parser.add_argument('-p', '--player', default=None, help='対局者クラス (module:Class)')
+    parser.add_argument('-r', '--rule', default=None, help='ルールの変更点 (JSON)')
+    parser.add_argument('-o', '--paipu', default=None, help='牌譜を1対局1行の JSON で出力するファイル')
+    args = parser.parse_args(argv)
+
+    player = load_player(args.player) if args.player else _AutoPlayer
+    rule_ = rule(json.loads(args.rule)) if args.rule else rule()
+
+    if args.paipu:
+        with open(args.paipu, 'w', encoding='utf-8') as f:
+            stats = run_games(args.games, player, rule_, args.seed, args.processes, _PaipuWriter(f))
+    else:
+        stats = run_games(args.games, player, rule_, args.seed, args.processes)
+
+    json.dump(stats, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
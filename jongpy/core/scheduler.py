@@ -0,0 +1,135 @@
+"""jongpy.core.scheduler"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Callable
+
+
+class Timer:
+    """``Scheduler.call_later``が返すキャンセル可能なタイマー"""
+
+    __slots__ = ('_scheduler', '_handle', '_cancelled')
+
+    def __init__(self, scheduler: Scheduler) -> None:
+        self._scheduler = scheduler
+        self._handle = None
+        self._cancelled = False
+
+    def cancel(self):
+        """タイマーをキャンセルする (どのスレッドから呼び出してもよい)"""
+
+        if self._cancelled:
+            return
+        self._cancelled = True
+        if self._handle is not None:
+            self._scheduler.call_soon(self._handle.cancel)
+
+
+class Scheduler:
+    """
+    複数の対局で共有する、長寿命のイベントループによるタイマー
+
+    ``loop``を省略した場合は専用のデーモンスレッドでイベントループを
+    実行する。コールバックはすべてそのループのスレッドで順に呼び出される
+    ので、対局者の``action``はブロックしてはならない
+
+    Parameters
+    ----------
+    loop : asyncio.AbstractEventLoop or None, default None
+        タイマーを登録するイベントループ。実行中のループを指定すると
+        そのループ上で全ての対局を動かせる
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self._thread = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, args=(loop,), name='jongpy-scheduler', daemon=True)
+            self._thread.start()
+        self._loop = loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """タイマーを登録するイベントループ"""
+        return self._loop
+
+    def _in_loop(self) -> bool:
+        # 呼び出し元がループのスレッドで実行中かどうか
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def call_soon(self, callback: Callable, *args):
+        """``callback``をループのスレッドでできるだけ早く呼び出す"""
+
+        if self._in_loop():
+            self._loop.call_soon(callback, *args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def call_later(self, delay: float, callback: Callable, *args) -> Timer:
+        """
+        ``delay``秒後に``callback(*args)``を呼び出す
+
+        Parameters
+        ----------
+        delay : float
+            待ち時間[秒]
+        callback : callable
+            呼び出す関数
+
+        Returns
+        -------
+        Timer
+            キャンセル可能なタイマー
+        """
+
+        timer = Timer(self)
+
+        def fire():
+            if not timer._cancelled:
+                timer._cancelled = True
+                callback(*args)
+
+        def schedule():
+            if not timer._cancelled:
+                timer._handle = self._loop.call_later(delay, fire)
+
+        if self._in_loop():
+            schedule()
+        else:
+            self._loop.call_soon_threadsafe(schedule)
+        return timer
+
+    def close(self):
+        """専用スレッドのイベントループを停止する"""
+
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """全ての対局で共有する既定のスケジューラを返す (初回呼び出し時に起動する)"""
+
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Scheduler()
+    return _default
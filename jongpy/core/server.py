@@ -0,0 +1,187 @@
+"""jongpy.core.server"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable
+
+from jongpy.core.async_game import AsyncGame
+from jongpy.core.exceptions import InvalidOperationError
+
+
+class _Table(AsyncGame):
+    """``TableManager``が管理する卓 (応答待ちを計測・制限する)"""
+
+    def __init__(self, manager: TableManager, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._manager = manager
+
+    async def _ask(self, msg: list[dict]):
+        manager = self._manager
+        if manager._pending is None:
+            return await manager._measure(super()._ask(msg))
+        async with manager._pending:
+            return await manager._measure(super()._ask(msg))
+
+
+class TableManager:
+    """
+    1つのイベントループ上で多数の卓(``AsyncGame``)を並行して進行させる
+
+    ``max_pending``を指定すると、対局者の応答を同時に待つ卓の数を
+    制限する。応答が遅れて枠が埋まっている間は、他の卓は次の通知の
+    送信を待たされる(バックプレッシャー)
+
+    Parameters
+    ----------
+    max_pending : int or None, default None
+        応答を同時に待つ卓の最大数。省略時は無制限
+    window : int, default 1000
+        応答待ち時間の統計に使う直近の手番数
+    """
+
+    def __init__(self, max_pending: int | None = None, window: int = 1000) -> None:
+        self._pending = asyncio.Semaphore(max_pending) if max_pending else None
+        self._tables: dict[int, tuple[_Table, asyncio.Task]] = {}
+        self._next_id = 0
+        self._closing = False
+
+        self._start = time.perf_counter()
+        self._n_message = 0     # 応答を求めた通知メッセージ数
+        self._n_finished = 0    # 終局した卓の数
+        self._n_stopped = 0     # 停止した卓の数
+        self._latency = deque(maxlen=window)    # 直近の応答待ち時間[秒]
+
+    async def _measure(self, ask):
+        start = time.perf_counter()
+        try:
+            return await ask
+        finally:
+            self._latency.append(time.perf_counter() - start)
+            self._n_message += 4
+
+    def add(
+        self,
+        players: list,
+        rule_: dict | None = None,
+        title: str | None = None,
+        speed: int = 0,
+        wait: int = 0,
+        timeout: float | None = None,
+        qijia: int | None = None,
+        callback: Callable | None = None
+    ) -> int:
+        """
+        卓を追加して対局を開始する (実行中のイベントループから呼び出すこと)
+
+        Parameters
+        ----------
+        players : list
+            対局者 (``AsyncGame``参照)
+        rule_ : dict or None, default None
+            ルール
+        title : str or None, default None
+            牌譜のタイトル
+        speed : int, default 0
+            対局速度
+        wait : int, default 0
+            和了・流局・終局時の待ち時間[ミリ秒]
+        timeout : float or None, default None
+            1回の通知に対する応答の待ち時間[秒]
+        qijia : int or None, default None
+            起家の指定
+        callback : callable or None, default None
+            終局時に牌譜を引数に呼び出す関数
+
+        Returns
+        -------
+        int
+            卓の番号
+        """
+
+        if self._closing:
+            raise InvalidOperationError('TableManager is stopping')
+
+        game = _Table(self, players, callback, rule_, title, timeout)
+        game.speed = speed
+        game.wait = wait
+
+        id = self._next_id
+        self._next_id += 1
+        task = asyncio.get_running_loop().create_task(self._play(id, game, qijia))
+        self._tables[id] = (game, task)
+        return id
+
+    async def _play(self, id: int, game: _Table, qijia: int | None) -> dict:
+        # run() は停止要求を解除してしまうので、開始前の stop() も有効になるよう直接進行させる
+        try:
+            game.kaiju(qijia)
+            await game.next()
+            if game._stop is None:
+                self._n_finished += 1
+            else:
+                self._n_stopped += 1
+            return game._paipu
+        finally:
+            del self._tables[id]
+
+    def game(self, id: int) -> AsyncGame | None:
+        """卓の番号に対応する対局 (終了した卓の場合は None)"""
+        table = self._tables.get(id)
+        return table[0] if table is not None else None
+
+    @property
+    def active(self) -> int:
+        """進行中の卓の数"""
+        return len(self._tables)
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        稼働状況
+
+        Returns
+        -------
+        dict
+            'active' (進行中の卓数)、'finished' (終局した卓数)、
+            'stopped' (停止した卓数)、'messages' (応答を求めた通知の数)、
+            'messages_per_second'、'p50_latency'・'p99_latency'
+            (直近の手番の応答待ち時間[秒]。手番がない場合は None)
+        """
+
+        elapsed = time.perf_counter() - self._start
+        latency = sorted(self._latency)
+
+        def percentile(q):
+            if not latency:
+                return None
+            return latency[min(len(latency) - 1, int(len(latency) * q))]
+
+        return {
+            'active': self.active,
+            'finished': self._n_finished,
+            'stopped': self._n_stopped,
+            'messages': self._n_message,
+            'messages_per_second': self._n_message / elapsed if elapsed > 0 else 0.0,
+            'p50_latency': percentile(0.50),
+            'p99_latency': percentile(0.99),
+        }
+
+    async def join(self):
+        """全ての卓が終了するまで待つ"""
+        while self._tables:
+            await asyncio.gather(*[task for _, task in self._tables.values()], return_exceptions=True)
+
+    async def stop(self):
+        """
+        新しい卓の受付を止め、進行中の卓を``Game.stop``で停止させる
+
+        各卓は応答待ちの手番が終わった時点で停止する。全ての卓が
+        停止するまで待つ
+        """
+
+        self._closing = True
+        for game, _ in self._tables.values():
+            game.stop()
+        await self.join()
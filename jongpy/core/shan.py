@@ -2,6 +2,7 @@
 
 import random
 from collections import deque
+from functools import lru_cache
 from typing import Any
 
 from jongpy.core.shoupai import Shoupai
@@ -16,6 +17,8 @@ class Shan:
     ----------
     rule_ : dict
         ルール
+    rng : random.Random or numpy.random.Generator or None, default None
+        牌を並び替える乱数生成器。省略時はモジュール``random``を使用する
     """
 
     @staticmethod
@@ -43,12 +46,11 @@ class Shan:
         n = int(p[1]) or 5
         return (s + str(n % 4 + 1) if n < 5 else s + str((n - 4) % 3 + 5)) if s == 'z' else s + str(n % 9 + 1)
 
-    def __init__(self, rule_: dict[str, Any] = {}) -> None:
-
-        self._rule = rule_
-        hongpai: dict[str, int] = rule_.get('hongpai')
-
-        # 赤牌の枚数を考慮して136枚の牌を生成する
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _base_pai(hongpai: tuple[tuple[str, int], ...]) -> tuple[str, ...]:
+        # 赤牌の枚数ごとに並び替える前の136枚の牌を生成する
+        hongpai = dict(hongpai)
         pai = []
         for s in ['m', 'p', 's', 'z']:
             for n in range(1, (7 if s == 'z' else 9) + 1):
@@ -57,11 +59,42 @@ class Shan:
                         pai.append(s + '0')
                     else:
                         pai.append(s + str(n))
+        return tuple(pai)
+
+    @classmethod
+    def base_pai(cls, rule_: dict[str, Any]) -> tuple[str, ...]:
+        """
+        並び替える前の136枚の牌 (赤牌の設定ごとにキャッシュする)
+
+        Parameters
+        ----------
+        rule_ : dict
+            ルール
+
+        Returns
+        -------
+        tuple[str]
+            牌の文字列表現
+        """
+        return cls._base_pai(tuple(sorted((rule_.get('hongpai') or {}).items())))
+
+    def __init__(self, rule_: dict[str, Any] = {}, rng: random.Random | None = None) -> None:
 
-        # 生成した牌をランダムに並び変える
-        self._pai = deque()
-        while len(pai):
-            self._pai.append(pai.pop(random.randrange(len(pai))))
+        pai = self.base_pai(rule_)
+
+        # 生成した牌をランダムに並び変える (Fisher-Yates のシャッフル)
+        rng = rng or random
+        if hasattr(rng, 'permutation'):     # numpy.random.Generator
+            pai = [pai[i] for i in rng.permutation(len(pai)).tolist()]
+        else:
+            pai = list(pai)
+            rng.shuffle(pai)
+        self._init(rule_, pai)
+
+    def _init(self, rule_: dict[str, Any], pai: list[str]):
+
+        self._rule = rule_
+        self._pai = deque(pai)
 
         self._baopai = [self._pai[4]]   # ドラ表示牌を決定する
         # (裏ドラありなら)裏ドラ表示牌を決定する
@@ -69,6 +102,48 @@ class Shan:
         self._weikaigang = False
         self._closed = False
 
+    @classmethod
+    def batch(cls, rule_: dict[str, Any], n: int, rng: random.Random | None = None) -> list['Shan']:
+        """
+        牌山を``n``個まとめて生成する
+
+        ``rng``が``numpy.random.Generator``の場合は、全ての牌山の並びを
+        1回の呼び出しで生成する
+
+        Parameters
+        ----------
+        rule_ : dict
+            ルール
+        n : int
+            生成する牌山の数
+        rng : random.Random or numpy.random.Generator or None, default None
+            乱数生成器。省略時はモジュール``random``を使用する
+
+        Returns
+        -------
+        list[Shan]
+            牌山の配列
+        """
+
+        pai = cls.base_pai(rule_)
+        rng = rng or random
+        if hasattr(rng, 'permuted'):    # numpy.random.Generator
+            order = rng.permuted([range(len(pai))] * n, axis=1).tolist() if n else []
+            walls = [[pai[i] for i in idx] for idx in order]
+        else:
+            walls = []
+            for _ in range(n):
+                wall = list(pai)
+                rng.shuffle(wall)
+                walls.append(wall)
+
+        shan = []
+        for wall in walls:
+            s = cls.__new__(cls)    # __init__ を経由せずに生成する
+            s._init(rule_, wall)
+            shan.append(s)
+        return shan
+
     def zimo(self) -> str:
         """
         山牌からのツモ
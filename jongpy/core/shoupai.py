@@ -1,6 +1,8 @@
 """jongpy.core.shoupai"""
 
 import re
+import sys
+from itertools import permutations, product
 
 from jongpy.core.exceptions import (InvalidOperationError,
                                     MianziFormatError,
@@ -32,7 +34,7 @@ class Shoupai:
             引数``p``が牌の文字表現として正しければそのまま返す
             正しくなければ None を返す
         """
-        return p if re.search(r'^(?:[mps]\d|z[1-7])_?\*?[\+\=\-]?$', p) else None
+        return p if p in _VALID_PAI else None
 
     @staticmethod
     def valid_mianzi(m: str) -> str | None:
@@ -47,44 +49,15 @@ class Shoupai:
         Returns
         -------
         str or None
-            引数``m``が面子の文字表現として正しければそのまま返す
+            引数``m``が面子の文字表現として正しければ正規化した文字列を返す
             正しくなければ None を返す
         """
 
-        if re.search(r'^z.*[089]', m):  # 字牌に0, 8, 9があればエラー
-            return None
-
-        h = m.replace('0', '5')     # 赤牌(0)を黒牌(5)に正規化
-
-        if re.search(r'^[mpsz](\d)\1\1[\+\=\-]\1?$', h):    # 刻子か槓子の場合
-            # 先頭の'05'を'50'に
-            return re.sub(r'([mps])05', lambda x: x.group(1) + '50', m)
-
-        elif re.search(r'^[mpsz](\d)\1\1\1[\+\=\-]?$', h):  # 暗槓か大明槓の場合
-            # 鳴いた牌以外の順序を0が後ろになるように並び変える
-            m_tail = re.search(r'\d[\+\=\-]$', m)
-            return (m[0] + ''.join(sorted(re.findall(r'\d(?![\+\=\-])', m), reverse=True))
-                    + (m_tail.group() if m_tail else ''))
-
-        elif re.search(r'^[mps]\d+\-\d*$', h):  # それ以外は順子とみなす
-            # まず順子として正しいかチェック
-            hongpai = '0' in m      # 赤牌が含まれているかチェック
-            nn = sorted(re.findall(r'\d', h))   # 数字部分だけを取り出し並び替える
-
-            if len(nn) != 3:    # 数字が3つでなければエラー
-                return None
-
-            # 数字が順番に並んでなければエラー
-            if int(nn[0]) + 1 != int(nn[1]) or int(nn[1]) + 1 != int(nn[2]):
-                return None
-
-            # 順子として正しいので順番を正しく入れ替える
-            h = h[0] + ''.join(sorted(re.findall(r'\d[\+\=\-]?', h)))
-
-            # 赤牌を復元
-            return h.replace('5', '0') if hongpai else h
-
-        return None
+        # 正しい面子の文字列表現は有限なので、事前に作成した表を引く
+        n = _VALID_MIANZI.get(m)
+        if n is not None:
+            return n
+        return _valid_mianzi(m)
 
     def __init__(self, qipai: list[str] = []) -> None:
 
@@ -728,3 +701,94 @@ class Shoupai:
                                     mianzi.append(m + str(n))
 
         return mianzi
+
+
+def _valid_mianzi(m: str) -> str | None:
+    """正規表現による面子の文字列表現判定"""
+
+    if re.search(r'^z.*[089]', m):  # 字牌に0, 8, 9があればエラー
+        return None
+
+    h = m.replace('0', '5')     # 赤牌(0)を黒牌(5)に正規化
+
+    if re.search(r'^[mpsz](\d)\1\1[\+\=\-]\1?$', h):    # 刻子か槓子の場合
+        # 先頭の'05'を'50'に
+        return re.sub(r'([mps])05', lambda x: x.group(1) + '50', m)
+
+    elif re.search(r'^[mpsz](\d)\1\1\1[\+\=\-]?$', h):  # 暗槓か大明槓の場合
+        # 鳴いた牌以外の順序を0が後ろになるように並び変える
+        m_tail = re.search(r'\d[\+\=\-]$', m)
+        return (m[0] + ''.join(sorted(re.findall(r'\d(?![\+\=\-])', m), reverse=True))
+                + (m_tail.group() if m_tail else ''))
+
+    elif re.search(r'^[mps]\d+\-\d*$', h):  # それ以外は順子とみなす
+        # まず順子として正しいかチェック
+        hongpai = '0' in m      # 赤牌が含まれているかチェック
+        nn = sorted(re.findall(r'\d', h))   # 数字部分だけを取り出し並び替える
+
+        if len(nn) != 3:    # 数字が3つでなければエラー
+            return None
+
+        # 数字が順番に並んでなければエラー
+        if int(nn[0]) + 1 != int(nn[1]) or int(nn[1]) + 1 != int(nn[2]):
+            return None
+
+        # 順子として正しいので順番を正しく入れ替える
+        h = h[0] + ''.join(sorted(re.findall(r'\d[\+\=\-]?', h)))
+
+        # 赤牌を復元
+        return h.replace('5', '0') if hongpai else h
+
+    return None
+
+
+def _make_valid_pai() -> frozenset[str]:
+    """正しい牌の文字列表現を全て列挙する"""
+
+    pai = set()
+    for s in ['m', 'p', 's', 'z']:
+        for n in (range(1, 8) if s == 'z' else range(0, 10)):
+            for zimo in ['', '_']:
+                for lizhi in ['', '*']:
+                    for d in ['', '+', '=', '-']:
+                        pai.add(sys.intern(s + str(n) + zimo + lizhi + d))
+    return frozenset(pai)
+
+
+def _make_valid_mianzi() -> dict[str, str]:
+    """正しい面子の文字列表現と正規化した文字列の対応表を作成する"""
+
+    def digits(s: str, n: int) -> list[str]:
+        # 赤牌を考慮した数字の候補
+        return ['5', '0'] if s != 'z' and n == 5 else [str(n)]
+
+    candidates = []
+    for s in ['m', 'p', 's', 'z']:
+        for n in range(1, 8 if s == 'z' else 10):
+            dd = digits(s, n)
+            # 刻子・加槓
+            for nn in product(dd, repeat=3):
+                for d in ['+', '=', '-']:
+                    for tail in [''] + dd:
+                        candidates.append(s + ''.join(nn) + d + tail)
+            # 暗槓・大明槓
+            for nn in product(dd, repeat=4):
+                for d in ['', '+', '=', '-']:
+                    candidates.append(s + ''.join(nn) + d)
+            # 順子
+            if s != 'z' and n <= 7:
+                for nn in product(digits(s, n), digits(s, n + 1), digits(s, n + 2)):
+                    for order in permutations(nn):
+                        for i in range(3):
+                            candidates.append(s + ''.join(order[:i + 1]) + '-' + ''.join(order[i + 1:]))
+
+    mianzi = {}
+    for m in candidates:
+        n = _valid_mianzi(m)
+        if n is not None:
+            mianzi[sys.intern(m)] = sys.intern(n)
+    return mianzi
+
+
+_VALID_PAI = _make_valid_pai()
+_VALID_MIANZI = _make_valid_mianzi()
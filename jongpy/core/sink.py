@@ -0,0 +1,206 @@
+"""jongpy.core.sink"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import IO
+
+
+class PaipuSink:
+    """
+    牌譜の出力先の基底クラス
+
+    ``Game.sink``に設定すると、対局の進行に合わせて牌譜を1イベントずつ
+    受け取る。既定の実装は何もしない
+    """
+
+    def kaiju(self, kaiju: dict) -> int:
+        """
+        対局の開始
+
+        Parameters
+        ----------
+        kaiju : dict
+            牌譜のヘッダ ('title'、'player'、'qijia'、'rule')
+
+        Returns
+        -------
+        int
+            出力先での対局番号
+        """
+        return 0
+
+    def add(self, game: int, round: int, paipu: dict):
+        """
+        局進行のイベントを1件出力する
+
+        Parameters
+        ----------
+        game : int
+            対局番号 (``kaiju``の返り値)
+        round : int
+            対局内の局の通し番号 (0 から)
+        paipu : dict
+            牌譜のイベント
+        """
+        pass
+
+    def jieju(self, game: int, jieju: dict):
+        """
+        対局の終了
+
+        Parameters
+        ----------
+        game : int
+            対局番号
+        jieju : dict
+            終局時の情報 ('defen'、'rank'、'point')
+        """
+        pass
+
+    def flush(self):
+        """バッファを出力先に書き出す"""
+        pass
+
+    def close(self):
+        """出力先を閉じる"""
+        pass
+
+
+class JsonlSink(PaipuSink):
+    """
+    牌譜を1イベント1行の JSON Lines で出力する
+
+    各行はイベントに対局番号``game``と局番号``round``を加えたもの
+    (例: ``{"game": 0, "round": 0, "zimo": {"l": 0, "p": "m1"}}``)。
+    対局の開始・終了の行には``kaiju``・``jieju``キーを持ち、``round``を持たない
+
+    Parameters
+    ----------
+    f : str or os.PathLike or file object
+        出力先。パスの場合はファイルを開き、``close``で閉じる。
+        ソケットに出力する場合は``socket.makefile('w')``を渡す
+    buffer_size : int, default 65536
+        バッファの文字数がこれを超えたら書き出す
+    flush_interval : float or None, default 1.0
+        前回の書き出しからこの秒数が経過していたら、次のイベントで書き出す。
+        None の場合は時間による書き出しを行わない
+    game : int, default 0
+        最初の対局番号
+    """
+
+    def __init__(
+        self,
+        f: str | os.PathLike | IO[str],
+        buffer_size: int = 65536,
+        flush_interval: float | None = 1.0,
+        game: int = 0
+    ) -> None:
+        if isinstance(f, (str, os.PathLike)):
+            self._f = open(f, 'a', encoding='utf-8')
+            self._own = True
+        else:
+            self._f = f
+            self._own = False
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._game = game
+
+        self._buffer = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def _write(self, line: dict):
+        s = json.dumps(line, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self._buffer.append(s)
+        self._size += len(s)
+        if self._size >= self._buffer_size:
+            self.flush()
+        elif (self._flush_interval is not None
+                and time.monotonic() - self._last_flush >= self._flush_interval):
+            self.flush()
+
+    def kaiju(self, kaiju: dict) -> int:
+        game = self._game
+        self._game += 1
+        self._write({'game': game, 'kaiju': kaiju})
+        return game
+
+    def add(self, game: int, round: int, paipu: dict):
+        line = {'game': game, 'round': round}
+        line.update(paipu)
+        self._write(line)
+
+    def jieju(self, game: int, jieju: dict):
+        self._write({'game': game, 'jieju': jieju})
+        self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._f.write(''.join(self._buffer))
+            self._buffer = []
+            self._size = 0
+        self._f.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._own:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jsonl(f: str | os.PathLike | IO[str]) -> list[dict]:
+    """
+    ``JsonlSink``で出力したファイルから牌譜を復元する
+
+    終局していない対局も途中までの牌譜として返す
+
+    Parameters
+    ----------
+    f : str or os.PathLike or file object
+        入力元
+
+    Returns
+    -------
+    list[dict]
+        対局番号順の牌譜
+    """
+
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, encoding='utf-8') as fp:
+            return read_jsonl(fp)
+
+    paipu = {}
+    for line in f:
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        game = event.pop('game')
+        if 'kaiju' in event:
+            kaiju = event['kaiju']
+            paipu[game] = {
+                'title': kaiju['title'],
+                'player': kaiju['player'],
+                'qijia': kaiju['qijia'],
+                'log': [],
+                'defen': [],
+                'point': [],
+                'rank': []
+            }
+        elif 'jieju' in event:
+            paipu[game].update(event['jieju'])
+        else:
+            log = paipu[game]['log']
+            round = event.pop('round')
+            while len(log) <= round:
+                log.append([])
+            log[round].append(event)
+    return [paipu[game] for game in sorted(paipu)]
@@ -1,7 +1,9 @@
 """jongpy.core.xiangting"""
 
-from typing import Callable
+from typing import Any, Callable, Sequence
 from jongpy.core.shoupai import Shoupai
+from jongpy.core import xiangting_table
+from jongpy.core.pai import OFFSET
 
 
 XIANGTING_INF = 999
@@ -110,42 +112,78 @@ def mianzi(bingpai: list[int], n: int = 1) -> dict[str, list[int]]:
     return r_max
 
 
-def mianzi_all(shoupai: Shoupai, jiangpai: bool = False):
-
-    # 各色ごとの面子・搭子・孤立牌数をカウントする
-    r = {
-        'm': mianzi(shoupai._bingpai['m']),     # 萬子
-        'p': mianzi(shoupai._bingpai['p']),     # 筒子
-        's': mianzi(shoupai._bingpai['s'])      # 索子
-    }
-
-    # 字牌の面子・搭子・孤立牌数をカウントする
-    z = [0, 0, 0]
-    for n in range(1, 8):
-        if shoupai._bingpai['z'][n] >= 3:
-            z[0] += 1   # 面子
-        elif shoupai._bingpai['z'][n] == 2:
-            z[1] += 1   # 搭子
-        elif shoupai._bingpai['z'][n] == 1:
-            z[2] += 1   # 孤立牌
+def _xiangting_min(r: list, n_fulou: int, jiangpai: bool) -> int:
 
-    # 副露面子は面子数にカウントする
-    n_fulou = len(shoupai._fulou)
+    # 字牌の面子・搭子・孤立牌数 (副露面子は面子数にカウントする)
+    z = r[3]
+    zm = z[0] + n_fulou
 
     x_min = 13  # シャンテン数を仮に 13 とする
 
     # 萬子・筒子・索子・字牌それぞれの面子・搭子・孤立牌数を使用して
     # パターンA・Bの全ての組み合わせでシャンテン数を計算する
-    for m in [r['m']['a'], r['m']['b']]:
-        for p in [r['p']['a'], r['p']['b']]:
-            for s in [r['s']['a'], r['s']['b']]:
-                x = [n_fulou, 0, 0]
-                # 面子・搭子・孤立牌、それぞれについて全色の総和を取る
-                for i in range(3):
-                    x[i] += m[i] + p[i] + s[i] + z[i]
-                    n_xiangting = _xiangting(x[0], x[1], x[2], jiangpai)
-                    if n_xiangting < x_min:
-                        x_min = n_xiangting
+    # (_xiangting は搭子数・孤立牌数について単調非増加なので、総和のみで評価すればよい)
+    for m in r[0]:
+        for p in r[1]:
+            for s in r[2]:
+                n_xiangting = _xiangting(m[0] + p[0] + s[0] + zm,
+                                         m[1] + p[1] + s[1] + z[1],
+                                         m[2] + p[2] + s[2] + z[2],
+                                         jiangpai)
+                if n_xiangting < x_min:
+                    x_min = n_xiangting
+
+    return x_min
+
+
+def _pattern(s: str, code: int):
+    # 色ごとの面子・搭子・孤立牌数をテーブルから取得する
+    return xiangting_table.zipai(code) if s == 'z' else xiangting_table.shupai(code)
+
+
+def mianzi_all(shoupai: Shoupai, jiangpai: bool = False):
+
+    # 各色ごとの面子・搭子・孤立牌数をテーブルから取得する
+    r = [_pattern(s, xiangting_table.encode(shoupai._bingpai[s])) for s in ['m', 'p', 's', 'z']]
+
+    # 副露面子は面子数にカウントする
+    return _xiangting_min(r, len(shoupai._fulou), jiangpai)
+
+
+def _yiban_pattern(s: str, bingpai: list[int], code: int):
+
+    # 色ごとに、雀頭なしのパターンと、可能な雀頭を抜き取ったパターンの一覧を取得する
+    return (_pattern(s, code),
+            [_pattern(s, code - 2 * xiangting_table.WEIGHT[n])
+             for n in range(1, len(bingpai)) if bingpai[n] >= 2])
+
+
+def _xiangting_yiban(pattern: list, n_fulou: int, memo: dict | None = None) -> int:
+
+    # memo を渡した場合、色ごとのパターンの組み合わせに対する結果を再利用する
+    # (異なる牌姿でも面子・搭子・孤立牌数が同じなら結果は等しい)
+    f_min = _xiangting_min
+    if memo is not None:
+        def f_min(r: list, n_fulou: int, jiangpai: bool) -> int:
+            key = (r[0], r[1], r[2], r[3], n_fulou, jiangpai)
+            x = memo.get(key)
+            if x is None:
+                x = memo[key] = _xiangting_min(r, n_fulou, jiangpai)
+            return x
+
+    # 雀頭なしとした場合のシャンテン数を計算する
+    r = [pattern[i][0] for i in range(4)]
+    x_min = f_min(r, n_fulou, False)
+
+    # 可能な雀頭を抜き取り、雀頭ありの場合のシャンテン数を計算する
+    # 雀頭を抜き取った色のみパターンを差し替える
+    for i in range(4):
+        for r_jiangpai in pattern[i][1]:
+            r[i] = r_jiangpai
+            n_xiangting = f_min(r, n_fulou, True)
+            if n_xiangting < x_min:
+                x_min = n_xiangting
+        r[i] = pattern[i][0]
 
     return x_min
 
@@ -165,19 +203,9 @@ def xiangting_yiban(shoupai: Shoupai) -> int:
         シャンテン数
     """
 
-    # 雀頭なしとした場合のシャンテン数を計算する
-    x_min = mianzi_all(shoupai)
-
-    # 可能な雀頭を抜き取り、雀頭ありの場合のシャンテン数を計算する
-    for s in ['m', 'p', 's', 'z']:
-        bingpai = shoupai._bingpai[s]
-        for n in range(1, len(bingpai)):
-            if bingpai[n] >= 2:
-                bingpai[n] -= 2
-                n_xiangting = mianzi_all(shoupai, True)
-                bingpai[n] += 2
-                if n_xiangting < x_min:
-                    x_min = n_xiangting
+    bingpai = shoupai._bingpai
+    pattern = [_yiban_pattern(s, bingpai[s], xiangting_table.encode(bingpai[s])) for s in ['m', 'p', 's', 'z']]
+    x_min = _xiangting_yiban(pattern, len(shoupai._fulou))
 
     # 副露直後の牌姿が和了形の場合、テンパイとして扱う
     if x_min == -1 and shoupai._zimo and len(shoupai._zimo) > 2:
@@ -217,6 +245,11 @@ def xiangting_goushi(shoupai: Shoupai) -> int:
             if bingpai[n] >= 2:
                 n_duizi += 1    # 対子数を増やす
 
+    return _xiangting_goushi(n_yaojiu, n_duizi)
+
+
+def _xiangting_goushi(n_yaojiu: int, n_duizi: int) -> int:
+
     # 公式に当てはめてシャンテン数を計算する
     return 12 - n_yaojiu if n_duizi else 13 - n_yaojiu
 
@@ -251,6 +284,11 @@ def xiangting_qidui(shoupai: Shoupai) -> int:
             elif bingpai[n] == 1:
                 n_guli += 1     # 孤立牌の種類数を増やす
 
+    return _xiangting_qidui(n_duizi, n_guli)
+
+
+def _xiangting_qidui(n_duizi: int, n_guli: int) -> int:
+
     if n_duizi > 7:
         n_duizi = 7     # 対子の種類数を補正
     if n_duizi + n_guli > 7:
@@ -281,6 +319,50 @@ def xiangting(shoupai: Shoupai) -> int:
     )
 
 
+def xiangting_array(bingpai: Sequence[int], n_fulou: int = 0) -> int:
+    """
+    牌番号順の枚数配列から一般形・国士無双形・七対子形のシャンテン数の最小値を取得
+
+    副露直後の補正(``xiangting_yiban``参照)は行わない
+
+    Parameters
+    ----------
+    bingpai : Sequence[int]
+        副露牌を含まない手牌の牌番号(``jongpy.core.pai``)順の枚数
+        (``PackedShoupai.bingpai``など)
+    n_fulou : int
+        副露面子の数
+
+    Returns
+    -------
+    int
+        シャンテン数
+    """
+
+    pattern = []
+    n_duizi = n_guli = n_yaojiu = n_yaojiu_duizi = 0
+    for s, o in OFFSET.items():
+        suit = [0]
+        suit.extend(bingpai[o:o + (7 if s == 'z' else 9)])
+        pattern.append(_yiban_pattern(s, suit, xiangting_table.encode(suit)))
+        for n in range(1, len(suit)):
+            if suit[n] >= 2:
+                n_duizi += 1
+            elif suit[n] == 1:
+                n_guli += 1
+            if s == 'z' or n == 1 or n == 9:
+                if suit[n] >= 1:
+                    n_yaojiu += 1
+                if suit[n] >= 2:
+                    n_yaojiu_duizi += 1
+
+    x_min = _xiangting_yiban(pattern, n_fulou)
+    if n_fulou:     # 副露ありは七対子・国士無双にならない
+        return x_min
+
+    return min(x_min, _xiangting_qidui(n_duizi, n_guli), _xiangting_goushi(n_yaojiu, n_yaojiu_duizi))
+
+
 def tingpai(shoupai: Shoupai, f_xiangting: Callable[[Shoupai], int] = xiangting) -> list[str] | None:
     """
     シャンテン数の進む牌の一覧を取得
@@ -302,6 +384,10 @@ def tingpai(shoupai: Shoupai, f_xiangting: Callable[[Shoupai], int] = xiangting)
     if shoupai._zimo:
         return None
 
+    # 標準のシャンテン数計算関数の場合は差分計算を行う
+    if f_xiangting in (xiangting, xiangting_yiban, xiangting_qidui, xiangting_goushi):
+        return _tingpai(shoupai, f_xiangting)
+
     pai = []
     n_xiangting = f_xiangting(shoupai)
     for s in ['m', 'p', 's', 'z']:
@@ -315,3 +401,206 @@ def tingpai(shoupai: Shoupai, f_xiangting: Callable[[Shoupai], int] = xiangting)
             bingpai[n] -= 1
 
     return pai
+
+
+def _tingpai(shoupai: Shoupai, f_xiangting: Callable[[Shoupai], int]) -> list[str]:
+
+    yiban = f_xiangting in (xiangting, xiangting_yiban)
+    qidui = f_xiangting in (xiangting, xiangting_qidui)
+    goushi = f_xiangting in (xiangting, xiangting_goushi)
+
+    suits = [shoupai._bingpai[s] for s in ['m', 'p', 's', 'z']]
+    return [s + str(n) for s, n in _tingpai_suits(suits, len(shoupai._fulou), yiban, qidui, goushi)]
+
+
+def _tingpai_suits(
+    suits: list[list[int]],
+    n_fulou: int,
+    yiban: bool = True,
+    qidui: bool = True,
+    goushi: bool = True
+) -> list[tuple[str, int]]:
+    return _xiangting_tingpai_suits(suits, n_fulou, yiban, qidui, goushi)[1]
+
+
+def _xiangting_tingpai_suits(
+    suits: list[list[int]],
+    n_fulou: int,
+    yiban: bool = True,
+    qidui: bool = True,
+    goushi: bool = True,
+    cache: dict | None = None,
+    memo: dict | None = None
+) -> tuple[int, list[tuple[str, int]]]:
+
+    # シャンテン数と、シャンテン数の進む牌の(色, 数字)の一覧を返す
+    # cache を渡した場合、色ごとのパターンを (色, 符号) をキーとして共有する
+    # memo は _xiangting_yiban に渡す
+    def _get_pattern(s: str, bingpai: list[int], code: int):
+        if cache is None:
+            return _yiban_pattern(s, bingpai, code)
+        key = (s, code)
+        if key not in cache:
+            cache[key] = _yiban_pattern(s, bingpai, code)
+        return cache[key]
+
+    # 1枚加えたときに変化するのはその牌の色だけなので、一般形は色ごとの
+    # パターンを再利用し、七対子・国士無双は種類数の増減のみを計算する
+    # (副露ありは七対子・国士無双にならない)
+    qidui = qidui and not n_fulou
+    goushi = goushi and not n_fulou
+
+    code = {}
+    pattern = []
+    n_duizi = n_guli = n_yaojiu = n_yaojiu_duizi = 0
+    for s, bingpai in zip(['m', 'p', 's', 'z'], suits):
+        code[s] = xiangting_table.encode(bingpai)
+        pattern.append(_get_pattern(s, bingpai, code[s]))
+        for n in range(1, len(bingpai)):
+            if bingpai[n] >= 2:
+                n_duizi += 1
+            elif bingpai[n] == 1:
+                n_guli += 1
+            if s == 'z' or n == 1 or n == 9:
+                if bingpai[n] >= 1:
+                    n_yaojiu += 1
+                if bingpai[n] >= 2:
+                    n_yaojiu_duizi += 1
+
+    def _min(x_yiban: int, x_qidui: int, x_goushi: int) -> int:
+        return min(x_yiban if yiban else XIANGTING_INF,
+                   x_qidui if qidui else XIANGTING_INF,
+                   x_goushi if goushi else XIANGTING_INF)
+
+    n_xiangting = _min(_xiangting_yiban(pattern, n_fulou, memo) if yiban else 0,
+                       _xiangting_qidui(n_duizi, n_guli),
+                       _xiangting_goushi(n_yaojiu, n_yaojiu_duizi))
+
+    pai = []
+    for i, (s, bingpai) in enumerate(zip(['m', 'p', 's', 'z'], suits)):
+        for n in range(1, len(bingpai)):
+            c = bingpai[n]
+            if c >= 4:
+                continue
+
+            # 加えた牌の色のパターンのみ引き直す
+            x_yiban = 0
+            if yiban:
+                bingpai[n] += 1
+                pattern_s = pattern[i]
+                pattern[i] = _get_pattern(s, bingpai, code[s] + xiangting_table.WEIGHT[n])
+                x_yiban = _xiangting_yiban(pattern, n_fulou, memo)
+                pattern[i] = pattern_s
+                bingpai[n] -= 1
+
+            # 七対子・国士無双は加えた牌の枚数から種類数の増減を求める
+            yaojiu = s == 'z' or n == 1 or n == 9
+            x_qidui = _xiangting_qidui(n_duizi + (c == 1), n_guli + (c == 0) - (c == 1))
+            x_goushi = _xiangting_goushi(n_yaojiu + (yaojiu and c == 0),
+                                         n_yaojiu_duizi + (yaojiu and c == 1))
+
+            if _min(x_yiban, x_qidui, x_goushi) < n_xiangting:
+                pai.append((s, n))
+
+    return n_xiangting, pai
+
+
+def tingpai_array(bingpai: Sequence[int], n_fulou: int = 0) -> list[int]:
+    """
+    牌番号順の枚数配列からシャンテン数の進む牌の一覧を取得
+
+    ``tingpai``の標準のシャンテン数計算(``xiangting``)と同じ結果を、牌の
+    文字列表現ではなく牌番号で返す。ツモ直後(3n+2枚)の手牌は渡さないこと
+
+    Parameters
+    ----------
+    bingpai : Sequence[int]
+        副露牌を含まない手牌の牌番号(``jongpy.core.pai``)順の枚数
+        (``PackedShoupai.bingpai``など)
+    n_fulou : int
+        副露面子の数
+
+    Returns
+    -------
+    list[int]
+        シャンテン数の進む牌の牌番号の一覧
+    """
+
+    suits = []
+    for s, o in OFFSET.items():
+        suit = [0]
+        suit.extend(bingpai[o:o + (7 if s == 'z' else 9)])
+        suits.append(suit)
+
+    return [OFFSET[s] + n - 1 for s, n in _tingpai_suits(suits, n_fulou)]
+
+
+def xiangting_dapai(
+    shoupai: Shoupai,
+    dapai: list[str] | None = None,
+    visible: Sequence[int] | None = None
+) -> dict[str, dict[str, Any]] | None:
+    """
+    打牌候補ごとに打牌後のシャンテン数とシャンテン数の進む牌を取得
+
+    打牌候補ごとに手牌を複製して``xiangting``・``tingpai``を呼ぶのと同じ
+    結果を返す。打牌しても変化するのはその牌の色だけなので、色ごとの
+    パターンは候補間で共有し、赤牌・ツモ切りの違いしかない候補は1回だけ
+    計算する
+
+    Parameters
+    ----------
+    shoupai : Shoupai
+        打牌可能な(ツモ直後または副露直後の)手牌
+    dapai : list[str] or None, default None
+        打牌候補。省略時は``shoupai.get_dapai()``
+    visible : Sequence[int] or None, default None
+        手牌以外で見えている牌の牌番号(``jongpy.core.pai``)順の枚数
+        (全員の河・副露牌とドラ表示牌。``Board.visible``など)。
+        省略時は手牌のみを除いて残り枚数を数える
+
+    Returns
+    -------
+    dict[str, dict] (or None)
+        打牌候補をキーとし、'xiangting' (打牌後のシャンテン数)、
+        'tingpai' (シャンテン数の進む牌の一覧)、'n_tingpai'
+        (シャンテン数の進む牌の残り枚数の合計) を値とする辞書。
+        打牌できない手牌の場合は None
+    """
+
+    if shoupai._zimo is None:
+        return None
+    if dapai is None:
+        dapai = shoupai.get_dapai()
+
+    suits = [shoupai._bingpai[s][:] for s in ['m', 'p', 's', 'z']]
+    index = {'m': 0, 'p': 1, 's': 2, 'z': 3}
+    n_fulou = len(shoupai._fulou)
+
+    cache = {}
+    memo = {}
+    result = {}
+    done = {}   # (色, 数字) -> 計算結果
+    for p in dapai:
+        s = p[0]
+        n = int(p[1]) or 5
+        if (s, n) not in done:
+            bingpai = suits[index[s]]
+            bingpai[n] -= 1
+            n_xiangting, pai = _xiangting_tingpai_suits(suits, n_fulou, cache=cache, memo=memo)
+            bingpai[n] += 1
+
+            # 残り枚数は打牌前の手牌の枚数と見えている牌を除いて数える
+            n_tingpai = 0
+            for ts, tn in pai:
+                rest = 4 - suits[index[ts]][tn]
+                if visible is not None:
+                    rest -= visible[OFFSET[ts] + tn - 1]
+                n_tingpai += max(rest, 0)
+            done[(s, n)] = {'xiangting': n_xiangting,
+                            'tingpai': [ts + str(tn) for ts, tn in pai],
+                            'n_tingpai': n_tingpai}
+        r = done[(s, n)]
+        result[p] = {'xiangting': r['xiangting'], 'tingpai': r['tingpai'][:], 'n_tingpai': r['n_tingpai']}
+
+    return result
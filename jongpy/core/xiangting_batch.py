@@ -0,0 +1,225 @@
+"""jongpy.core.xiangting_batch"""
+
+from __future__ import annotations
+
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:     # numpy は任意の依存
+    np = None
+
+from jongpy.core import xiangting_table
+from jongpy.core.xiangting import XIANGTING_INF
+from jongpy.core.pai import OFFSET
+
+
+# 色ごとの(牌番号の先頭, 種類数)
+_SUITS = [(o, 7 if s == 'z' else 9) for s, o in OFFSET.items()]
+# 幺九牌の牌番号
+_YAOJIU = [o + n for s, o in OFFSET.items() for n in (range(7) if s == 'z' else (0, 8))]
+
+# tingpai_batch で一度に処理する手牌の数
+CHUNK_SIZE = 4096
+
+if np is not None:
+    # 牌番号ごとの色の番号と、色の符号化での重み
+    _SUIT_OF = np.array([i for i, (_, k) in enumerate(_SUITS) for _ in range(k)])
+    _WEIGHT_OF = np.array([xiangting_table.WEIGHT[n] for _, k in _SUITS for n in range(1, k + 1)])
+    _IS_YAOJIU = np.isin(np.arange(34), _YAOJIU)
+    _SHIFT = np.array([[0, 5, 10], [15, 20, 25]], dtype=np.uint32)
+
+
+def _require():
+    if np is None:
+        raise ImportError('jongpy.core.xiangting_batch requires numpy')
+
+
+def _as_array(bingpai: Any, n_fulou: Any) -> tuple[Any, Any]:
+
+    bingpai = np.asarray(bingpai, dtype=np.int64)
+    if bingpai.ndim != 2 or bingpai.shape[1] != 34:
+        raise ValueError(f'bingpai must be an (N, 34) array: {bingpai.shape}')
+    n_fulou = np.broadcast_to(np.asarray(n_fulou, dtype=np.int64), (bingpai.shape[0],))
+    return bingpai, n_fulou
+
+
+def _lookup(code: Any, zi: bool) -> Any:
+
+    # 符号化した枚数配列から、パターンA,Bの(面子数, 搭子数, 孤立牌数)を引く
+    # 未計算の状態は xiangting_table で計算してからまとめて参照する
+    xiangting_table._alloc()
+    table = np.frombuffer(xiangting_table._zipai if zi else xiangting_table._shupai, dtype=np.uint32)
+    v = table[code]
+    missing = np.unique(code[v == 0])
+    if len(missing):
+        f = xiangting_table.zipai if zi else xiangting_table.shupai
+        for c in missing.tolist():
+            f(c)
+        v = table[code]
+    return (v[..., None, None] >> _SHIFT & 31).astype(np.int16)     # (..., 2, 3)
+
+
+def _encode(bingpai: Any) -> Any:
+
+    # 手牌 (N, 34) を色ごとに符号化する (N, 4)
+    return np.stack([bingpai[:, o:o + k] @ _WEIGHT_OF[o:o + k] for o, k in _SUITS], axis=1)
+
+
+def _pattern(code: Any) -> Any:
+
+    # 色ごとの符号 (M, 4) からパターン (M, 4, 2, 3) を引く
+    return np.concatenate([_lookup(code[:, :3], False), _lookup(code[:, 3:], True)], axis=1)
+
+
+def _xiangting(m: Any, d: Any, g: Any, j: bool) -> Any:
+
+    # xiangting._xiangting を配列で計算する
+    # (面子数・搭子数・孤立牌数の補正は、それぞれ上限との min で表せる)
+    m_ = np.minimum(m, 4)
+    d = d + (m - m_)
+    d_ = np.minimum(d, 4 - m_)
+    g = np.minimum(g + (d - d_), (4 if j else 5) - m_ - d_)
+    return 13 - 2 * j - m_ * 3 - d_ * 2 - g
+
+
+def _combine(r: Any, n_fulou: Any, j: bool) -> Any:
+
+    # 萬子・筒子・索子のパターンA,Bの全ての組み合わせ (2x2x2) と字牌の
+    # 面子・搭子・孤立牌数を合計し、最小のシャンテン数を求める
+    # (字牌はパターンAのみ使い、副露面子は面子数にカウントする)
+    m, p, s, z = r[:, 0], r[:, 1], r[:, 2], r[:, 3, 0]
+    total = [m[:, :, None, None, i] + p[:, None, :, None, i] + s[:, None, None, :, i]
+             + z[:, None, None, None, i] for i in range(3)]
+    total[0] = total[0] + n_fulou[:, None, None, None].astype(np.int16)
+    return _xiangting(*total, j).min(axis=(1, 2, 3))
+
+
+def _yiban(code: Any, n_fulou: Any) -> Any:
+
+    # 色ごとの符号 (M, 4) から一般形のシャンテン数 (M,) を求める
+    r = _pattern(code)
+    x_min = _combine(r, n_fulou, False)
+
+    # 雀頭にできる牌(2枚以上)ごとに、その色のみパターンを差し替える
+    count = code[:, _SUIT_OF] // _WEIGHT_OF % 5
+    rows, tiles = np.nonzero(count >= 2)
+    if len(rows):
+        suit = _SUIT_OF[tiles]
+        code_j = code[rows, suit] - 2 * _WEIGHT_OF[tiles]
+        zi = suit == 3
+        rj = r[rows]
+        rj[~zi, suit[~zi]] = _lookup(code_j[~zi], False)
+        rj[zi, 3] = _lookup(code_j[zi], True)
+        np.minimum.at(x_min, rows, _combine(rj, n_fulou[rows], True))
+
+    return x_min
+
+
+def _qidui(n_duizi: Any, n_guli: Any, n_fulou: Any) -> Any:
+
+    n_duizi = np.minimum(n_duizi, 7)
+    n_guli = np.minimum(n_guli, 7 - n_duizi)
+    return np.where(n_fulou > 0, XIANGTING_INF, 13 - n_duizi * 2 - n_guli)
+
+
+def _goushi(n_yaojiu: Any, n_yaojiu_duizi: Any, n_fulou: Any) -> Any:
+
+    x = np.where(n_yaojiu_duizi > 0, 12 - n_yaojiu, 13 - n_yaojiu)
+    return np.where(n_fulou > 0, XIANGTING_INF, x)
+
+
+def _count(bingpai: Any) -> tuple[Any, Any, Any, Any]:
+
+    # 七対子・国士無双のための対子・孤立牌・幺九牌の種類数
+    yaojiu = bingpai[:, _IS_YAOJIU]
+    return ((bingpai >= 2).sum(axis=1), (bingpai == 1).sum(axis=1),
+            (yaojiu >= 1).sum(axis=1), (yaojiu >= 2).sum(axis=1))
+
+
+def xiangting_batch(bingpai: Any, n_fulou: Any = 0) -> tuple[Any, Any, Any]:
+    """
+    N個の手牌の一般形・七対子形・国士無双形のシャンテン数をまとめて計算
+
+    色ごとの面子・搭子・孤立牌数を``xiangting_table``から配列で引き、
+    全ての手牌について同時に組み合わせを評価する。副露直後の補正
+    (``xiangting_yiban``参照)は行わない。numpy が必要
+
+    Parameters
+    ----------
+    bingpai : array_like
+        副露牌を含まない手牌の牌番号(``jongpy.core.pai``)順の枚数 (N, 34)
+    n_fulou : int or array_like, default 0
+        副露面子の数 (スカラーまたは (N,))
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        一般形・七対子形・国士無双形のシャンテン数 (各 (N,))。
+        副露ありの七対子形・国士無双形は``XIANGTING_INF``
+    """
+
+    _require()
+    bingpai, n_fulou = _as_array(bingpai, n_fulou)
+    n_duizi, n_guli, n_yaojiu, n_yaojiu_duizi = _count(bingpai)
+    return (_yiban(_encode(bingpai), n_fulou).astype(np.int64),
+            _qidui(n_duizi, n_guli, n_fulou),
+            _goushi(n_yaojiu, n_yaojiu_duizi, n_fulou))
+
+
+def tingpai_batch(bingpai: Any, n_fulou: Any = 0) -> Any:
+    """
+    N個の手牌のシャンテン数の進む牌をまとめて求める
+
+    ``tingpai_array``と同じ結果を (N, 34) の真偽値で返す。1枚加えたときに
+    変化するのはその牌の色の符号だけなので、(手牌, 加える牌)の組ごとに
+    その色の符号のみ差し替えて評価する。ツモ直後(3n+2枚)の手牌は
+    渡さないこと。numpy が必要
+
+    Parameters
+    ----------
+    bingpai : array_like
+        副露牌を含まない手牌の牌番号(``jongpy.core.pai``)順の枚数 (N, 34)
+    n_fulou : int or array_like, default 0
+        副露面子の数 (スカラーまたは (N,))
+
+    Returns
+    -------
+    numpy.ndarray
+        シャンテン数の進む牌なら真 (N, 34)
+    """
+
+    _require()
+    bingpai, n_fulou = _as_array(bingpai, n_fulou)
+    mask = np.zeros(bingpai.shape, dtype=bool)
+    for start in range(0, len(bingpai), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        mask[chunk] = _tingpai(bingpai[chunk], n_fulou[chunk])
+    return mask
+
+
+def _tingpai(bingpai: Any, n_fulou: Any) -> Any:
+
+    code = _encode(bingpai)
+    n_duizi, n_guli, n_yaojiu, n_yaojiu_duizi = _count(bingpai)
+    n_xiangting = np.minimum(_yiban(code, n_fulou),
+                             np.minimum(_qidui(n_duizi, n_guli, n_fulou),
+                                        _goushi(n_yaojiu, n_yaojiu_duizi, n_fulou)))
+
+    # 4枚使っていない牌を1枚加えた手牌を(手牌, 牌)の組ごとに評価する
+    rows, tiles = np.nonzero(bingpai < 4)
+    code_t = code[rows]
+    code_t[np.arange(len(rows)), _SUIT_OF[tiles]] += _WEIGHT_OF[tiles]
+    x = _yiban(code_t, n_fulou[rows])
+
+    # 七対子・国士無双は加えた牌の枚数から種類数の増減を求める
+    c = bingpai[rows, tiles]
+    yaojiu = _IS_YAOJIU[tiles]
+    fulou = n_fulou[rows]
+    x = np.minimum(x, _qidui(n_duizi[rows] + (c == 1), n_guli[rows] + (c == 0) - (c == 1), fulou))
+    x = np.minimum(x, _goushi(n_yaojiu[rows] + (yaojiu & (c == 0)),
+                              n_yaojiu_duizi[rows] + (yaojiu & (c == 1)), fulou))
+
+    mask = np.zeros(bingpai.shape, dtype=bool)
+    mask[rows, tiles] = x < n_xiangting[rows]
+    return mask
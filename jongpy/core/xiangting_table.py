@@ -0,0 +1,239 @@
+"""jongpy.core.xiangting_table"""
+
+import sys
+import zlib
+from array import array
+from itertools import product
+
+
+SHUPAI_SIZE = 5 ** 9    # 数牌1色の状態数
+ZIPAI_SIZE = 5 ** 7     # 字牌の状態数
+
+_MAGIC = b'JPXT'    # ファイル識別子
+_VERSION = 1    # ファイル形式のバージョン
+
+_VALID = 1 << 30    # 計算済みフラグ
+
+# 各色の枚数配列を符号化するときの各位置の重み
+WEIGHT = [0] + [5 ** (n - 1) for n in range(1, 10)]
+
+# テーブル本体は数MBになるので、import 時ではなく初回参照時に確保する
+_shupai = None  # 数牌のテーブル
+_zipai = None   # 字牌のテーブル
+_pattern = {}   # 符号化済みの値からパターンA,Bへの変換キャッシュ
+
+
+def encode(bingpai: list[int]) -> int:
+    """
+    1色分の枚数配列を5進数の整数に符号化する
+
+    Parameters
+    ----------
+    bingpai : list[int]
+        各牌の枚数 (添字0は赤牌の枚数で、符号化の対象外)
+
+    Returns
+    -------
+    int
+        符号化した値
+    """
+    code = 0
+    for n in range(len(bingpai) - 1, 0, -1):
+        code = code * 5 + bingpai[n]
+    return code
+
+
+def decode(code: int, size: int = 9) -> list[int]:
+    """
+    符号化された値を1色分の枚数配列に戻す
+
+    Parameters
+    ----------
+    code : int
+        符号化した値
+    size : int
+        牌の種類数 (数牌: 9, 字牌: 7)
+
+    Returns
+    -------
+    list[int]
+        各牌の枚数 (添字0は常に0)
+    """
+    bingpai = [0]
+    for _ in range(size):
+        bingpai.append(code % 5)
+        code //= 5
+    return bingpai
+
+
+def _alloc():
+
+    global _shupai, _zipai
+    if _shupai is None:
+        _shupai = array('I', [0]) * SHUPAI_SIZE
+        _zipai = array('I', [0]) * ZIPAI_SIZE
+
+
+def _pack(r: tuple[tuple[int, int, int], tuple[int, int, int]]) -> int:
+
+    # 面子数、搭子数、孤立牌数を5bitずつパターンA,Bの順に詰める
+    (ma, da, ga), (mb, db, gb) = r
+    v = _VALID | ma | da << 5 | ga << 10 | mb << 15 | db << 20 | gb << 25
+    if v not in _pattern:
+        _pattern[v] = r
+    return v
+
+
+def _unpack(v: int) -> tuple[tuple[int, int, int], tuple[int, int, int]]:
+    return ((v & 31, v >> 5 & 31, v >> 10 & 31), (v >> 15 & 31, v >> 20 & 31, v >> 25 & 31))
+
+
+def _calc_shupai(code: int) -> int:
+
+    from jongpy.core.xiangting import mianzi    # 循環importを避ける
+
+    r = mianzi(decode(code))
+    return _pack((tuple(r['a']), tuple(r['b'])))
+
+
+def _calc_zipai(code: int) -> int:
+
+    z = [0, 0, 0]
+    for n in decode(code, 7)[1:]:
+        if n >= 3:
+            z[0] += 1   # 面子
+        elif n == 2:
+            z[1] += 1   # 搭子
+        elif n == 1:
+            z[2] += 1   # 孤立牌
+    z = tuple(z)
+    return _pack((z, z))
+
+
+def shupai(code: int) -> tuple[tuple[int, int, int], tuple[int, int, int]]:
+    """
+    数牌1色のパターンA,Bの面子数、搭子数、孤立牌数を取得する
+
+    未計算の状態は初回参照時に計算してテーブルに格納する。``load``で
+    事前計算済みのテーブルを読み込んでいない場合は、参照した状態だけを
+    保持するメモとして働く
+
+    Parameters
+    ----------
+    code : int
+        ``encode``で符号化した枚数配列
+
+    Returns
+    -------
+    tuple
+        ((面子数, 搭子数, 孤立牌数), (面子数, 搭子数, 孤立牌数)) の形式
+        左がパターンA、右がパターンB
+    """
+    if _shupai is None:
+        _alloc()
+    v = _shupai[code]
+    if not v:
+        v = _shupai[code] = _calc_shupai(code)
+    return _pattern[v]
+
+
+def zipai(code: int) -> tuple[int, int, int]:
+    """
+    字牌の面子数、搭子数、孤立牌数を取得する
+
+    Parameters
+    ----------
+    code : int
+        ``encode``で符号化した枚数配列
+
+    Returns
+    -------
+    tuple
+        (面子数, 搭子数, 孤立牌数)
+    """
+    if _zipai is None:
+        _alloc()
+    v = _zipai[code]
+    if not v:
+        v = _zipai[code] = _calc_zipai(code)
+    return _pattern[v][0]
+
+
+def build(max_pai: int = 14):
+    """
+    テーブルの全状態を計算する
+
+    Parameters
+    ----------
+    max_pai : int
+        1色あたりの最大枚数。これを超える状態は計算しない
+    """
+    _alloc()
+    for code in range(ZIPAI_SIZE):
+        if not _zipai[code]:
+            _zipai[code] = _calc_zipai(code)
+    for bingpai in product(range(5), repeat=9):
+        if sum(bingpai) > max_pai:
+            continue
+        code = encode((0,) + bingpai)
+        if not _shupai[code]:
+            _shupai[code] = _calc_shupai(code)
+
+
+def dump(path: str):
+    """
+    テーブルをファイルに保存する
+
+    形式は識別子(4byte)、バージョン(1byte)に続けて、数牌・字牌の
+    テーブル(リトルエンディアンの uint32 配列)を zlib で圧縮したもの
+
+    Parameters
+    ----------
+    path : str
+        保存先のパス
+    """
+    _alloc()
+    body = array('I', _shupai)
+    body.extend(_zipai)
+    if sys.byteorder != 'little':
+        body.byteswap()
+    with open(path, 'wb') as f:
+        f.write(_MAGIC + bytes([_VERSION]) + zlib.compress(body.tobytes(), 9))
+
+
+def load(path: str):
+    """
+    ``dump``で保存したテーブルを読み込む
+
+    テーブルは自動では読み込まないので、事前計算済みのテーブルを使う場合は
+    ``python -m jongpy.core.xiangting_table <path>``で作成したファイルを
+    対局開始前などに読み込む
+
+    Parameters
+    ----------
+    path : str
+        ファイルのパス
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 5 or data[:4] != _MAGIC or data[4] != _VERSION:
+        raise ValueError(path)
+
+    body = array('I')
+    body.frombytes(zlib.decompress(data[5:]))
+    if sys.byteorder != 'little':
+        body.byteswap()
+    if len(body) != SHUPAI_SIZE + ZIPAI_SIZE:
+        raise ValueError(path)
+
+    _alloc()
+    _shupai[:] = body[:SHUPAI_SIZE]
+    _zipai[:] = body[SHUPAI_SIZE:]
+    for v in set(body):
+        if v and v not in _pattern:
+            _pattern[v] = _unpack(v)
+
+
+if __name__ == '__main__':
+    build()
+    dump(sys.argv[1] if len(sys.argv) > 1 else 'xiangting_table.bin')
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+import jongpy.core as majiang
+from jongpy.core.archive import Archive, ArchiveWriter, write_archive, apply_event
+from jongpy.core.paipu_codec import PaipuFormatError
+
+
+class Player:
+    def action(self, msg, callback=None):
+        if callback is not None:
+            callback(None)
+
+
+@pytest.fixture(scope='module')
+def paipu():
+    game = majiang.Game([Player() for _ in range(4)], None, majiang.rule())
+    return json.loads(json.dumps(game.simulate(4, seed=7, paipu=True)['paipu']))
+
+
+@pytest.fixture
+def archive(paipu, tmp_path):
+    path = tmp_path / 'paipu.jppa'
+    write_archive(path, paipu)
+    with Archive(path) as archive:
+        yield archive
+
+
+class TestArchive:
+    def test_len(self, archive, paipu):
+        assert len(archive) == len(paipu)
+
+    def test_paipu(self, archive, paipu):
+        for i, p in enumerate(paipu):
+            assert archive.paipu(i) == p
+
+    def test_n_rounds(self, archive, paipu):
+        assert [archive.n_rounds(i) for i in range(len(paipu))] == [len(p['log']) for p in paipu]
+
+    def test_events(self, archive, paipu):
+        assert list(archive.events(2, 3)) == paipu[2]['log'][3]
+
+    def test_index_error(self, archive, paipu):
+        with pytest.raises(IndexError):
+            archive.view(len(paipu))
+        with pytest.raises(IndexError):
+            archive.events(0, len(paipu[0]['log']))
+
+    def test_iter_rounds(self, archive, paipu):
+        rounds = [(g, r, list(events)) for g, r, events in archive.iter_rounds()]
+        assert rounds == [(g, r, log) for g, p in enumerate(paipu) for r, log in enumerate(p['log'])]
+
+    def test_query(self, archive, paipu):
+        # 5巡目にリーチした局
+        def lizhi_5(events):
+            n_dapai = [0] * 4
+            for e in events:
+                if 'dapai' in e:
+                    n_dapai[e['dapai']['l']] += 1
+                    if e['dapai']['p'].endswith('*') and n_dapai[e['dapai']['l']] == 5:
+                        return True
+            return False
+
+        found = [(g, r) for g, r, events in archive.iter_rounds() if lizhi_5(events)]
+        expected = [(g, r) for g, p in enumerate(paipu) for r, log in enumerate(p['log']) if lizhi_5(log)]
+        assert found == expected
+
+    def test_board(self, archive, paipu):
+        qipai = paipu[1]['log'][2][0]['qipai']
+        board = archive.board(1, 2, 1)
+        assert [str(s) for s in board.shoupai] == qipai['shoupai']
+        assert board.jushu == qipai['jushu']
+        assert board.qijia == paipu[1]['qijia']
+
+    def test_board_events(self, archive, paipu):
+        log = paipu[0]['log'][0]
+        board = archive.board(0, 0, 3)
+        zimo, dapai = log[1]['zimo'], log[2]['dapai']
+        assert board.lunban == dapai['l']
+        assert board.he[dapai['l']]._pai == [dapai['p']]
+        assert board.shan.paishu == 136 - 13 * 4 - 14 - 1
+        assert zimo['l'] == dapai['l']
+
+    def test_board_all(self, archive, paipu):
+        for g, p in enumerate(paipu):
+            for r, log in enumerate(p['log']):
+                board = archive.board(g, r)
+                if 'hule' in log[-1]:
+                    assert board.shan.fubaopai == log[-1]['hule']['fubaopai']
+
+    def test_close(self, paipu, tmp_path):
+        path = tmp_path / 'paipu.jppa'
+        write_archive(path, paipu)
+        archive = Archive(path)
+        view = archive.view(0)
+        archive.close()
+        with pytest.raises(ValueError):
+            view.round(0)
+
+
+class TestArchiveWriter:
+    def test_add(self, paipu, tmp_path):
+        path = tmp_path / 'paipu.jppa'
+        with ArchiveWriter(path) as writer:
+            assert writer.add(paipu[0]) == 0
+            assert writer.add(paipu[1]) == 1
+        with Archive(path) as archive:
+            assert len(archive) == 2
+            assert archive.paipu(1) == paipu[1]
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / 'paipu.jppa'
+        assert write_archive(path, []) == 0
+        with Archive(path) as archive:
+            assert len(archive) == 0
+
+    def test_truncated(self, paipu, tmp_path):
+        path = tmp_path / 'paipu.jppa'
+        write_archive(path, paipu)
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(PaipuFormatError):
+            Archive(path)
+
+    def test_bad_magic(self, tmp_path):
+        path = tmp_path / 'paipu.jppa'
+        path.write_bytes(b'x' * 64)
+        with pytest.raises(PaipuFormatError):
+            Archive(path)
+
+
+class TestApplyEvent:
+    def test_unknown(self):
+        with pytest.raises(PaipuFormatError):
+            apply_event(majiang.Board(), {'kaiju': {}})
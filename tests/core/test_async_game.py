@@ -0,0 +1,205 @@
+import asyncio
+import json
+
+import jongpy.core as majiang
+
+
+RULE = {'n_zhuang': 1}
+
+
+class Player:
+    def __init__(self, delay=0, error=False):
+        self._delay = delay
+        self._error = error
+        self.msg = []
+
+    async def action(self, msg, reply=True):
+        self.msg.append((next(iter(msg)), reply))
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        if self._error:
+            raise RuntimeError
+        return None
+
+
+class AIPlayer(majiang.AsyncPlayer):
+    def action_kaiju(self, kaiju):
+        self._callback()
+
+    def action_qipai(self, qipai):
+        self._callback()
+
+    def action_zimo(self, zimo, gangzimo):
+        if self.allow_hule(self.shoupai, None):
+            return self._callback({'hule': '-'})
+        # 応答は後から別のコルーチンで返してもよい
+        asyncio.get_running_loop().call_soon(self._callback)
+
+    def action_dapai(self, dapai):
+        self._callback()
+
+    def action_fulou(self, fulou):
+        self._callback()
+
+    def action_gang(self, gang):
+        self._callback()
+
+    def action_hule(self, hule):
+        self._callback()
+
+    def action_pingju(self, pingju):
+        self._callback()
+
+    def action_jieju(self, paipu):
+        self._callback()
+
+
+class RemotePlayer:
+    """ソケットの向こうのボットに通知を中継する対局者"""
+
+    def __init__(self, port):
+        self._port = port
+        self._conn = None
+
+    async def action(self, msg, reply=True):
+        if self._conn is None:
+            self._conn = await asyncio.open_connection('127.0.0.1', self._port)
+        reader, writer = self._conn
+        writer.write((json.dumps({'msg': msg, 'reply': reply}) + '\n').encode())
+        await writer.drain()
+        if not reply:
+            return None
+        return json.loads(await reader.readline())
+
+    def close(self):
+        if self._conn is not None:
+            self._conn[1].close()
+
+
+async def bot(reader, writer):
+    while line := await reader.readline():
+        if json.loads(line)['reply']:
+            writer.write(b'null\n')
+            await writer.drain()
+    writer.close()
+
+
+def run(coro):
+    # asyncio.run() はメインスレッドのイベントループを解除してしまうので使わない
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _run(game, qijia=None):
+    return run(asyncio.wait_for(game.run(qijia), 60))
+
+
+class TestAsyncGameRun:
+    def test_run(self):
+        paipu = []
+        game = majiang.AsyncGame([Player() for _ in range(4)], paipu.append, majiang.rule(RULE))
+        game.speed = 0
+        result = _run(game, 0)
+        assert paipu == [result]
+        assert result['qijia'] == 0
+        assert sum(result['defen']) == 100000
+        assert len(result['log']) >= 4
+
+    def test_messages(self):
+        players = [Player() for _ in range(4)]
+        game = majiang.AsyncGame(players, None, majiang.rule(RULE))
+        game.speed = 0
+        _run(game)
+        for player in players:
+            assert player.msg[0] == ('kaiju', True)
+            assert player.msg[1] == ('qipai', True)
+            assert player.msg[-1] == ('jieju', True)
+
+    def test_ai_player(self):
+        game = majiang.AsyncGame([AIPlayer() for _ in range(4)], None, majiang.rule(RULE))
+        game.speed = 0
+        paipu = _run(game)
+        assert sum(paipu['defen']) == 100000
+
+    def test_remote_player(self):
+        async def main():
+            bots = set()
+
+            async def handler(reader, writer):
+                bots.add(asyncio.current_task())
+                await bot(reader, writer)
+
+            server = await asyncio.start_server(handler, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            players = [RemotePlayer(port) for _ in range(4)]
+            game = majiang.AsyncGame(players, None, majiang.rule(RULE), timeout=10)
+            game.speed = 0
+            try:
+                return await asyncio.wait_for(game.run(), 60)
+            finally:
+                for player in players:
+                    player.close()
+                await asyncio.gather(*bots)
+                server.close()
+
+        paipu = run(main())
+        assert sum(paipu['defen']) == 100000
+
+
+class TestAsyncGameTimeout:
+    def test_timeout(self):
+        players = [Player() for _ in range(3)] + [Player(delay=10)]
+        game = majiang.AsyncGame(players, None, majiang.rule(RULE), timeout=0.01)
+        game.speed = 0
+        game.stop()
+
+        async def main():
+            game.kaiju(0)
+            await asyncio.wait_for(game.next(), 1)
+
+        run(main())
+        assert game._status == 'kaiju'
+        assert game._reply == [{}, {}, {}, {}]
+
+    def test_error(self):
+        players = [Player() for _ in range(3)] + [Player(error=True)]
+        game = majiang.AsyncGame(players, None, majiang.rule(RULE))
+        game.speed = 0
+        paipu = _run(game)
+        assert sum(paipu['defen']) == 100000
+
+    def test_speed(self):
+        game = majiang.AsyncGame([Player() for _ in range(4)], None, majiang.rule(RULE))
+        game.speed = 1
+        game.stop()
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            game.kaiju(0)
+            game.call_players('test', [{'test': None}] * 4)
+            start = loop.time()
+            await game.next()
+            return loop.time() - start
+
+        assert run(main()) >= 0.19
+
+
+class TestAsyncGameStop:
+    def test_stop(self):
+        called = []
+        game = majiang.AsyncGame([Player() for _ in range(4)], None, majiang.rule(RULE))
+        game.speed = 0
+        game.stop(lambda: called.append(game._status))
+
+        async def main():
+            game.kaiju(0)
+            await game.next()
+            assert called == ['kaiju']
+            return await game.start()
+
+        run(asyncio.wait_for(main(), 60))
+        assert called == ['kaiju']
+        assert game._paipu['rank']
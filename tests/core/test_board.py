@@ -302,3 +302,52 @@ class TestBoardJieju:
 
     def test_lunban(self, setup):
         assert self._board.lunban == -1
+
+
+class TestBoardVisible:
+    def test_qipai(self):
+        board = init_board()
+        assert board.visible[0] == 1
+        assert board.rest('m1') == 3
+
+    def test_dapai(self):
+        board = init_board()
+        board.zimo({'l': 0, 'p': 'm1'})
+        board.dapai({'l': 0, 'p': 'p0_'})
+        assert board.rest('p5') == 3
+
+    def test_fulou(self):
+        board = init_board()
+        board.zimo({'l': 0, 'p': 'm1'})
+        board.dapai({'l': 0, 'p': 'm3_'})
+        board.fulou({'l': 1, 'm': 'm3-45'})
+        assert board.visible[2:5] == [1, 1, 1]
+
+    def test_angang(self):
+        board = init_board()
+        board.zimo({'l': 0, 'p': 'z1'})
+        board.gang({'l': 0, 'm': 'z1111'})
+        assert board.rest('z1') == 0
+
+    def test_jiagang(self):
+        board = init_board()
+        board.zimo({'l': 0, 'p': 's5'})
+        board.dapai({'l': 0, 'p': 's5'})
+        board.fulou({'l': 2, 'm': 's555='})
+        board.zimo({'l': 2, 'p': 's5'})
+        board.gang({'l': 2, 'm': 's555=0'})
+        assert board.rest('s5') == 0
+
+    def test_kaigang(self):
+        board = init_board()
+        board.kaigang({'baopai': 'm1'})
+        assert board.rest('m1') == 2
+
+    def test_shoupai(self):
+        board = init_board()
+        board.qipai({'zhuangfeng': 0, 'jushu': 0, 'changbang': 0, 'lizhibang': 0,
+                     'defen': [25000] * 4, 'baopai': 'z1',
+                     'shoupai': ['m055p123s789z1122', '', '', '']})
+        assert board.rest('m5', 0) == 1
+        assert board.rest('z1', 0) == 1
+        assert board.rest('z1', 1) == 3
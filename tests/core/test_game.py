@@ -7,6 +7,8 @@ import json
 import jongpy.core as majiang
 from jongpy.core.exceptions import PaiFormatError
 from jongpy.core import dev
+from jongpy.core.pai import pai_id
+from jongpy.core.scheduler import Scheduler
 
 
 SCRIPT = 'script.json'
@@ -533,6 +535,31 @@ class TestGameDapai:
         game.dapai('p1')
         assert len(game.model['shan'].baopai) == 2
 
+    def test_hulepai_cached_after_tsumogiri(self):
+        game = init_game({'shoupai': ['m123p456s789z1122', '', '', ''], 'zimo': ['m9', 'p1', 'p2', 'p3', 'm9']})
+        game.zimo()
+        game.dapai('m9_')
+        hulepai = game.get_hulepai(0)
+        assert hulepai == ['z1', 'z2']
+        for _ in range(3):
+            game.zimo()
+            game.dapai(game.model['shoupai'][game.model['lunban']]._zimo + '_')
+        game.zimo()
+        game.dapai('m9_')
+        assert game.get_hulepai(0) is hulepai
+
+    def test_hulepai_changed(self):
+        game = init_game({'shoupai': ['m123p456s789z1122', '', '', ''], 'zimo': ['z1']})
+        game.zimo()
+        game.dapai('z2')
+        assert game.get_hulepai(0) == ['z2']
+
+    def test_hulepai_furiten(self):
+        game = init_game({'shoupai': ['m123p456s789z1122', '', '', ''], 'zimo': ['z1']})
+        game.zimo()
+        game.dapai('z2')
+        assert not game._neng_rong[0]
+
 
 class TestGameFulou:
     @pytest.fixture
@@ -1461,6 +1488,26 @@ class TestGameReplyDapai:
         game.next()
         assert not game._neng_rong[1]
 
+    def test_ronjia(self):
+        game = init_game({'shoupai': ['_', 'm123p456s789z1122', 'm23446p45688s345', '']})
+        game.zimo()
+        game.dapai('m1')
+        assert game._ronjia('z1') == {1}
+        assert game._ronjia('m0') == {2}
+        assert game._ronjia('m1') == set()
+
+    def test_no_ronjia(self, monkeypatch):
+        game = init_game({'shoupai': ['_', 'm123p456s789z1122', '', '']})
+        game.zimo()
+        set_reply(game, [{}, {'hule': '-'}, {}, {}])
+        game.dapai('m1')
+        called = []
+        monkeypatch.setattr(game, 'allow_hule', lambda l: called.append(l))
+        game.next()
+        assert called == []
+        assert game._neng_rong[1]
+        assert last_paipu(game).get('zimo')
+
     def test_double_rong(self):
         game = init_game({'shoupai': ['_', 'm23446p45688s345', 'm34s33,s444-,s666+,p406-', '']})
         game.zimo()
@@ -1900,6 +1947,88 @@ class TestGameReplyPingju:
         assert last_paipu(game).get('qipai')
 
 
+class TestGameSimulate:
+    def test_simulate(self):
+        game = majiang.Game([Player(id) for id in range(4)], None, majiang.rule({'n_zhuang': 1}))
+        result = game.simulate(3, seed=1)
+        assert result['n_games'] == 3
+        assert len(result['rank']) == 3
+        assert all(sum(defen) == 100000 for defen in result['defen'])
+        assert result['games_per_second'] > 0
+        assert 'paipu' not in result
+        assert game._paipu['log'] == []
+
+    def test_seed(self):
+        game = majiang.Game([Player(id) for id in range(4)], None, majiang.rule({'n_zhuang': 1}))
+        result1 = game.simulate(2, seed=5)
+        result2 = game.simulate(2, seed=5)
+        assert result1['defen'] == result2['defen']
+
+    def test_paipu(self):
+        game = majiang.Game([Player(id) for id in range(4)], None, majiang.rule({'n_zhuang': 1}))
+        result = game.simulate(1, seed=1, paipu=True)
+        assert result['paipu'][0]['log'][0][0].get('qipai')
+        assert game._record
+
+    def test_raw_state(self):
+        init_msg()
+        players = [Player(id) for id in range(4)]
+        players[0].raw_state = True
+        game = majiang.Game(players, None, majiang.rule({'n_zhuang': 1}))
+        game.simulate(1, seed=1)
+        assert MSG[0]['jieju'] == game._paipu
+        assert MSG[0]['jieju'] is MSG[1]['jieju']
+        assert game._raw == [False] * 4
+
+    def test_raw_state_no_mask(self):
+        init_msg()
+        players = [Player(id) for id in range(4)]
+        players[0].raw_state = True
+        game = majiang.Game(players, None, majiang.rule({'n_zhuang': 1}))
+        game.simulate(1, seed=1)
+        game._raw = [True, False, False, False]
+        game.qipai()
+        assert all(MSG[0]['qipai']['shoupai'])
+        assert len([p for p in MSG[1]['qipai']['shoupai'] if p]) == 1
+
+
+class TestGameMessage:
+    def test_shared(self):
+        init_msg()
+        game = init_game()
+        game.zimo()
+        game.dapai(game.model['shoupai'][0]._zimo)
+        assert MSG[0]['dapai'] is MSG[1]['dapai'] is last_paipu(game)['dapai']
+
+    def test_masked(self):
+        init_msg()
+        game = init_game({'zimo': ['m1']})
+        game.zimo()
+        paipu = last_paipu(game)
+        player_id = game.model['player_id']
+        assert MSG[player_id[0]] is paipu
+        assert MSG[player_id[1]]['zimo']['p'] == ''
+        assert MSG[player_id[1]]['zimo']['l'] == 0
+        assert paipu['zimo']['p'] == 'm1'
+
+    def test_immutable(self):
+        init_msg()
+        game = init_game()
+        game.zimo()
+        with pytest.raises(TypeError):
+            MSG[0]['zimo']['p'] = 'm1'
+        with pytest.raises(TypeError):
+            MSG[1]['zimo']['p'] = 'm1'
+
+    def test_jieju(self):
+        init_msg()
+        game = init_game()
+        game.jieju()
+        assert MSG[0]['jieju'] is MSG[1]['jieju']
+        assert MSG[0]['jieju'] == game._paipu
+        assert json.loads(json.dumps(MSG[0])) == {'jieju': game._paipu}
+
+
 class TestGameCallback:
     def test_callback(self):
 
@@ -1933,6 +2062,57 @@ class TestGameGetDapai:
         assert game.get_dapai() == ['m1', 'm4', 'p5', 'p6', 'p7']
 
 
+class TestGameGetRest:
+    def test_qipai(self):
+        game = init_game({'shoupai': ['m123p456s789z1122', '', '', '']})
+        baopai = game.model['shan'].baopai[0]
+        assert game.get_rest(baopai) == 3
+        assert game.get_rest('z1', 0) == 2
+
+    def test_dapai_fulou(self):
+        game = init_game({'shoupai': ['_', 'm23p456s789z11223', '', '']})
+        visible = game.model['visible'][:]
+        game.zimo()
+        game.dapai('m1')
+        assert game.model['visible'][0] == visible[0] + 1
+        game.fulou('m1-23')
+        assert game.model['visible'][:3] == [visible[0] + 1, visible[1] + 1, visible[2] + 1]
+        assert game.get_rest('z1', 1) == 4 - visible[27] - 2
+
+    def test_gang(self):
+        game = init_game({'shoupai': ['m111p456s789z1122', '', '', ''],
+                          'zimo': ['m1']})
+        game.zimo()
+        visible = game.model['visible'][:]
+        game.gang('m1111')
+        assert game.model['visible'][0] == visible[0] + 4
+        assert game.get_rest('m1', 0) == 4 - visible[0] - 4
+
+    def test_kaigang(self):
+        game = init_game({'shoupai': ['m111p456s789z1122', '', '', ''],
+                          'zimo': ['m1']})
+        game.zimo()
+        game.gang('m1111')
+        visible = game.model['visible'][:]
+        game.gangzimo()
+        baopai = game.model['shan'].baopai[1]
+        visible[pai_id(baopai)] += 1
+        assert game.model['visible'] == visible
+
+    def test_consistency(self):
+        game = init_game({'shoupai': ['m123p456s789z1122', '', '', '']})
+        for _ in range(8):
+            game.zimo()
+            game.dapai(game.model['shoupai'][game.model['lunban']]._zimo + '_')
+        visible = [0] * 34
+        for p in game.model['shan'].baopai:
+            visible[pai_id(p)] += 1
+        for he in game.model['he']:
+            for p in he._pai:
+                visible[pai_id(p)] += 1
+        assert game.model['visible'] == visible
+
+
 class TestGameGetChiMianzi:
     def test_chi_mianzi(self):
         game = init_game({'shoupai': ['', '_', 'm1234p456s789z111', '']})
@@ -2456,3 +2636,43 @@ def test_scenario(shared_datadir):
         game = dev.Game(json.loads(json.dumps(paipu)),
                         majiang.rule({'rank_bounus': ['20', '10', '-10', '-20']})).do_sync()
         assert paipu == game._paipu
+
+
+class TestGameScheduler:
+    def test_set_timeout(self):
+        game = majiang.Game([], None)
+        timer = game.set_timeout(0, done)
+        time.sleep(0.1)
+        assert called == 1
+        timer.cancel()
+
+    def test_clear_timeout(self):
+        game = majiang.Game([], None)
+        game._loop = game.set_timeout(50, done)
+        game.clear_timeout()
+        assert game._loop is None
+        time.sleep(0.1)
+        assert called == 0
+
+    def test_shared(self):
+        assert majiang.Game([], None).scheduler is majiang.Game([], None).scheduler
+
+    def test_tables(self):
+        async def main():
+            loop = asyncio.get_running_loop()
+            scheduler = Scheduler(loop)
+            futures = []
+            for _ in range(8):
+                future = loop.create_future()
+                game = majiang.Game([Player(id) for id in range(4)],
+                                    lambda paipu, future=future: future.set_result(paipu),
+                                    majiang.rule({'n_zhuang': 1}))
+                game.scheduler = scheduler
+                game.speed = 0
+                game.kaiju()
+                futures.append(future)
+            return await asyncio.wait_for(asyncio.gather(*futures), 60)
+
+        paipu = asyncio.run(main())
+        assert len(paipu) == 8
+        assert all(sum(p['defen']) == 100000 for p in paipu)
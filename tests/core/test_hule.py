@@ -1,8 +1,9 @@
 import pytest   # noqa
 import json
 
-from jongpy.core import Shoupai, hule_mianzi, hule, rule
+from jongpy.core import Shoupai, hule_mianzi, hule, hule_batch, rule
 from jongpy.core import hule_param as param
+from jongpy.core.hule import hule_cache_info, hule_cache_clear, parse_mianzi, hupai_mask, get_hudi, _get_hupai
 from jongpy.core.exceptions import InvalidOperationError
 
 
@@ -82,6 +83,57 @@ class TestHuleMianzi:
                 == [['s99', 's456', 's78_!9', 'z444', 's8888']])
 
 
+class TestParseMianzi:
+
+    def test_shunzi(self):
+        m = parse_mianzi('m40-6')
+        assert (m.s, m.nn, m.d, m.hule_d, m.hule_i) == ('m', (4, 5, 6), '-', '', -1)
+
+    def test_hulepai(self):
+        m = parse_mianzi('p7=!89')
+        assert (m.s, m.nn, m.d, m.hule_d, m.hule_i) == ('p', (7, 8, 9), '', '=', 0)
+
+    def test_zimo(self):
+        m = parse_mianzi('z555_!')
+        assert (m.d, m.hule_d, m.hule_i) == ('', '_', 2)
+        assert m.menqian and m.kezi and not m.gangzi
+
+    def test_gangzi(self):
+        m = parse_mianzi('s111+1')
+        assert m.d == '+'
+        assert m.gangzi and m.yaojiu and not m.menqian
+
+
+class TestHupaiMask:
+
+    def test_mask(self):
+        mask = hupai_mask(['z55', 'm123', 'm123', 'p444=', 's7-89'])
+        assert mask.se == 0b1111
+        assert mask.shunzi == (1 << 0) | (1 << 24)
+        assert mask.kezi == 1 << 12
+        assert mask.n_beikou == 1
+        assert mask.jiangpai == 31
+
+    def test_qiduizi(self):
+        mask = hupai_mask(['s22', 's33', 's44', 's66', 's88', 'z66', 'z66_!'])
+        assert mask.kezi == 0 and mask.shunzi == 0
+        assert mask.jiangpai == -1
+
+    @pytest.mark.parametrize('paistr, rongpai', [
+        ('m123p123s123m55z111', None),
+        ('m112233p445566z7', 'z7='),
+        ('m11123455678999', None),
+        ('s22334466888z6', 'z6-'),
+        ('m1,z1111,z222=,z333-,z444+', 'm1='),
+        ('p55,z555-,z666+,z777=,m123-', None),
+    ])
+    def test_same_as_solver(self, paistr, rongpai):
+        for r in [rule(), rule({'fulou_duanyaojiu': False, 'double_damanguan': False})]:
+            for mianzi in hule_mianzi(Shoupai.from_str(paistr), rongpai):
+                hudi = get_hudi(mianzi, 0, 1)
+                assert _get_hupai(mianzi, hudi, r) == _get_hupai(mianzi, hudi, r, bitmask=False)
+
+
 class TestHuleFu:
 
     def test_invalid_param(self):
@@ -1109,3 +1161,74 @@ class TestRule:
                                {'name': '混一色', 'fanshu': 2}],
                      'fu': 60, 'fanshu': 3, 'damanguan': None, 'defen': 12000,
                      'fenpei': [12000, -4000, -4000, -4000]}
+
+
+class TestHuleCache:
+
+    def test_hit(self):
+        hule_cache_clear()
+        hule(Shoupai.from_str('m123p456s789z1122'), 'z1=', param())
+        hule(Shoupai.from_str('m123p456s789z1122'), 'z1=', param())
+        info = hule_cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_hongpai_shares_entry(self):
+        hule_cache_clear()
+        h1 = hule(Shoupai.from_str('m344556s24678z66*'), 's3=', param({'lizhi': 1}))
+        h2 = hule(Shoupai.from_str('m344056s24678z66*'), 's3=', param({'lizhi': 1}))
+        assert hule_cache_info().hits == 1
+        assert h1['hupai'] == [{'name': '立直', 'fanshu': 1}]
+        assert h2['hupai'] == [{'name': '立直', 'fanshu': 1},
+                               {'name': '赤ドラ', 'fanshu': 1}]
+
+    def test_context_in_key(self):
+        hule_cache_clear()
+        h1 = hule(Shoupai.from_str('m123p456s789z1122'), 'z1=', param())
+        h2 = hule(Shoupai.from_str('m123p456s789z1122'), 'z1=', param({'zhuangfeng': 1}))
+        assert hule_cache_info().misses == 2
+        assert h1['hupai'] == [{'name': '場風 東', 'fanshu': 1}]
+        assert h2['hupai'] is None
+
+    def test_result_not_shared(self):
+        hule_cache_clear()
+        h1 = hule(Shoupai.from_str('m123p456s789z1122'), 'z1=', param())
+        h1['hupai'][0]['fanshu'] = 2
+        h2 = hule(Shoupai.from_str('m123p456s789z1122'), 'z1=', param())
+        assert h2['hupai'] == [{'name': '場風 東', 'fanshu': 1}]
+
+
+class TestHuleBatch:
+
+    def test_columns(self):
+        rv = hule_batch([Shoupai.from_str('m123p456s789z1122'),
+                         Shoupai.from_str('z33m123p456s789m234'),
+                         Shoupai.from_str('m344556s24678z66')],
+                        ['z1=', None, 's3='],
+                        param())
+        assert rv == {'hupai': [[{'name': '場風 東', 'fanshu': 1}],
+                                [{'name': '門前清自摸和', 'fanshu': 1},
+                                 {'name': '平和', 'fanshu': 1}],
+                                None],
+                      'fu': [40, 20, 40],
+                      'fanshu': [1, 2, 0],
+                      'damanguan': [None, None, 0],
+                      'defen': [1300, 1500, 0],
+                      'fenpei': [[0, 1300, 0, -1300], [-700, 1500, -400, -400], []]}
+
+    def test_not_hule(self):
+        rv = hule_batch([Shoupai.from_str('m123p456s789z1123')], ['z4='], param())
+        assert rv['defen'] == [None]
+
+    def test_same_as_hule(self):
+        shoupai = [Shoupai.from_str('m344556s24678z66*'), Shoupai.from_str('p55m234s78,m4-06,z111+')]
+        rongpai = ['s3=', 's9=']
+        params = [param({'lizhi': 1, 'baopai': ['m2'], 'fubaopai': ['m2']}), param({'baopai': ['m4']})]
+        rv = hule_batch(shoupai, rongpai, params)
+        for i in range(2):
+            h = hule(shoupai[i], rongpai[i], params[i])
+            assert [rv[key][i] for key in h] == list(h.values())
+
+    def test_error_length(self):
+        with pytest.raises(ValueError):
+            hule_batch([Shoupai.from_str('m123p456s789z1122')], [], param())
@@ -0,0 +1,116 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from jongpy.core.message import FrozenDict, FrozenList, freeze, masked
+
+
+class TestFreeze:
+    def test_dict(self):
+        msg = freeze({'zimo': {'l': 0, 'p': 'm1'}})
+        assert isinstance(msg, FrozenDict)
+        assert isinstance(msg['zimo'], FrozenDict)
+        assert msg == {'zimo': {'l': 0, 'p': 'm1'}}
+
+    def test_list(self):
+        msg = freeze({'qipai': {'shoupai': ['m123', '', '', '']}})
+        assert isinstance(msg['qipai']['shoupai'], FrozenList)
+        assert msg['qipai']['shoupai'] == ['m123', '', '', '']
+
+    def test_copy(self):
+        shoupai = ['m123', '', '', '']
+        msg = freeze({'shoupai': shoupai})
+        shoupai[0] = ''
+        assert msg['shoupai'][0] == 'm123'
+
+    def test_shared(self):
+        zimo = freeze({'l': 0, 'p': 'm1'})
+        assert freeze({'zimo': zimo})['zimo'] is zimo
+        assert freeze(zimo) is zimo
+
+    def test_scalar(self):
+        assert freeze('m1') == 'm1'
+        assert freeze(None) is None
+
+    def test_json(self):
+        msg = freeze({'hule': {'hupai': [{'name': '立直', 'fanshu': 1}]}})
+        assert json.loads(json.dumps(msg)) == msg
+
+    def test_pickle(self):
+        msg = freeze({'zimo': {'l': 0, 'p': 'm1'}, 'log': [[1], [2]]})
+        msg = pickle.loads(pickle.dumps(msg))
+        assert isinstance(msg['zimo'], FrozenDict)
+        assert isinstance(msg['log'][0], FrozenList)
+        assert msg == {'zimo': {'l': 0, 'p': 'm1'}, 'log': [[1], [2]]}
+
+    def test_deepcopy(self):
+        msg = freeze({'zimo': {'l': 0}})
+        assert copy.deepcopy(msg) is msg
+
+
+class TestFrozenDict:
+    @pytest.mark.parametrize('op', [
+        lambda d: d.__setitem__('a', 2),
+        lambda d: d.__delitem__('a'),
+        lambda d: d.clear(),
+        lambda d: d.pop('a'),
+        lambda d: d.popitem(),
+        lambda d: d.setdefault('b', 1),
+        lambda d: d.update(b=1),
+        lambda d: d.__ior__({'b': 1}),
+    ])
+    def test_immutable(self, op):
+        d = freeze({'a': 1})
+        with pytest.raises(TypeError):
+            op(d)
+        assert d == {'a': 1}
+
+    def test_dict(self):
+        d = dict(freeze({'a': 1}))
+        d['a'] = 2
+        assert d == {'a': 2}
+
+
+class TestFrozenList:
+    @pytest.mark.parametrize('op', [
+        lambda a: a.__setitem__(0, 2),
+        lambda a: a.__delitem__(0),
+        lambda a: a.__iadd__([1]),
+        lambda a: a.__imul__(2),
+        lambda a: a.append(1),
+        lambda a: a.extend([1]),
+        lambda a: a.insert(0, 1),
+        lambda a: a.pop(),
+        lambda a: a.remove(1),
+        lambda a: a.clear(),
+        lambda a: a.sort(),
+        lambda a: a.reverse(),
+    ])
+    def test_immutable(self, op):
+        a = freeze([1])
+        with pytest.raises(TypeError):
+            op(a)
+        assert a == [1]
+
+
+class TestMasked:
+    def test_masked(self):
+        msg = freeze({'zimo': {'l': 0, 'p': 'm1'}})
+        masked_msg = masked(msg, ('zimo', 'p'), '')
+        assert masked_msg == {'zimo': {'l': 0, 'p': ''}}
+        assert msg == {'zimo': {'l': 0, 'p': 'm1'}}
+        assert isinstance(masked_msg['zimo'], FrozenDict)
+
+    def test_copy_on_write(self):
+        msg = freeze({'qipai': {'shoupai': ['m1', 'p1', 's1', 'z1'], 'defen': [25000] * 4}})
+        masked_msg = masked(msg, ('qipai', 'shoupai', 1), '')
+        assert masked_msg['qipai']['shoupai'] == ['m1', '', 's1', 'z1']
+        assert masked_msg['qipai']['defen'] is msg['qipai']['defen']
+
+    def test_value(self):
+        msg = freeze({'qipai': {'shoupai': ['m1', 'p1', 's1', 'z1']}})
+        masked_msg = masked(msg, ('qipai', 'shoupai'), ['m1', '', '', ''])
+        assert isinstance(masked_msg['qipai']['shoupai'], FrozenList)
+        assert masked_msg['qipai']['shoupai'] == ['m1', '', '', '']
@@ -0,0 +1,147 @@
+import pytest
+
+from jongpy.core import Shoupai, PackedShoupai, xiangting, xiangting_array, tingpai, tingpai_array
+from jongpy.core.pai import pai_str
+from jongpy.core.exceptions import (PaiFormatError,
+                                    PaiOverFlowError,
+                                    PaiNotExistError,
+                                    ShoupaiOverFlowError,
+                                    ShoupaiUnderFlowError,
+                                    InvalidOperationError)
+
+
+def _packed(paistr: str):
+    return PackedShoupai.from_str(paistr)
+
+
+class TestPackedShoupaiConstructor:
+
+    def test_empty(self):
+        assert str(PackedShoupai()) == ''
+
+    def test_qipai(self):
+        assert str(PackedShoupai(['m0', 'm1', 'p3', 'z7', '_'])) == '_m10p3z7'
+
+    def test_error_invalid_pai(self):
+        with pytest.raises(PaiFormatError):
+            PackedShoupai(['z0'])
+
+    def test_error_overflow(self):
+        with pytest.raises(PaiOverFlowError):
+            PackedShoupai(['m5', 'm5', 'm5', 'm5', 'm0'])
+
+
+class TestPackedShoupaiConvert:
+
+    def test_round_trip(self):
+        for paistr in ['m055p123s789z1122*', '_____m123,z111=,p0-67,', 'm123p406s789z11222',
+                       's1234,m5550,p111+1']:
+            assert str(_packed(paistr)) == str(Shoupai.from_str(paistr))
+            assert str(_packed(paistr).to_shoupai()) == str(Shoupai.from_str(paistr))
+
+    def test_bingpai(self):
+        packed = _packed('m0p055z77')
+        assert packed.bingpai[4] == 1
+        assert packed.bingpai[13] == 3
+        assert packed.bingpai[33] == 2
+
+    def test_pai(self):
+        assert _packed('m0p055z77').pai() == ['m0', 'p0', 'p5', 'p5', 'z7', 'z7']
+
+    def test_clone(self):
+        packed = _packed('m123p456s789z4567')
+        clone = packed.clone()
+        clone.zimo('m1')
+        assert str(packed) == 'm123p456s789z4567'
+        assert str(clone) == 'm123p456s789z4567m1'
+
+
+class TestPackedShoupaiZimo:
+
+    def test_zimo(self):
+        assert str(_packed('m123p456s789z4567').zimo('m0')) == 'm123p456s789z4567m0'
+
+    def test_fupai(self):
+        assert str(_packed('_____________').zimo('_')) == '______________'
+
+    def test_error_overflow(self):
+        with pytest.raises(ShoupaiOverFlowError):
+            _packed('m123p456s789z34567').zimo('m1')
+
+    def test_error_fifth_pai(self):
+        with pytest.raises(PaiOverFlowError):
+            _packed('m123p456s789z1111').zimo('z1')
+
+
+class TestPackedShoupaiDapai:
+
+    def test_dapai(self):
+        assert str(_packed('m123p406s789z34567').dapai('p0')) == 'm123p46s789z34567'
+
+    def test_lizhi(self):
+        assert str(_packed('m123p456s789z34567').dapai('z7_*')) == 'm123p456s789z3456*'
+
+    def test_fupai(self):
+        assert str(_packed('______________').dapai('m1')) == '_____________'
+
+    def test_error_underflow(self):
+        with pytest.raises(ShoupaiUnderFlowError):
+            _packed('m123p456s789z4567').dapai('m1')
+
+    def test_error_not_exist(self):
+        with pytest.raises(PaiNotExistError):
+            _packed('m123p456s789z34567').dapai('m0')
+
+
+class TestPackedShoupaiFulou:
+
+    def test_chi(self):
+        assert str(_packed('m123p456s789z4567').fulou('m1-23')) == 'm1p456s789z4567,m1-23,'
+
+    def test_daminggang(self):
+        assert str(_packed('m123p555s789z4567').fulou('p5555=')) == 'm123s789z4567,p5555='
+
+    def test_error_angang(self):
+        with pytest.raises(InvalidOperationError):
+            _packed('m1111p456s789z456').fulou('m1111')
+
+
+class TestPackedShoupaiGang:
+
+    def test_angang(self):
+        assert str(_packed('m1111p456s789z4567').gang('m1111')) == 'p456s789z4567,m1111'
+
+    def test_jiagang(self):
+        assert str(_packed('p456s789z4567m1,m111+').gang('m111+1')) == 'p456s789z4567,m111+1'
+
+    def test_error_jiagang_without_kezi(self):
+        with pytest.raises(InvalidOperationError):
+            _packed('m11p456s789z4567').zimo('m1').gang('m111+1')
+
+
+class TestXiangtingArray:
+
+    def test_same_as_xiangting(self):
+        for paistr in ['m123p406s789z1122', 'm19p19s19z1234567', 'm1188p288s05z1177',
+                       'm133345568z23677', 'p234s567,m222=,p0-67']:
+            packed = _packed(paistr)
+            assert xiangting_array(packed.bingpai, len(packed._fulou)) == xiangting(Shoupai.from_str(paistr))
+
+
+class TestTingpaiArray:
+
+    def test_same_as_tingpai(self):
+        for paistr in ['m123p406s789z112', 'm19p19s19z1234567', 'm1188p288s05z117',
+                       'm1112345678999', 'p234s567,m222=,p0-67', 'm1122334455z11']:
+            packed = _packed(paistr)
+            pai = [pai_str(i) for i in tingpai_array(packed.bingpai, len(packed._fulou))]
+            assert pai == tingpai(Shoupai.from_str(paistr))
+
+
+class TestPackedShoupaiMenqian:
+
+    def test_menqian(self):
+        assert _packed('m123p456s789,z1111').menqian
+
+    def test_fulou(self):
+        assert not _packed('m1,z1111,p111=,s1111+').menqian
@@ -0,0 +1,62 @@
+import pytest
+
+from jongpy.core.pai import N_PAI, PAI, pai_id, pai_str, is_hongpai, mianzi_id
+from jongpy.core.exceptions import PaiFormatError
+
+
+class TestPaiId:
+
+    def test_m1(self):
+        assert pai_id('m1') == 0
+
+    def test_z7(self):
+        assert pai_id('z7') == N_PAI - 1
+
+    def test_hongpai(self):
+        assert pai_id('p0') == pai_id('p5') == 13
+
+    def test_ignore_suffix(self):
+        assert pai_id('s7_*-') == 24
+
+    def test_error_invalid_pai(self):
+        with pytest.raises(PaiFormatError):
+            pai_id('z8')
+
+
+class TestPaiStr:
+
+    def test_all(self):
+        assert [pai_str(i) for i in range(N_PAI)] == PAI
+
+    def test_hongpai(self):
+        assert pai_str(22, True) == 's0'
+
+    def test_hongpai_not_five(self):
+        assert pai_str(31, True) == 'z5'
+
+
+class TestIsHongpai:
+
+    def test_hongpai(self):
+        assert is_hongpai('m0')
+
+    def test_not_hongpai(self):
+        assert not is_hongpai('m5')
+
+
+class TestMianziId:
+
+    def test_chi(self):
+        assert mianzi_id('m1-23') == [1, 2]
+
+    def test_peng_hongpai(self):
+        assert mianzi_id('p550=') == [13, 13]
+
+    def test_daminggang(self):
+        assert mianzi_id('z6666+') == [32, 32, 32]
+
+    def test_jiagang(self):
+        assert mianzi_id('s555=0', True) == [22]
+
+    def test_angang(self):
+        assert mianzi_id('m1111', True) == [0, 0, 0, 0]
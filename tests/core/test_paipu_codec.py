@@ -0,0 +1,131 @@
+import json
+import mmap
+
+import pytest
+
+import jongpy.core as majiang
+from jongpy.core.paipu_codec import (encode, encode_index, decode, PaipuView,
+                                     PaipuFormatError)
+
+
+class Player:
+    def action(self, msg, callback=None):
+        if callback is not None:
+            callback(None)
+
+
+@pytest.fixture(scope='module')
+def paipu():
+    game = majiang.Game([Player() for _ in range(4)], None, majiang.rule())
+    return json.loads(json.dumps(game.simulate(5, seed=3, paipu=True)['paipu']))
+
+
+def _paipu(log):
+    return {'title': 'タイトル', 'player': ['自家', '下家', '対面', '上家'], 'qijia': 0,
+            'log': [log], 'defen': [25000] * 4, 'point': ['-25.0', '35.0', '5.0', '-15.0'],
+            'rank': [4, 1, 2, 3]}
+
+
+class TestPaipuCodecRoundTrip:
+    def test_simulate(self, paipu):
+        for p in paipu:
+            assert decode(encode(p)) == p
+
+    def test_size(self, paipu):
+        size_json = sum(len(json.dumps(p, ensure_ascii=False).encode()) for p in paipu)
+        size_bin = sum(len(encode(p)) for p in paipu)
+        assert size_json / size_bin >= 10
+
+    @pytest.mark.parametrize('event', [
+        {'zimo': {'l': 0, 'p': 'm1'}},
+        {'zimo': {'l': 3, 'p': 'z7'}},
+        {'dapai': {'l': 1, 'p': 'm0_'}},
+        {'dapai': {'l': 2, 'p': 's5*'}},
+        {'dapai': {'l': 2, 'p': 'p3_*'}},
+        {'fulou': {'l': 1, 'm': 'm12-3'}},
+        {'fulou': {'l': 2, 'm': 'p5550='}},
+        {'gang': {'l': 0, 'm': 's5550'}},
+        {'gang': {'l': 0, 'm': 'z111+1'}},
+        {'gangzimo': {'l': 3, 'p': 'p0'}},
+        {'kaigang': {'baopai': 's9'}},
+        {'qipai': {'zhuangfeng': 0, 'jushu': 0, 'changbang': 0, 'lizhibang': 0,
+                   'defen': [25000, 25000, 25000, 25000], 'baopai': 'm1',
+                   'shoupai': ['m289p1266s159z112', '', '', '']}},
+        {'hule': {'l': 0, 'shoupai': 'm123p456s789z11m1,z222=', 'baojia': None,
+                  'fubaopai': ['m1'], 'fu': 30, 'fanshu': 2, 'defen': 2000,
+                  'hupai': [{'name': '立直', 'fanshu': 1}, {'name': '国士無双', 'fanshu': '*'}],
+                  'fenpei': [2000, -2000, 0, 0]}},
+        {'pingju': {'name': '荒牌平局', 'shoupai': ['', 'm123', '', ''], 'fenpei': [-1500, 1500, 0, 0]}},
+    ])
+    def test_event(self, event):
+        p = _paipu([event])
+        assert decode(encode(p)) == p
+
+    @pytest.mark.parametrize('event', [
+        {'zimo': {'l': True, 'p': 'm1'}},
+        {'zimo': {'l': 4, 'p': 'm1'}},
+        {'zimo': {'l': 0, 'p': ''}},
+        {'zimo': {'l': 0, 'p': 'm1', 'x': 1}},
+        {'dapai': {'l': 0, 'p': 'm12'}},
+        {'kaigang': {'baopai': 'x'}},
+        {'other': {'f': 1.5, 'b': [True, False, None], 's': '日本語', 'e': 'm1.'}},
+        {'zimo': {'l': 0, 'p': 'm1'}, 'extra': -123456789},
+    ])
+    def test_generic(self, event):
+        p = _paipu([event])
+        decoded = decode(encode(p))
+        assert decoded == p
+        assert json.dumps(decoded['log'], sort_keys=True) == json.dumps(p['log'], sort_keys=True)
+
+    def test_empty(self):
+        p = {'title': '', 'log': []}
+        assert decode(encode(p)) == p
+
+
+class TestPaipuView:
+    def test_offset(self, paipu):
+        data = b'xx' + encode(paipu[0]) + encode(paipu[1])
+        view = PaipuView(data, 2)
+        assert view.to_dict() == paipu[0]
+        assert decode(data, view.nbytes) == paipu[1]
+
+    def test_round(self, paipu):
+        view = PaipuView(encode(paipu[0]))
+        assert len(view.rounds) == len(paipu[0]['log'])
+        assert view.round(2) == paipu[0]['log'][2]
+        assert view.header['rank'] == paipu[0]['rank']
+
+    def test_encode_index(self, paipu):
+        data, rounds = encode_index(paipu[0])
+        view = PaipuView(data)
+        assert rounds == view.rounds
+        offset, n = rounds[1]
+        assert list(view.iter_events(offset=offset, n=3)) == paipu[0]['log'][1][:3]
+
+    def test_iter_events(self, paipu):
+        view = PaipuView(encode(paipu[0]))
+        events = [e for log in paipu[0]['log'] for e in log]
+        assert list(view.iter_events()) == events
+
+    def test_interleaved(self, paipu):
+        view = PaipuView(encode(paipu[0]))
+        a = view.iter_events(0)
+        b = view.iter_events(1)
+        assert [next(a), next(b), next(a)] == [paipu[0]['log'][0][0], paipu[0]['log'][1][0],
+                                               paipu[0]['log'][0][1]]
+
+    def test_mmap(self, paipu, tmp_path):
+        path = tmp_path / 'paipu.bin'
+        path.write_bytes(encode(paipu[0]))
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = PaipuView(mm)
+            assert view.round(0) == paipu[0]['log'][0]
+            del view
+
+    def test_bad_magic(self):
+        with pytest.raises(PaipuFormatError):
+            PaipuView(b'JSON\x01')
+
+    def test_bad_version(self):
+        with pytest.raises(PaipuFormatError):
+            PaipuView(b'JPPU\x09')
@@ -188,6 +188,21 @@ class TestPlayerDapai:
         player.dapai({'l': 1, 'p': 'p0'})
         assert not player._neng_rong
 
+    def test_hulepai_cached_after_tsumogiri(self):
+        player = init_player({'shoupai': 'm123p456s789z1122'})
+        hulepai = player.hulepai
+        assert hulepai == ['z1', 'z2']
+        player.zimo({'l': 0, 'p': 'm9'})
+        player.dapai({'l': 0, 'p': 'm9_'})
+        assert player.hulepai is hulepai
+
+    def test_hulepai_changed(self):
+        player = init_player({'shoupai': 'm123p456s789z1122'})
+        assert player.hulepai == ['z1', 'z2']
+        player.zimo({'l': 0, 'p': 'z1'})
+        player.dapai({'l': 0, 'p': 'z2'})
+        assert player.hulepai == ['z2']
+
 
 class TestPlayerFulou:
     def test_update_board(self):
@@ -228,6 +243,15 @@ class TestPlayerGang:
         player.gang({'l': 3, 'm': 'm555-0'})
         assert not player._neng_rong
 
+    def test_hulepai_changed(self):
+        player = init_player({'shoupai': 'm123p456s789z1112'})
+        assert player.hulepai == ['z2']
+        player.zimo({'l': 0, 'p': 'z1'})
+        player.gang({'l': 0, 'm': 'z1111'})
+        player.zimo({'l': 0, 'p': 'z2'})
+        player.dapai({'l': 0, 'p': 'm1'})
+        assert player.hulepai == ['m1', 'm4']
+
 
 class TestPlayerKaigang:
     def test_update_board(self):
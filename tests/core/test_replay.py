@@ -0,0 +1,101 @@
+import json
+import types
+
+import pytest
+
+import jongpy.core as majiang
+from jongpy.core.paipu_codec import PaipuView, PaipuFormatError, encode
+from jongpy.core.replay import Replayer, apply_event
+
+
+class Player:
+    def action(self, msg, callback=None):
+        if callback is not None:
+            callback(None)
+
+
+@pytest.fixture(scope='module')
+def paipu():
+    game = majiang.Game([Player() for _ in range(4)], None, majiang.rule())
+    return json.loads(json.dumps(game.simulate(1, seed=11, paipu=True)['paipu'][0]))
+
+
+def state(board):
+    return (
+        [str(s) for s in board.shoupai],
+        [list(h._pai) if h else None for h in board.he],
+        list(board.defen),
+        board.lunban,
+        list(board.shan.baopai) if board.shan else None,
+        board.shan.paishu if board.shan else None,
+        board.changbang,
+        board.lizhibang,
+    )
+
+
+def naive(paipu):
+    board = majiang.Board({'title': paipu['title'], 'player': paipu['player'], 'qijia': paipu['qijia']})
+    states = [state(board)]
+    for log in paipu['log']:
+        for event in log:
+            apply_event(board, event)
+            states.append(state(board))
+    return states
+
+
+class TestReplayer:
+    def test_len(self, paipu):
+        assert len(Replayer(paipu)) == sum(len(log) for log in paipu['log'])
+
+    def test_event(self, paipu):
+        replayer = Replayer(paipu)
+        assert replayer.event(0) == (0, paipu['log'][0][0])
+        n = len(paipu['log'][0])
+        assert replayer.event(n) == (1, paipu['log'][1][0])
+
+    def test_states(self, paipu):
+        expected = naive(paipu)
+        states = Replayer(paipu, 8).states()
+        assert isinstance(states, types.GeneratorType)
+        for i, event, board in states:
+            assert state(board) == expected[i + 1]
+
+    def test_states_start(self, paipu):
+        expected = naive(paipu)
+        replayer = Replayer(paipu, 8)
+        states = list((i, state(board)) for i, _, board in replayer.states(21, 30))
+        assert states == [(i, expected[i + 1]) for i in range(21, 30)]
+
+    @pytest.mark.parametrize('interval', [1, 7, 32, 1000])
+    def test_seek(self, paipu, interval):
+        expected = naive(paipu)
+        replayer = Replayer(paipu, interval)
+        for n in [0, 1, 50, 13, len(replayer), 49, 200, 7]:
+            if n <= len(replayer):
+                assert state(replayer.seek(n)) == expected[n]
+
+    def test_seek_copy(self, paipu):
+        replayer = Replayer(paipu, 4)
+        board = replayer.seek(8)
+        board.defen[0] = 0
+        assert replayer.seek(8).defen[0] != 0
+
+    def test_seek_range(self, paipu):
+        replayer = Replayer(paipu)
+        with pytest.raises(IndexError):
+            replayer.seek(len(replayer) + 1)
+
+    def test_interval(self, paipu):
+        with pytest.raises(ValueError):
+            Replayer(paipu, 0)
+
+    def test_view(self, paipu):
+        expected = naive(paipu)
+        replayer = Replayer(PaipuView(encode(paipu)))
+        assert state(replayer.seek(100)) == expected[100]
+
+
+class TestApplyEvent:
+    def test_unknown(self):
+        with pytest.raises(PaipuFormatError):
+            apply_event(majiang.Board(), {'kaiju': {}})
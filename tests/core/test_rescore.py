@@ -0,0 +1,169 @@
+import copy
+import json
+
+import pytest
+
+import jongpy.core as majiang
+from jongpy.core import rule
+from jongpy.core.archive import write_archive
+from jongpy.core.sink import JsonlSink
+from jongpy.core.xiangting import xiangting
+from jongpy.core.rescore import iter_paipu, compare, validate, validate_all, main
+
+
+RULE = rule({'n_zhuang': 1})
+
+
+class HulePlayer(majiang.Player):
+    """和了できれば和了し、それ以外はツモ切りする対局者"""
+
+    def action_kaiju(self, kaiju):
+        self._callback(None)
+
+    def action_qipai(self, qipai):
+        self._callback(None)
+
+    def action_zimo(self, zimo, gangzimo):
+        if zimo['l'] != self._menfeng:
+            return self._callback(None)
+        if self.allow_hule(self.shoupai, None):
+            return self._callback({'hule': '-'})
+        if self.shoupai.lizhi:
+            return self._callback(None)
+        # 向聴数が最小になる牌を打牌し、聴牌ならリーチする
+        dapai = min(self.get_dapai(self.shoupai),
+                    key=lambda p: xiangting(self.shoupai.clone().dapai(p)))
+        if self.allow_lizhi(self.shoupai, dapai):
+            dapai += '*'
+        self._callback({'dapai': dapai})
+
+    def action_dapai(self, dapai):
+        if dapai['l'] != self._menfeng:
+            d = ['', '+', '=', '-'][(4 + dapai['l'] - self._menfeng) % 4]
+            if self.allow_hule(self.shoupai, dapai['p'] + d):
+                return self._callback({'hule': '-'})
+        self._callback(None)
+
+    def action_fulou(self, fulou):
+        self._callback(None)
+
+    def action_gang(self, gang):
+        self._callback(None)
+
+    def action_hule(self, hule):
+        self._callback(None)
+
+    def action_pingju(self, pingju):
+        self._callback(None)
+
+    def action_jieju(self, paipu):
+        self._callback(None)
+
+
+@pytest.fixture(scope='module')
+def paipu():
+    game = majiang.Game([HulePlayer() for _ in range(4)], None, RULE)
+    # 牌譜は変更できないので JSON を経由して複製する
+    return json.loads(json.dumps(game.simulate(4, seed=1, paipu=True)['paipu']))
+
+
+class TestRescoreCompare:
+
+    def test_same(self, paipu):
+        assert compare(paipu[0], copy.deepcopy(paipu[0])) == []
+
+    def test_fenpei(self, paipu):
+        actual = copy.deepcopy(paipu[0])
+        event = next(e for e in actual['log'][0] if 'hule' in e or 'pingju' in e)
+        kind = next(iter(event))
+        event[kind]['fenpei'] = [0, 0, 0, 0]
+        r = compare(paipu[0], actual)
+        assert r[0]['round'] == 0
+        assert r[0]['event'] == kind
+        assert r[0]['key'] == 'fenpei'
+        assert r[0]['actual'] == [0, 0, 0, 0]
+
+    def test_jieju(self, paipu):
+        actual = copy.deepcopy(paipu[0])
+        actual['rank'] = actual['rank'][::-1]
+        assert compare(paipu[0], actual)[-1]['event'] == 'jieju'
+
+
+class TestRescoreValidate:
+
+    def test_valid(self, paipu):
+        assert any('hule' in e for p in paipu for log in p['log'] for e in log)
+        for p in paipu:
+            r = validate(p, RULE)
+            assert r['error'] is None
+            assert r['mismatch'] == []
+            assert r['rounds'] == len(p['log'])
+
+    def test_not_modify(self, paipu):
+        p = copy.deepcopy(paipu[0])
+        validate(p, RULE)
+        assert p == paipu[0]
+
+    def test_tampered(self, paipu):
+        p = copy.deepcopy(paipu[0])
+        for log in p['log']:
+            for e in log:
+                if 'hule' in e:
+                    e['hule']['defen'] += 100
+        if p == paipu[0]:
+            pytest.skip('no hule')
+        r = validate(p, RULE)
+        assert {m['key'] for m in r['mismatch']} == {'defen'}
+
+    def test_error(self, paipu):
+        p = copy.deepcopy(paipu[0])
+        del p['log'][0][0]['qipai']['shoupai']
+        assert validate(p, RULE)['error'].startswith('KeyError')
+
+
+class TestRescoreIterPaipu:
+
+    def test_files(self, paipu, tmp_path):
+        with open(tmp_path / 'a.json', 'w') as f:
+            json.dump(paipu[0], f)
+        with open(tmp_path / 'b.jsonl', 'w') as f:
+            for p in paipu[1:3]:
+                f.write(json.dumps(p) + '\n')
+        write_archive(tmp_path / 'c.jppa', paipu[3:])
+        (tmp_path / 'd.txt').write_text('')
+        r = list(iter_paipu(tmp_path))
+        assert [name.rsplit('/', 1)[1] for name, _ in r] == ['a.json#0', 'b.jsonl#0', 'b.jsonl#1', 'c.jppa#0']
+        assert [p['log'] for _, p in r] == [p['log'] for p in paipu]
+
+    def test_sink(self, tmp_path):
+        path = tmp_path / 'sink.jsonl'
+        game = majiang.Game([HulePlayer() for _ in range(4)], None, RULE)
+        with JsonlSink(path) as sink:
+            game.sink = sink
+            r = game.simulate(1, seed=2, paipu=True)
+        (_, p), = iter_paipu(path)
+        assert p['log'] == r['paipu'][0]['log']
+        assert validate(p, RULE)['mismatch'] == []
+
+
+class TestRescoreValidateAll:
+
+    def test_summary(self, paipu, tmp_path):
+        bad = copy.deepcopy(paipu[1])
+        bad['defen'] = [0, 0, 0, 0]
+        with open(tmp_path / 'a.json', 'w') as f:
+            json.dump([paipu[0], bad] + paipu[2:], f)
+        s1 = validate_all([tmp_path], RULE, processes=1)
+        s2 = validate_all([tmp_path], RULE, processes=2, chunksize=1)
+        for s in (s1, s2):
+            assert s['n_games'] == 4
+            assert s['n_rounds'] == sum(len(p['log']) for p in paipu)
+            assert s['n_mismatch'] == 1
+            assert s['n_error'] == 0
+            assert s['mismatch'][0]['name'].endswith('a.json#1')
+
+    def test_main(self, paipu, tmp_path, capsys):
+        with open(tmp_path / 'a.json', 'w') as f:
+            json.dump(paipu[:2], f)
+        assert main([str(tmp_path), '-j', '1', '-r', '{"n_zhuang": 1}']) == 0
+        assert json.loads(capsys.readouterr().out)['n_games'] == 2
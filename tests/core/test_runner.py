@@ -0,0 +1,54 @@
+import pytest
+import queue
+
+from jongpy.core import rule
+from jongpy.core.runner import run_games, iter_games, game_seed, load_player
+
+
+RULE = rule({'n_zhuang': 1})
+
+
+class TestRunnerGameSeed:
+
+    def test_distinct(self):
+        assert len({game_seed(s, i) for s in range(3) for i in range(3)}) == 9
+
+
+class TestRunnerIterGames:
+
+    def test_reproducible(self):
+        r1 = sorted(iter_games(3, rule_=RULE, seed=1, processes=1), key=lambda r: r['game'])
+        r2 = sorted(iter_games(3, rule_=RULE, seed=1, processes=2), key=lambda r: r['game'])
+        assert [r['defen'] for r in r1] == [r['defen'] for r in r2]
+        assert [r['game'] for r in r1] == [0, 1, 2]
+
+    def test_paipu(self):
+        r = next(iter_games(1, rule_=RULE, processes=1, paipu=True))
+        assert r['paipu']['rank'] == r['rank']
+
+
+class TestRunnerRunGames:
+
+    def test_stats(self):
+        stats = run_games(4, rule_=RULE, seed=2, processes=1)
+        assert stats['n_games'] == 4
+        assert [sum(n) for n in stats['rank']] == [4] * 4
+        assert sum(stats['avg_rank']) == pytest.approx(10)
+        assert sum(stats['avg_point']) == pytest.approx(0)
+
+    def test_queue(self):
+        q = queue.Queue()
+        run_games(2, rule_=RULE, processes=1, queue=q)
+        assert q.get()['log']
+        assert q.get()['log']
+        assert q.get() is None
+
+
+class TestRunnerLoadPlayer:
+
+    def test_load(self):
+        assert load_player('jongpy.core.runner:_AutoPlayer')
+
+    def test_error(self):
+        with pytest.raises(ValueError):
+            load_player('jongpy.core.runner')
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+from jongpy.core.scheduler import Scheduler, get_scheduler
+
+
+class TestSchedulerCallLater:
+    def test_call_later(self):
+        called = threading.Event()
+        get_scheduler().call_later(0.05, called.set)
+        assert not called.is_set()
+        assert called.wait(1)
+
+    def test_args(self):
+        result = []
+        done = threading.Event()
+        get_scheduler().call_later(0, lambda *args: (result.extend(args), done.set()), 1, 2)
+        assert done.wait(1)
+        assert result == [1, 2]
+
+    def test_order(self):
+        result = []
+        done = threading.Event()
+        scheduler = get_scheduler()
+        scheduler.call_later(0.05, lambda: (result.append(2), done.set()))
+        scheduler.call_later(0, result.append, 1)
+        assert done.wait(1)
+        assert result == [1, 2]
+
+    def test_cancel(self):
+        called = threading.Event()
+        timer = get_scheduler().call_later(0.05, called.set)
+        timer.cancel()
+        assert not called.wait(0.2)
+
+    def test_cancel_after_fire(self):
+        called = threading.Event()
+        timer = get_scheduler().call_later(0, called.set)
+        assert called.wait(1)
+        timer.cancel()
+
+
+class TestSchedulerShared:
+    def test_default(self):
+        assert get_scheduler() is get_scheduler()
+
+    def test_close(self):
+        scheduler = Scheduler()
+        called = threading.Event()
+        scheduler.call_later(0, called.set)
+        assert called.wait(1)
+        scheduler.close()
+        assert scheduler.loop.is_closed()
+
+    def test_running_loop(self):
+        result = []
+
+        async def main():
+            scheduler = Scheduler(asyncio.get_running_loop())
+            scheduler.call_later(0.01, result.append, 2)
+            scheduler.call_later(0, result.append, 1)
+            scheduler.call_later(0.02, result.append, 3).cancel()
+            await asyncio.sleep(0.05)
+
+        asyncio.run(main())
+        assert result == [1, 2]
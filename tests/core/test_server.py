@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+import jongpy.core as majiang
+from jongpy.core.server import TableManager
+from jongpy.core.exceptions import InvalidOperationError
+
+
+RULE = {'n_zhuang': 1}
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coro, 60))
+    finally:
+        loop.close()
+
+
+class Player:
+    def __init__(self, delay=0):
+        self._delay = delay
+
+    async def action(self, msg, reply=True):
+        Player.pending += reply
+        Player.max_pending = max(Player.max_pending, Player.pending)
+        try:
+            if self._delay:
+                await asyncio.sleep(self._delay)
+        finally:
+            Player.pending -= reply
+        return None
+
+
+@pytest.fixture(autouse=True)
+def init_pending():
+    Player.pending = 0
+    Player.max_pending = 0
+
+
+class TestTableManager:
+    def test_tables(self):
+        paipu = []
+
+        async def main():
+            manager = TableManager()
+            for _ in range(8):
+                manager.add([Player() for _ in range(4)], majiang.rule(RULE), callback=paipu.append)
+            assert manager.active == 8
+            await manager.join()
+            return manager.metrics()
+
+        metrics = run(main())
+        assert len(paipu) == 8
+        assert all(sum(p['defen']) == 100000 for p in paipu)
+        assert metrics['active'] == 0
+        assert metrics['finished'] == 8
+        assert metrics['stopped'] == 0
+        assert metrics['messages'] > 0
+        assert metrics['messages_per_second'] > 0
+        assert metrics['p50_latency'] <= metrics['p99_latency']
+
+    def test_settings(self):
+        async def main():
+            manager = TableManager()
+            id = manager.add([Player() for _ in range(4)], majiang.rule(RULE), speed=2, wait=100, timeout=1)
+            game = manager.game(id)
+            assert (game.speed, game.wait, game.timeout) == (2, 100, 1)
+            await manager.stop()
+            assert manager.game(id) is None
+
+        run(main())
+
+    def test_no_latency(self):
+        metrics = TableManager().metrics()
+        assert metrics['p99_latency'] is None
+        assert metrics['messages'] == 0
+
+
+class TestTableManagerBackpressure:
+    def test_max_pending(self):
+        async def main():
+            manager = TableManager(max_pending=1)
+            for _ in range(3):
+                manager.add([Player(delay=0.001) for _ in range(4)], majiang.rule(RULE))
+            await manager.join()
+
+        run(main())
+        # 応答を待つ卓は同時に 1 卓まで
+        assert Player.max_pending <= 4
+
+    def test_unlimited(self):
+        async def main():
+            manager = TableManager()
+            for _ in range(3):
+                manager.add([Player(delay=0.001) for _ in range(4)], majiang.rule(RULE))
+            await manager.join()
+
+        run(main())
+        assert Player.max_pending > 4
+
+
+class TestTableManagerStop:
+    def test_stop(self):
+        async def main():
+            manager = TableManager()
+            for _ in range(5):
+                manager.add([Player() for _ in range(4)], majiang.rule({'n_zhuang': 2}))
+            await asyncio.sleep(0)
+            await manager.stop()
+            return manager
+
+        manager = run(main())
+        metrics = manager.metrics()
+        assert metrics['active'] == 0
+        assert metrics['stopped'] == 5
+
+    def test_closed(self):
+        async def main():
+            manager = TableManager()
+            await manager.stop()
+            with pytest.raises(InvalidOperationError):
+                manager.add([Player() for _ in range(4)])
+
+        run(main())
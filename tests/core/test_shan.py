@@ -1,4 +1,5 @@
 import pytest
+import random
 
 from jongpy.core import Shan
 from jongpy.core import rule
@@ -82,6 +83,10 @@ class TestShanInit:
                + 'z5,z5,z5,z5,z6,z6,z6,z6,z7,z7,z7,z7')
         assert ",".join(sorted(list(Shan({'hongpai': {'m': 1, 'p': 2, 's': 3}})._pai))) == pai
 
+    def test_rng(self):
+        assert list(Shan(rule(), random.Random(1))._pai) == list(Shan(rule(), random.Random(1))._pai)
+        assert list(Shan(rule(), random.Random(1))._pai) != list(Shan(rule(), random.Random(2))._pai)
+
 
 class TestShanPaishu:
 
@@ -226,3 +231,41 @@ class TestShanKaigang:
         shan = _shan({'fubaopai': False})
         shan.gangzimo()
         assert shan.kaigang().close().fubaopai is None
+
+
+class TestShanBasePai:
+
+    def test_cached(self):
+        assert Shan.base_pai(rule()) is Shan.base_pai(rule())
+
+    def test_hongpai(self):
+        assert Shan.base_pai({'hongpai': {'m': 1, 'p': 0, 's': 0}}).count('m0') == 1
+        assert Shan.base_pai({'hongpai': {'m': 0, 'p': 0, 's': 0}}).count('m0') == 0
+
+    def test_shuffled(self):
+        assert sorted(Shan(rule())._pai) == sorted(Shan.base_pai(rule()))
+
+
+class TestShanBatch:
+
+    def test_batch(self):
+        shan = Shan.batch(rule(), 3, random.Random(1))
+        assert len(shan) == 3
+        assert all(sorted(s._pai) == sorted(Shan.base_pai(rule())) for s in shan)
+        assert shan[0]._pai != shan[1]._pai
+        assert shan[0].paishu == 122
+        assert shan[0].baopai == [shan[0]._pai[4]]
+
+    def test_reproducible(self):
+        assert ([list(s._pai) for s in Shan.batch(rule(), 2, random.Random(1))]
+                == [list(s._pai) for s in Shan.batch(rule(), 2, random.Random(1))])
+
+    def test_empty(self):
+        assert Shan.batch(rule(), 0) == []
+
+    def test_numpy(self):
+        np = pytest.importorskip('numpy')
+        rng = np.random.default_rng(1)
+        shan = Shan.batch(rule(), 2, rng)
+        assert all(sorted(s._pai) == sorted(Shan.base_pai(rule())) for s in shan)
+        assert sorted(Shan(rule(), rng)._pai) == sorted(Shan.base_pai(rule()))
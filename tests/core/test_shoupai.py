@@ -1,6 +1,9 @@
 import pytest
+import re
+from itertools import product
 
 from jongpy.core import Shoupai
+from jongpy.core.shoupai import _valid_mianzi
 from jongpy.core.exceptions import (PaiFormatError,
                                     PaiOverFlowError,
                                     PaiNotExistError,
@@ -67,6 +70,15 @@ class TestShoupaiValidPai:
     def test_error8(self):
         assert Shoupai.valid_pai('m9=_') is None
 
+    def test_error_trailing_newline(self):
+        assert Shoupai.valid_pai('m1\n') is None
+
+    def test_same_as_regex(self):
+        for pai in product('mpsz_', '0123456789', ['', '_'], ['', '*'], ['', '+', '=', '-', '*']):
+            p = ''.join(pai)
+            expected = p if re.search(r'^(?:[mps]\d|z[1-7])_?\*?[\+\=\-]?\Z', p) else None
+            assert Shoupai.valid_pai(p) == expected
+
 
 class TestShoupaiValidMianzi:
 
@@ -151,6 +163,14 @@ class TestShoupaiValidMianzi:
     def test_error6(self):
         assert Shoupai.valid_mianzi('z111=0') is None
 
+    def test_same_as_regex(self):
+        for s, n in product('mpsz', [3, 4]):
+            for nn in product('01589', repeat=n):
+                for i in range(n + 1):
+                    for d in ['', '+', '=', '-']:
+                        m = s + ''.join(nn[:i]) + d + ''.join(nn[i:])
+                        assert Shoupai.valid_mianzi(m) == _valid_mianzi(m)
+
 
 class TestShoupaiConstructor:
 
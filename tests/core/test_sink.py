@@ -0,0 +1,120 @@
+import io
+import json
+import socket
+
+import jongpy.core as majiang
+from jongpy.core.sink import PaipuSink, JsonlSink, read_jsonl
+
+
+RULE = {'n_zhuang': 1}
+
+
+class Player:
+    def action(self, msg, callback=None):
+        if callback is not None:
+            callback(None)
+
+
+def _game():
+    return majiang.Game([Player() for _ in range(4)], None, majiang.rule(RULE))
+
+
+class TestPaipuSink:
+    def test_noop(self):
+        game = _game()
+        game.sink = PaipuSink()
+        game.simulate(1, seed=1)
+
+
+class TestJsonlSink:
+    def test_lines(self):
+        f = io.StringIO()
+        game = _game()
+        game.sink = JsonlSink(f)
+        result = game.simulate(1, seed=1, paipu=True)
+        lines = [json.loads(line) for line in f.getvalue().splitlines()]
+        paipu = result['paipu'][0]
+        assert lines[0] == {'game': 0, 'kaiju': {
+            'title': paipu['title'], 'player': paipu['player'], 'qijia': paipu['qijia'], 'rule': game._rule}}
+        assert lines[1]['game'] == 0
+        assert lines[1]['round'] == 0
+        assert 'qipai' in lines[1]
+        assert lines[-1] == {'game': 0, 'jieju': {
+            'defen': paipu['defen'], 'rank': paipu['rank'], 'point': paipu['point']}}
+        assert len(lines) == 2 + sum(len(log) for log in paipu['log'])
+
+    def test_read_jsonl(self):
+        f = io.StringIO()
+        game = _game()
+        game.sink = JsonlSink(f)
+        result = game.simulate(3, seed=1, paipu=True)
+        f.seek(0)
+        assert read_jsonl(f) == json.loads(json.dumps(result['paipu']))
+
+    def test_no_record(self):
+        f = io.StringIO()
+        game = _game()
+        game.sink = JsonlSink(f)
+        game.record = False
+        game.do_sync()
+        assert game._paipu['log'] == []
+        f.seek(0)
+        paipu = read_jsonl(f)
+        assert len(paipu[-1]['log']) > 0
+        assert paipu[-1]['rank'] == game._paipu['rank']
+        assert not game.record
+
+    def test_simulate_keeps_record(self):
+        game = _game()
+        game.record = False
+        game.simulate(1, seed=1, paipu=True)
+        assert not game.record
+
+    def test_buffer(self):
+        f = io.StringIO()
+        sink = JsonlSink(f, buffer_size=1 << 20, flush_interval=None)
+        game = sink.kaiju({'title': '', 'player': [], 'qijia': 0, 'rule': {}})
+        sink.add(game, 0, {'zimo': {'l': 0, 'p': 'm1'}})
+        assert f.getvalue() == ''
+        sink.flush()
+        assert len(f.getvalue().splitlines()) == 2
+
+    def test_buffer_size(self):
+        f = io.StringIO()
+        sink = JsonlSink(f, buffer_size=1, flush_interval=None)
+        sink.add(0, 0, {'zimo': {'l': 0, 'p': 'm1'}})
+        assert json.loads(f.getvalue()) == {'game': 0, 'round': 0, 'zimo': {'l': 0, 'p': 'm1'}}
+
+    def test_flush_interval(self):
+        f = io.StringIO()
+        sink = JsonlSink(f, flush_interval=0)
+        sink.add(0, 0, {'zimo': {'l': 0, 'p': 'm1'}})
+        assert f.getvalue()
+
+    def test_jieju_flush(self):
+        f = io.StringIO()
+        sink = JsonlSink(f, flush_interval=None)
+        sink.jieju(0, {'defen': [], 'rank': [], 'point': []})
+        assert f.getvalue()
+
+    def test_game_id(self):
+        sink = JsonlSink(io.StringIO(), game=10)
+        assert sink.kaiju({}) == 10
+        assert sink.kaiju({}) == 11
+
+    def test_path(self, tmp_path):
+        path = tmp_path / 'paipu.jsonl'
+        with JsonlSink(path) as sink:
+            game = _game()
+            game.sink = sink
+            result = game.simulate(1, seed=1, paipu=True)
+        assert read_jsonl(path) == json.loads(json.dumps(result['paipu']))
+
+    def test_socket(self):
+        a, b = socket.socketpair()
+        with a, b:
+            sink = JsonlSink(a.makefile('w', encoding='utf-8'))
+            sink.add(0, 0, {'zimo': {'l': 0, 'p': 'm1'}})
+            sink.flush()
+            line = b.makefile('r', encoding='utf-8').readline()
+        assert json.loads(line)['zimo'] == {'l': 0, 'p': 'm1'}
@@ -5,7 +5,8 @@ from jongpy.core import (Shoupai, xiangting_yiban,
                          xiangting_qidui,
                          xiangting_goushi,
                          xiangting,
-                         tingpai)
+                         tingpai,
+                         xiangting_dapai)
 from jongpy.core.xiangting import XIANGTING_INF
 
 
@@ -273,3 +274,48 @@ class TestTingpai:
 
     def test_f_xiangting(self):
         assert tingpai(Shoupai.from_str('m11155p2278s66z17'), xiangting_qidui) == ['p7', 'p8', 'z1', 'z7']
+
+    def test_f_xiangting_yiban(self):
+        assert tingpai(Shoupai.from_str('m11155p2278s66z17'), xiangting_yiban) == ['m5', 'p2', 'p6', 'p9', 's6']
+
+    def test_f_xiangting_with_fulou(self):
+        assert tingpai(Shoupai.from_str('m1188p288s05z2,z111='), xiangting_qidui) == []
+
+    def test_f_xiangting_custom(self):
+        assert tingpai(Shoupai.from_str('m123p456s789z1234'), lambda shoupai: xiangting(shoupai)) == ['z1', 'z2',
+                                                                                                    'z3', 'z4']
+
+
+class TestXiangtingDapai:
+
+    def test_error_cannot_dapai(self):
+        assert xiangting_dapai(Shoupai.from_str('m123p456s789z1234')) is None
+
+    def test_same_as_tingpai(self):
+        for paistr in ['m123p456s789z12345', 'm11155p2278s66z177', 'm19p19s19z12345677',
+                       'm123p456z12345,s789-,', 'm1188p288s05z12,z111=', 'm0555p456s789z1122']:
+            shoupai = Shoupai.from_str(paistr)
+            r = xiangting_dapai(shoupai)
+            assert list(r) == shoupai.get_dapai()
+            for p in r:
+                new_shoupai = shoupai.clone().dapai(p)
+                assert r[p]['xiangting'] == xiangting(new_shoupai)
+                assert r[p]['tingpai'] == tingpai(new_shoupai)
+
+    def test_n_tingpai(self):
+        r = xiangting_dapai(Shoupai.from_str('m1234444p456s789z1'))
+        assert r['z1_']['tingpai'] == ['m1']
+        assert r['z1_']['n_tingpai'] == 3
+        assert r['m2']['n_tingpai'] == 13  # m1:3 + m2:3 + m5:4 + z1:3
+
+    def test_visible(self):
+        visible = [0] * 34
+        visible[0] = 2  # m1 が2枚見えている
+        r = xiangting_dapai(Shoupai.from_str('m1234444p456s789z1'), ['z1_'], visible)
+        assert r['z1_']['n_tingpai'] == 1
+
+    def test_dapai(self):
+        r = xiangting_dapai(Shoupai.from_str('m0555p456s789z1122'), ['m0', 'm5'])
+        assert list(r) == ['m0', 'm5']
+        assert r['m0'] == r['m5']
+        assert r['m0']['tingpai'] is not r['m5']['tingpai']
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from jongpy.core import Shoupai, PackedShoupai
+from jongpy.core import xiangting_yiban, xiangting_qidui, xiangting_goushi, xiangting_array, tingpai_array
+from jongpy.core.pai import pai_str
+from jongpy.core.xiangting import XIANGTING_INF
+
+np = pytest.importorskip('numpy')
+
+from jongpy.core.xiangting_batch import xiangting_batch, tingpai_batch  # noqa: E402
+
+
+PAISTR = ['m123p406s789z1122', 'm19p19s19z1234567', 'm1188p288s05z1177',
+          'm133345568z23677', 'p234s567,m222=,p0-67', 'm1112345678999', 'm1122334455z11',
+          'm123p406s789z112', 'm1188p288s05z117', 'z1234567']
+
+
+def _random_hands(n, seed=1):
+    rng = random.Random(seed)
+    bingpai, n_fulou = [], []
+    for _ in range(n):
+        f = rng.choice([0, 0, 0, 1, 2, 3])
+        wall = [t for t in range(34) for _ in range(4)]
+        if rng.random() < 0.3:  # 染め手
+            o = rng.choice([0, 9, 18])
+            wall = [t for t in list(range(o, o + 9)) + list(range(27, 34)) for _ in range(4)]
+        count = [0] * 34
+        for t in rng.sample(wall, 13 - 3 * f):
+            count[t] += 1
+        bingpai.append(count)
+        n_fulou.append(f)
+    return bingpai, n_fulou
+
+
+class TestXiangtingBatch:
+
+    def test_same_as_xiangting(self):
+        packed = [PackedShoupai.from_str(paistr) for paistr in PAISTR]
+        yiban, qidui, goushi = xiangting_batch([list(p.bingpai) for p in packed],
+                                               [len(p._fulou) for p in packed])
+        for i, paistr in enumerate(PAISTR):
+            shoupai = Shoupai.from_str(paistr)
+            assert yiban[i] == xiangting_yiban(shoupai)
+            assert qidui[i] == xiangting_qidui(shoupai)
+            assert goushi[i] == xiangting_goushi(shoupai)
+
+    def test_random(self):
+        bingpai, n_fulou = _random_hands(500)
+        yiban, qidui, goushi = xiangting_batch(bingpai, n_fulou)
+        x = np.minimum(yiban, np.minimum(qidui, goushi))
+        assert x.tolist() == [xiangting_array(b, f) for b, f in zip(bingpai, n_fulou)]
+
+    def test_fulou(self):
+        _, qidui, goushi = xiangting_batch([[0] * 34], 4)
+        assert qidui[0] == XIANGTING_INF
+        assert goushi[0] == XIANGTING_INF
+
+    def test_empty(self):
+        yiban, _, _ = xiangting_batch(np.zeros((0, 34), dtype=np.int8))
+        assert yiban.shape == (0,)
+
+    def test_error_shape(self):
+        with pytest.raises(ValueError):
+            xiangting_batch([0] * 34)
+
+
+class TestTingpaiBatch:
+
+    def test_same_as_tingpai_array(self):
+        packed = [PackedShoupai.from_str(paistr) for paistr in PAISTR[7:]]
+        mask = tingpai_batch([list(p.bingpai) for p in packed], [len(p._fulou) for p in packed])
+        assert mask.shape == (len(packed), 34)
+        for i, p in enumerate(packed):
+            assert np.nonzero(mask[i])[0].tolist() == tingpai_array(p.bingpai, len(p._fulou))
+
+    def test_tingpai(self):
+        mask = tingpai_batch([list(PackedShoupai.from_str('m1112345678999').bingpai)])
+        assert [pai_str(i) for i in np.nonzero(mask[0])[0]] == ['m1', 'm2', 'm3', 'm4', 'm5',
+                                                               'm6', 'm7', 'm8', 'm9']
+
+    def test_random(self, monkeypatch):
+        import jongpy.core.xiangting_batch as batch
+        monkeypatch.setattr(batch, 'CHUNK_SIZE', 64)    # 分割して処理する場合
+        bingpai, n_fulou = _random_hands(300, seed=2)
+        mask = tingpai_batch(bingpai, n_fulou)
+        for i, (b, f) in enumerate(zip(bingpai, n_fulou)):
+            assert np.nonzero(mask[i])[0].tolist() == tingpai_array(b, f)
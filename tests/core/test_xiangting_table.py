@@ -0,0 +1,55 @@
+import pytest
+
+from jongpy.core import xiangting_table
+from jongpy.core.xiangting import mianzi
+
+
+class TestXiangtingTableEncode:
+
+    def test_empty(self):
+        assert xiangting_table.encode([0, 0, 0, 0, 0, 0, 0, 0, 0, 0]) == 0
+
+    def test_ignore_hongpai(self):
+        assert xiangting_table.encode([1, 0, 0, 0, 0, 1, 0, 0, 0, 0]) == 5 ** 4
+
+    def test_decode(self):
+        bingpai = [0, 1, 0, 2, 4, 3, 0, 0, 1, 4]
+        assert xiangting_table.decode(xiangting_table.encode(bingpai)) == bingpai
+
+    def test_decode_zipai(self):
+        bingpai = [0, 3, 0, 2, 0, 1, 0, 4]
+        assert xiangting_table.decode(xiangting_table.encode(bingpai), 7) == bingpai
+
+
+class TestXiangtingTableShupai:
+
+    def test_same_as_mianzi(self):
+        for bingpai in ([0, 1, 1, 1, 0, 0, 0, 0, 0, 0],
+                        [0, 3, 1, 1, 1, 1, 1, 1, 1, 3],
+                        [0, 0, 2, 2, 3, 1, 0, 1, 1, 0],
+                        [0, 1, 0, 1, 0, 1, 0, 1, 0, 1]):
+            r = mianzi(bingpai[:])
+            assert xiangting_table.shupai(xiangting_table.encode(bingpai)) == (tuple(r['a']), tuple(r['b']))
+
+    def test_zipai(self):
+        bingpai = [0, 3, 0, 2, 0, 1, 0, 4]
+        assert xiangting_table.zipai(xiangting_table.encode(bingpai)) == (2, 1, 1)
+
+
+class TestXiangtingTableDump:
+
+    def test_dump_and_load(self, tmp_path):
+        code = xiangting_table.encode([0, 1, 1, 2, 0, 0, 3, 0, 0, 1])
+        r = xiangting_table.shupai(code)
+        path = tmp_path / 'xiangting_table.bin'
+        xiangting_table.dump(path)
+        xiangting_table._shupai[code] = 0
+        xiangting_table.load(path)
+        assert xiangting_table._shupai[code] != 0
+        assert xiangting_table.shupai(code) == r
+
+    def test_error_invalid_file(self, tmp_path):
+        path = tmp_path / 'invalid.bin'
+        path.write_bytes(b'INVALID')
+        with pytest.raises(ValueError):
+            xiangting_table.load(path)